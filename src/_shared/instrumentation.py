@@ -0,0 +1,229 @@
+"""
+Per-node latency and throughput instrumentation for StateGraphs.
+
+    builder = instrument(StateGraph(State), name="booker")
+    builder.add_node("route_request", route_request)  # wrapped automatically
+
+Every node added after `instrument()` records wall time, calls and exceptions per node, and its wall time
+again labelled by the superstep it ran in, into fixed-memory histograms. A rough state size is sampled on
+one call in STATE_SIZE_EVERY, measuring it walks the whole state. The registry can be exported in the
+Prometheus text format, to a file or from a small local HTTP endpoint.
+"""
+
+import functools
+import inspect
+import itertools
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+from langchain_core.runnables.config import var_child_runnable_config
+from langgraph.errors import GraphBubbleUp
+
+from src._shared.stats import Histogram
+
+QUANTILES = (0.5, 0.9, 0.99)
+# Step numbers keep growing across turns of a checkpointed thread, later steps share one label
+MAX_SUPERSTEP_LABEL = 25
+FLUSH_EVERY = 1024
+STATE_SIZE_EVERY = 16
+
+
+class NodeMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.state_size = Histogram(min_value=1)
+
+
+class GraphMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: deque[tuple] = deque()
+        self.nodes: dict[tuple[str, str], NodeMetrics] = {}
+        # node wall time by (graph, step), not the wall time of the step itself
+        self.step_latency: dict[tuple[str, int], Histogram] = {}
+
+    def observe(self, graph: str, node: str, step: Optional[int], elapsed: float, size: Optional[int], error: bool):
+        # Appending to a deque is cheap and thread-safe, histograms are updated in batches
+        self._pending.append((graph, node, step, elapsed, size, error))
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            for _ in range(len(self._pending)):
+                graph, node, step, elapsed, size, error = self._pending.popleft()
+                metrics = self.nodes.get((graph, node))
+                if metrics is None:
+                    metrics = self.nodes[(graph, node)] = NodeMetrics()
+                metrics.calls += 1
+                metrics.errors += error
+                metrics.latency.record(elapsed)
+                if size is not None:
+                    metrics.state_size.record(size)
+                if step is not None:
+                    step = min(step, MAX_SUPERSTEP_LABEL)
+                    step_latency = self.step_latency.get((graph, step))
+                    if step_latency is None:
+                        step_latency = self.step_latency[(graph, step)] = Histogram()
+                    step_latency.record(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self.nodes.clear()
+            self.step_latency.clear()
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def summary(name: str, help_text: str, series: list[tuple[str, Histogram]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for labels, histogram in series:
+                for quantile in QUANTILES:
+                    value = histogram.percentile(quantile * 100)
+                    lines.append(f'{name}{{{labels},quantile="{quantile}"}} {value:.9g}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total:.9g}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        def counter(name: str, help_text: str, series: list[tuple[str, int]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{{{labels}}} {value}" for labels, value in series)
+
+        self.flush()
+        with self._lock:
+            nodes = sorted((f'graph="{graph}",node="{node}"', m) for (graph, node), m in self.nodes.items())
+            steps = sorted(self.step_latency.items())
+            counter("langgraph_node_calls_total", "Node invocations.", [(labels, m.calls) for labels, m in nodes])
+            counter("langgraph_node_errors_total", "Node invocations that raised.", [(l, m.errors) for l, m in nodes])
+            summary("langgraph_node_latency_seconds", "Node wall time.", [(l, m.latency) for l, m in nodes])
+            summary(
+                "langgraph_node_state_size",
+                f"Summed len() of the node's input state, sampled on one call in {STATE_SIZE_EVERY}.",
+                [(l, m.state_size) for l, m in nodes],
+            )
+            summary(
+                "langgraph_node_latency_by_step_seconds",
+                "Node wall time, labelled by the superstep the node ran in.",
+                [
+                    (f'graph="{graph}",step="{step if step < MAX_SUPERSTEP_LABEL else f"{step}+"}"', histogram)
+                    for (graph, step), histogram in steps
+                ],
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the metrics atomically, e.g. for the node_exporter textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as tmp:
+            tmp.write(self.to_prometheus())
+        os.replace(tmp.name, path)
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve /metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Default registry
+METRICS = GraphMetrics()
+
+
+def state_size(state: Any) -> int:
+    """Rough size of a state: the summed len() of its sized values, e.g. messages in a history."""
+    values = state.values() if isinstance(state, dict) else getattr(state, "__dict__", {}).values()
+    return sum(len(value) if hasattr(value, "__len__") else 1 for value in values)
+
+
+def _current_step() -> Optional[int]:
+    # the same context variable langgraph.config.get_config() reads, without its exception on a miss
+    config = var_child_runnable_config.get()
+    if not config:
+        return None
+    return config.get("metadata", {}).get("langgraph_step")
+
+
+def instrument_node(func: Callable, graph: str, node: str, metrics: GraphMetrics = METRICS) -> Callable:
+    calls = itertools.count()
+
+    def sampled_size(state: Any) -> Optional[int]:
+        return state_size(state) if not next(calls) % STATE_SIZE_EVERY else None
+
+    # functools.wraps keeps the signature, so langgraph still injects config/store/writer as before
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(state, *args, **kwargs):
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await func(state, *args, **kwargs)
+                error = False
+                return result
+            except GraphBubbleUp:
+                # interrupts and parent commands are control flow, not failures
+                error = False
+                raise
+            finally:
+                metrics.observe(graph, node, _current_step(), time.perf_counter() - start, sampled_size(state), error)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        start = time.perf_counter()
+        error = True
+        try:
+            result = func(state, *args, **kwargs)
+            error = False
+            return result
+        except GraphBubbleUp:
+            # interrupts and parent commands are control flow, not failures
+            error = False
+            raise
+        finally:
+            metrics.observe(graph, node, _current_step(), time.perf_counter() - start, sampled_size(state), error)
+
+    return wrapper
+
+
+def instrument(builder, name: str, metrics: GraphMetrics = METRICS):
+    """Wrap every node added to `builder` from now on. Returns the builder."""
+    add_node = builder.add_node
+
+    def instrumented_add_node(node, action=None, **kwargs):
+        if action is None:
+            node, action = getattr(node, "name", getattr(node, "__name__", None)), node
+        # compiled subgraphs and other Runnables are left alone, they need to stay visible to langgraph as-is
+        if inspect.isfunction(action) or inspect.ismethod(action):
+            action = instrument_node(action, name, node, metrics)
+        return add_node(node, action, **kwargs)
+
+    builder.add_node = instrumented_add_node
+    return builder
@@ -0,0 +1,73 @@
+import math
+from collections import defaultdict
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, `q` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: Sequence[float]) -> dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 50),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class Histogram:
+    """Fixed-memory histogram with log-spaced buckets, percentiles are within `precision` relative error."""
+
+    def __init__(self, precision: float = 0.01, min_value: float = 1e-6):
+        self.precision = precision
+        self.min_value = min_value
+        self._log_base = math.log1p(precision)
+        self._inverse_log_base = 1 / self._log_base
+        self.buckets: defaultdict[int, int] = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        bucket = 0 if value <= self.min_value else int(math.log(value / self.min_value) * self._inverse_log_base) + 1
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # report the bucket's upper bound, never above the largest value recorded
+                return min(self.min_value * math.exp(bucket * self._log_base), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
@@ -1,24 +1,29 @@
-import os
+import sys
 import uuid
-from typing import Annotated
-
-import requests
-from langchain.agents import AgentType, initialize_agent
-from langchain.chat_models import ChatOpenAI
-from langchain.chat_models import ChatOllama
-from langchain.tools import Tool
-from langchain_core.messages import AIMessage, HumanMessage
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import add_messages
+from functools import lru_cache
+from typing import Annotated, Optional
+
 from typing_extensions import TypedDict
 
+from src.components.booking_repository import InMemoryBookingRepository
+from src.components.intent_router import IntentRouter
+
+# langchain/langgraph imports are deferred to the functions that need them: importing this
+# module should stay cheap, the model, tools and graph are built on first use.
+
 # # Define LLM Ollama Model
 # MODEL = "llama3.2"
 # llm = ChatOllama(model=MODEL)
 
 MODEL = "gpt-4o-mini"
-llm = ChatOpenAI(model=MODEL)
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=MODEL)
+
 
 # Booking details (Added room numbers)
 bookings = {
@@ -26,6 +31,19 @@ bookings = {
     "456": {"status": "pending", "name": "Bob Smith", "guests": 3, "room": "TBD"},
     "789": {"status": "not_found"},
 }
+# Swap in SQLiteBookingRepository("bookings.db") to serve a real reservation database
+repository = InMemoryBookingRepository(bookings)
+NOT_FOUND = {"status": "not_found"}
+
+
+@lru_cache(maxsize=None)
+def get_tool_cache():
+    from src.components.tool_cache import ToolCache
+
+    # Read-only tool results are memoized, a booking write drops the entries for that guest
+    cache = ToolCache(max_size=4096, ttl=300)
+    repository.on_change(cache.invalidate)
+    return cache
 
 
 def greet_user(username: str) -> str:
@@ -33,7 +51,7 @@ def greet_user(username: str) -> str:
 
 
 def check_booking(guest_id: str) -> str:
-    booking = bookings.get(guest_id, {"status": "not_found"})
+    booking = repository.get(guest_id) or NOT_FOUND
 
     if booking["status"] == "confirmed":
         return f"Booking confirmed for {booking['name']} with {booking['guests']} guests. Your assigned room is {booking['room']}."
@@ -44,7 +62,7 @@ def check_booking(guest_id: str) -> str:
 
 
 def confirmed_check_in(guest_id: str) -> str:
-    booking = bookings.get(guest_id, {"status": "not_found"})
+    booking = repository.get(guest_id) or NOT_FOUND
 
     if booking["status"] == "confirmed":
         return (
@@ -55,7 +73,7 @@ def confirmed_check_in(guest_id: str) -> str:
 
 
 def pending_check_in(guest_id: str) -> str:
-    booking = bookings.get(guest_id, {"status": "not_found"})
+    booking = repository.get(guest_id) or NOT_FOUND
 
     if booking["status"] == "pending":
         return f"Hello {booking['name']}, your booking for {booking['guests']} guests is pending. Your room assignment is not yet available. Please visit the reception to complete the process."
@@ -63,7 +81,7 @@ def pending_check_in(guest_id: str) -> str:
         return "No pending booking found."
 
 
-def no_booking() -> str:
+def no_booking(input: str = "") -> str:
     return "No booking found. Would you like to make a reservation?"
 
 
@@ -77,7 +95,7 @@ def provide_hotel_info(input: str) -> str:
 
 
 def request_room_service(guest_id: str) -> str:
-    booking = bookings.get(guest_id, {"status": "not_found"})
+    booking = repository.get(guest_id) or NOT_FOUND
 
     if booking["status"] == "confirmed":
         return f"Room service has been requested for room {booking['room']}. Our staff will be with you shortly."
@@ -86,7 +104,7 @@ def request_room_service(guest_id: str) -> str:
 
 
 def report_issue(guest_id: str) -> str:
-    booking = bookings.get(guest_id, {"status": "not_found"})
+    booking = repository.get(guest_id) or NOT_FOUND
 
     if booking["status"] == "confirmed":
         return f"Thank you, Mr./Ms. {booking['name']}. Your issue has been received. We apologize for the inconvenience, and our team will fix it soon."
@@ -96,151 +114,214 @@ def report_issue(guest_id: str) -> str:
 
 
 # Define Tools
-greet_user_tool = Tool(name="Greet User", func=greet_user, description="Greets the user with a welcome message.")
-check_booking_tool = Tool(
-    name="Check Booking", func=check_booking, description="Check bookings for a given booking ID."
-)
-confirmed_check_in_tool = Tool(
-    name="Confirmed Check-in", func=confirmed_check_in, description="Confirm check-in for a given booking ID."
-)
-pending_check_in_tool = Tool(
-    name="Pending Check-in", func=pending_check_in, description="Handle pending check-in cases."
-)
-no_booking_tool = Tool(name="No Booking", func=no_booking, description="Handle cases where no booking is found.")
-hotel_info_tool = Tool(name="Hotel Info", func=provide_hotel_info, description="Provides information about the hotel.")
-room_service_tool = Tool(
-    name="Room Service", func=request_room_service, description="Requests room service for a given booking ID."
-)
-report_issue_tool = Tool(name="Report Issue", func=report_issue, description="Allows guests to report any issues.")
+@lru_cache(maxsize=None)
+def get_tools() -> dict:
+    from langchain_core.tools import Tool
+
+    from src.components.tool_cache import memoize_tool
+
+    tool_cache = get_tool_cache()
+
+    def by_guest(guest_id: str) -> str:
+        return guest_id
+
+    return {
+        "greet_user": Tool(name="Greet User", func=greet_user, description="Greets the user with a welcome message."),
+        "check_booking": memoize_tool(
+            Tool(name="Check Booking", func=check_booking, description="Check bookings for a given booking ID."),
+            tool_cache,
+            tag=by_guest,
+        ),
+        "confirmed_check_in": memoize_tool(
+            Tool(
+                name="Confirmed Check-in",
+                func=confirmed_check_in,
+                description="Confirm check-in for a given booking ID.",
+            ),
+            tool_cache,
+            tag=by_guest,
+        ),
+        "pending_check_in": memoize_tool(
+            Tool(name="Pending Check-in", func=pending_check_in, description="Handle pending check-in cases."),
+            tool_cache,
+            tag=by_guest,
+        ),
+        "no_booking": Tool(name="No Booking", func=no_booking, description="Handle cases where no booking is found."),
+        "hotel_info": memoize_tool(
+            Tool(name="Hotel Info", func=provide_hotel_info, description="Provides information about the hotel."),
+            tool_cache,
+            normalize=lambda _: "",
+        ),
+        "room_service": Tool(
+            name="Room Service", func=request_room_service, description="Requests room service for a given booking ID."
+        ),
+        "report_issue": Tool(name="Report Issue", func=report_issue, description="Allows guests to report any issues."),
+    }
 
 
 # Routing Function
+# Intent phrases in priority order, compiled once into a single-pass matcher
+INTENTS = [
+    ("greet", "process_greet"),
+    ("check booking", "process_check_bookings"),
+    ("confirmed check-in", "process_confirmed_check_in"),
+    ("confirm booking", "process_confirmed_check_in"),
+    ("pending check-in", "process_pending_check_in"),
+    ("no booking", "process_no_booking"),
+    ("hotel info", "process_hotel_info"),
+    ("room service", "process_room_service"),
+    ("report issue", "process_report_issue"),
+]
+router = IntentRouter(INTENTS)
+
+
 def route_request(state):
-    user_input = state["messages"][-1].content.strip().lower()
-    if "greet" in user_input:
-        return {"next_node": "process_greet"}
-    elif "check booking" in user_input:
-        return {"next_node": "process_check_bookings"}
-    elif "confirmed check-in" in user_input:
-        return {"next_node": "process_confirmed_check_in"}
-    elif "pending check-in" in user_input:
-        return {"next_node": "process_pending_check_in"}
-    elif "no booking" in user_input:
-        return {"next_node": "process_no_booking"}
-    elif "hotel info" in user_input:
-        return {"next_node": "process_hotel_info"}
-    elif "room service" in user_input:
-        return {"next_node": "process_room_service"}
-    elif "report issue" in user_input:
-        return {"next_node": "process_report_issue"}
-    else:
-        return {"next_node": END}
+    match = router.match(state["messages"][-1].content)
+    if match is None:
+        return {"next_node": None, "argument": "", "guest_id": "", "details": ""}
+    # e.g. "report issue 123 water leak" -> guest_id "123", details "water leak"
+    guest_id, _, details = match.argument.partition(" ")
+    return {"next_node": match.target, "argument": match.argument, "guest_id": guest_id, "details": details.strip()}
 
 
 # Processing Functions
+def respond(tool: str, tool_input: str) -> dict:
+    from langchain_core.messages import AIMessage
+    from langgraph.config import get_stream_writer
+
+    # tool progress for stream_mode="custom", a no-op when the graph isn't being streamed
+    writer = get_stream_writer()
+    writer({"tool": tool, "status": "start"})
+    response = get_tools()[tool].invoke(tool_input)
+    writer({"tool": tool, "status": "end"})
+    # a message object rather than a tuple, so stream_mode="messages" picks it up
+    return {"messages": [AIMessage(response)]}
+
+
 def process_greet(state):
-    username = state["messages"][-1].content.strip()
-    response = greet_user_tool.invoke(username)
-    return {"messages": [AIMessage(content=response)]}
+    username = state["argument"] or state["messages"][-1].content.strip()
+    return respond("greet_user", username)
 
 
 def process_check_bookings(state):
-    guest_id = state["messages"][-1].content.strip().replace("check booking", "").strip()
-    response = check_booking_tool.invoke(guest_id)
-    return {"messages": [AIMessage(content=response)]}
+    return respond("check_booking", state["guest_id"])
 
 
 def process_confirmed_check_in(state):
-    guest_id = state["messages"][-1].content.strip().replace("confirm booking", "").strip()
-    response = confirmed_check_in_tool.invoke(guest_id)
-    return {"messages": [AIMessage(content=response)]}
+    return respond("confirmed_check_in", state["guest_id"])
 
 
 def process_pending_check_in(state):
-    guest_id = state["messages"][-1].content.strip().replace("pending check-in", "").strip()
-    response = pending_check_in_tool.invoke(guest_id)
-    return {"messages": [AIMessage(content=response)]}
+    return respond("pending_check_in", state["guest_id"])
 
 
 def process_no_booking(state):
-    response = no_booking_tool.invoke()
-    return {"messages": [AIMessage(content=response)]}
+    return respond("no_booking", state["argument"])
 
 
 def process_hotel_info(state):
-    input = state["messages"][-1].content.strip().replace("hote info", "").strip()
-    response = hotel_info_tool.invoke(input)
-    return {"messages": [AIMessage(content=response)]}
+    return respond("hotel_info", state["argument"])
 
 
 def process_room_service(state):
-    guest_id = state["messages"][-1].content.strip().replace("room service", "").strip()
-    response = room_service_tool.invoke(guest_id)
-    return {"messages": [AIMessage(content=response)]}
+    return respond("room_service", state["guest_id"])
 
 
 def process_report_issue(state):
-    guest_id = state["messages"][-1].content.strip().replace("report issue", "").strip()
-
-    response = report_issue_tool.invoke(guest_id)
-    return {"messages": [AIMessage(content=response)]}
-
-
-# Define Workflow Class
-class State(TypedDict):
-    messages: Annotated[list, add_messages]
-
-
-# Setup Workflow
-memory = MemorySaver()
-workflow = StateGraph(State)
-workflow.add_node("route_request", route_request)
-workflow.add_node("process_greet", process_greet)
-workflow.add_node("process_check_bookings", process_check_bookings)
-workflow.add_node("process_confirmed_check_in", process_confirmed_check_in)
-workflow.add_node("process_pending_check_in", process_pending_check_in)
-workflow.add_node("process_no_booking", process_no_booking)
-workflow.add_node("process_hotel_info", process_hotel_info)
-workflow.add_node("process_room_service", process_room_service)
-workflow.add_node("process_report_issue", process_report_issue)
-
-# Define Transitions
-workflow.add_edge(START, "route_request")
-workflow.add_conditional_edges(
-    "route_request",
-    lambda state: state["next_node"],
-    [
-        "process_greet",
-        "process_check_bookings",
-        "process_confirmed_check_in",
-        "process_pending_check_in",
-        "process_no_booking",
-        "process_hotel_info",
-        "process_room_service",
-        "process_report_issue",
-        END,
-    ],
-)
-
-# Compile the Workflow
-graph = workflow.compile(checkpointer=memory)
-
-print("System Ready! Type 'q' to quit.")
-print("Welcome! You can:")
-print("--> Greet users (e.g., 'greet John')")
-print("--> Check bookings (e.g., 'check booking 123')")
-print("--> Confirm bookings (e.g., 'confirm booking 123')")
-print("--> Get hotel info (e.g., 'hotel info')")
-print("--> Request room service (e.g., 'room service')")
-print("--> Report an issue (e.g., 'report issue 123 water leak')")
-print("Type 'q' to quit.\n")
-
-config = {"configurable": {"thread_id": str(uuid.uuid4())}}
-
-while True:
-    user = input("User: ")
-    if user.lower() in {"q", "quit"}:
-        print("Goodbye!")
-        break
-    output = graph.invoke({"messages": [HumanMessage(content=user)]}, config=config)
-    print("AI:", output["messages"][-1].content)
+    return respond("report_issue", state["guest_id"])
+
+
+def build_graph(checkpointer=None):
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.graph.message import add_messages
+
+    from src._shared.instrumentation import instrument
+    from src.components.bounded_checkpointer import BoundedMemorySaver
+
+    # Define Workflow Class
+    class State(TypedDict):
+        messages: Annotated[list, add_messages]
+        next_node: Optional[str]
+        argument: str
+        guest_id: str
+        details: str
+
+    # Setup Workflow
+    memory = checkpointer or BoundedMemorySaver()
+    workflow = instrument(StateGraph(State), "booker")
+    workflow.add_node("route_request", route_request)
+    workflow.add_node("process_greet", process_greet)
+    workflow.add_node("process_check_bookings", process_check_bookings)
+    workflow.add_node("process_confirmed_check_in", process_confirmed_check_in)
+    workflow.add_node("process_pending_check_in", process_pending_check_in)
+    workflow.add_node("process_no_booking", process_no_booking)
+    workflow.add_node("process_hotel_info", process_hotel_info)
+    workflow.add_node("process_room_service", process_room_service)
+    workflow.add_node("process_report_issue", process_report_issue)
+
+    # Define Transitions
+    workflow.add_edge(START, "route_request")
+    workflow.add_conditional_edges(
+        "route_request",
+        lambda state: state["next_node"] or END,
+        [
+            "process_greet",
+            "process_check_bookings",
+            "process_confirmed_check_in",
+            "process_pending_check_in",
+            "process_no_booking",
+            "process_hotel_info",
+            "process_room_service",
+            "process_report_issue",
+            END,
+        ],
+    )
+
+    # Compile the Workflow
+    return workflow.compile(checkpointer=memory)
+
+
+@lru_cache(maxsize=None)
+def get_graph():
+    return build_graph()
+
+
+def main(stream: bool = False):
+    import asyncio
+
+    from src.components.streaming import StdoutSink, StreamStats, stream_turn
+
+    stats = StreamStats()
+    print("System Ready! Type 'q' to quit.")
+    print("Welcome! You can:")
+    print("--> Greet users (e.g., 'greet John')")
+    print("--> Check bookings (e.g., 'check booking 123')")
+    print("--> Confirm bookings (e.g., 'confirm booking 123')")
+    print("--> Get hotel info (e.g., 'hotel info')")
+    print("--> Request room service (e.g., 'room service')")
+    print("--> Report an issue (e.g., 'report issue 123 water leak')")
+    print("Type 'q' to quit.\n")
+
+    graph = get_graph()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+
+    while True:
+        user = input("User: ")
+        if user.lower() in {"q", "quit"}:
+            print("Goodbye!")
+            break
+        if stream:
+            asyncio.run(stream_turn(graph, {"messages": [("user", user)]}, config, StdoutSink(), stats))
+            continue
+        output = graph.invoke({"messages": [("user", user)]}, config=config)
+        print("AI:", output["messages"][-1].content)
+
+    if stream and stats.latency.count:
+        print(
+            f"time to first token p50 {stats.ttft.percentile(50) * 1000:.2f} ms, "
+            f"latency p50 {stats.latency.percentile(50) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(stream="--stream" in sys.argv)
@@ -0,0 +1,218 @@
+"""
+Multi-session server mode for the booker agent.
+Every TCP connection is one guest session with its own thread_id. Turns go through a bounded
+admission queue served by a fixed pool of workers running `graph.ainvoke` on a single event loop.
+
+Run with: python -m src.agents.booker_server --port 8765
+Talk to it with: nc localhost 8765
+"""
+
+import argparse
+import asyncio
+import signal
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from langchain_core.messages import HumanMessage
+
+from src._shared.stats import summarize
+
+
+@dataclass
+class Turn:
+    thread_id: str
+    text: str
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class ServerDraining(Exception):
+    pass
+
+
+class BookerServer:
+    def __init__(self, graph, workers: int = 64, queue_size: int = 1024, latency_window: int = 100_000):
+        self.graph = graph
+        self.workers = workers
+        self.queue: asyncio.Queue[Turn] = asyncio.Queue(maxsize=queue_size)
+        self.draining = False
+        self.sessions_opened = 0
+        self.sessions_closed = 0
+        self.turns = 0
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+        self.started_at = time.perf_counter()
+        self._workers: list[asyncio.Task] = []
+        self._server = None
+        # connection handlers, and the readers of those waiting for the guest's next line
+        self._clients: set[asyncio.Task] = set()
+        self._idle: set[asyncio.StreamReader] = set()
+
+    async def start(self):
+        self.started_at = time.perf_counter()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            turn = await self.queue.get()
+            try:
+                config = {"configurable": {"thread_id": turn.thread_id}}
+                output = await self.graph.ainvoke({"messages": [HumanMessage(content=turn.text)]}, config=config)
+                if not turn.future.done():
+                    turn.future.set_result(output["messages"][-1].content)
+            except Exception as e:
+                if not turn.future.done():
+                    turn.future.set_exception(e)
+            finally:
+                self.latencies.append(time.perf_counter() - turn.enqueued)
+                self.turns += 1
+                self.queue.task_done()
+
+    def open_session(self) -> str:
+        if self.draining:
+            raise ServerDraining("Server is shutting down.")
+        self.sessions_opened += 1
+        return str(uuid.uuid4())
+
+    async def close_session(self, thread_id: str):
+        self.sessions_closed += 1
+        # Finished sessions must not keep their checkpoints around forever
+        if self.graph.checkpointer is not None:
+            await self.graph.checkpointer.adelete_thread(thread_id)
+
+    async def turn(self, thread_id: str, text: str) -> str:
+        """Run one turn for a session. Waits while the admission queue is full."""
+        if self.draining:
+            raise ServerDraining("Server is shutting down.")
+        turn = Turn(thread_id=thread_id, text=text, future=asyncio.get_running_loop().create_future())
+        await self.queue.put(turn)
+        return await turn.future
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            thread_id = self.open_session()
+        except ServerDraining as e:
+            writer.write(f"{e}\n".encode())
+            await self._close_writer(writer)
+            return
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while not self.draining:
+                # drain() ends the reads parked here, a guest who never types must not hold up shutdown
+                self._idle.add(reader)
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # longer than the reader's limit: the rest of it can't be told apart from the next line
+                    writer.write(b"Error: line too long, closing the session.\n")
+                    break
+                finally:
+                    self._idle.discard(reader)
+                if not line:
+                    break
+                try:
+                    user = line.decode().strip()
+                except UnicodeDecodeError:
+                    writer.write(b"Error: input is not valid UTF-8.\n")
+                    await writer.drain()
+                    continue
+                if user.lower() in {"q", "quit"}:
+                    writer.write(b"Goodbye!\n")
+                    break
+                try:
+                    reply = await self.turn(thread_id, user)
+                except ServerDraining as e:
+                    reply = str(e)
+                except Exception as e:
+                    reply = f"Error: {e}"
+                writer.write(f"AI: {reply}\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(task)
+            await self.close_session(thread_id)
+            if self.draining and not writer.is_closing():
+                writer.write(b"Server is shutting down.\n")
+            await self._close_writer(writer)
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def listen(self, host: str = "127.0.0.1", port: int = 8765) -> int:
+        """Start the workers and accept connections. Returns the bound port (useful with port=0)."""
+        await self.start()
+        self._server = await asyncio.start_server(self.handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        port = await self.listen(host, port)
+        print(f"Booker server listening on {host}:{port}")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await stop.wait()
+        await self.drain()
+        print(self.stats())
+
+    async def drain(self):
+        """Stop admitting sessions, finish every queued turn, close every connection, then stop the workers."""
+        self.draining = True
+        if self._server is not None:
+            self._server.close()
+        # idle sessions are closed now; a session mid-turn gets its reply, then sees `draining` and closes
+        for reader in list(self._idle):
+            reader.feed_eof()
+        await self.queue.join()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        if self._server is not None:
+            # since Python 3.12.1 this also waits for every connection, all closed by now
+            await self._server.wait_closed()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def stats(self) -> dict[str, float]:
+        elapsed = time.perf_counter() - self.started_at
+        latency = summarize(self.latencies)
+        return {
+            "sessions_opened": self.sessions_opened,
+            "sessions_closed": self.sessions_closed,
+            "turns": self.turns,
+            "sessions_per_sec": self.sessions_closed / elapsed if elapsed else 0.0,
+            "turn_p50_ms": latency["p50"] * 1000,
+            "turn_p99_ms": latency["p99"] * 1000,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the booker agent to many concurrent sessions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--queue-size", type=int, default=1024)
+    parser.add_argument("--metrics-port", type=int, help="serve per-node Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    from src.agents.booker import get_graph
+
+    if args.metrics_port:
+        from src._shared.instrumentation import METRICS
+
+        METRICS.serve(args.metrics_port, args.host)
+
+    server = BookerServer(get_graph(), workers=args.workers, queue_size=args.queue_size)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Replay recorded conversations through the compiled agent graphs.
+Input is JSONL, one conversation per line: {"id": "c1", "messages": ["greet John", "check booking 123"]}.
+The file is streamed in chunks and fanned out across a process pool. Inside each worker a chunk advances
+one turn at a time with `graph.batch_as_completed`, so every conversation keeps its order and has its own
+thread_id, and each turn's latency is timed as it completes. A conversation id repeated within a chunk starts
+a new chunk, the two would share a thread_id.
+
+Run with: python -m src.agents.replay transcripts.jsonl --agent booker --output replies.jsonl
+"""
+
+import argparse
+import importlib
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+
+from src._shared.stats import Histogram
+
+# agent name -> "module:factory" returning a compiled graph
+AGENTS = {
+    "booker": "src.agents.booker:get_graph",
+    "weather": "src.agents.weather_agent:get_agent",
+}
+
+_graph = None
+
+
+def load_graph(agent: str):
+    module, factory = AGENTS[agent].split(":")
+    return getattr(importlib.import_module(module), factory)()
+
+
+def _init_worker(agent: str):
+    global _graph
+    _graph = load_graph(agent)
+
+
+def read_conversations(path: str) -> Iterator[dict]:
+    with open(path) as transcript:
+        for line in transcript:
+            if line.strip():
+                yield json.loads(line)
+
+
+def chunked(conversations: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Chunks of at most `size` conversations with distinct ids."""
+    chunk, ids = [], set()
+    for conversation in conversations:
+        if len(chunk) >= size or conversation["id"] in ids:
+            yield chunk
+            chunk, ids = [], set()
+        chunk.append(conversation)
+        ids.add(conversation["id"])
+    if chunk:
+        yield chunk
+
+
+def replay_chunk(conversations: list[dict], graph=None) -> tuple[list[dict], Histogram, Histogram]:
+    """Replay a chunk of conversations, batching the i-th turn of every conversation together."""
+    graph = graph or _graph
+    ids = [conversation["id"] for conversation in conversations]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Conversation ids must be unique within a chunk, they are used as thread_ids")
+    turn_latency, conversation_latency = Histogram(), Histogram()
+    replies = {conversation["id"]: [] for conversation in conversations}
+    histories: dict[str, list] = {conversation["id"]: [] for conversation in conversations}
+    started = time.perf_counter()
+
+    longest = max((len(conversation["messages"]) for conversation in conversations), default=0)
+    for turn in range(longest):
+        active = [conversation for conversation in conversations if turn < len(conversation["messages"])]
+        inputs, configs = [], []
+        for conversation in active:
+            message = ("user", conversation["messages"][turn])
+            if graph.checkpointer is None:
+                # without a checkpointer the graph doesn't remember earlier turns, carry them ourselves
+                inputs.append({"messages": histories[conversation["id"]] + [message]})
+            else:
+                inputs.append({"messages": [message]})
+            configs.append({"configurable": {"thread_id": f"replay-{conversation['id']}"}})
+
+        turn_started = time.perf_counter()
+        outputs = [None] * len(active)
+        # every turn of the batch starts together, the time until it completes is that turn's latency
+        for index, output in graph.batch_as_completed(inputs, configs, return_exceptions=True):
+            turn_latency.record(time.perf_counter() - turn_started)
+            outputs[index] = output
+        for conversation, output in zip(active, outputs):
+            if isinstance(output, Exception):
+                replies[conversation["id"]].append({"error": repr(output)})
+                continue
+            histories[conversation["id"]] = output["messages"]
+            replies[conversation["id"]].append({"reply": output["messages"][-1].content})
+
+        for conversation in active:
+            if turn == len(conversation["messages"]) - 1:
+                conversation_latency.record(time.perf_counter() - started)
+
+    if graph.checkpointer is not None:
+        for conversation in conversations:
+            graph.checkpointer.delete_thread(f"replay-{conversation['id']}")
+    results = [{"id": conversation_id, "turns": turns} for conversation_id, turns in replies.items()]
+    return results, turn_latency, conversation_latency
+
+
+def replay(
+    path: str,
+    agent: str = "booker",
+    workers: int = 4,
+    chunk_size: int = 32,
+    output: Optional[str] = None,
+) -> dict:
+    turn_latency, conversation_latency = Histogram(), Histogram()
+    conversations = 0
+    out = open(output, "w") if output else None
+    started = time.perf_counter()
+
+    def collect(future):
+        nonlocal conversations
+        results, turns, totals = future.result()
+        turn_latency.merge(turns)
+        conversation_latency.merge(totals)
+        conversations += len(results)
+        if out:
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(agent,)) as pool:
+            # keep a bounded number of chunks in flight so memory doesn't depend on the file size
+            pending = set()
+            for chunk in chunked(read_conversations(path), chunk_size):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(pool.submit(replay_chunk, chunk))
+            for future in pending:
+                collect(future)
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "conversations": conversations,
+        "turns": turn_latency.count,
+        "elapsed_s": elapsed,
+        "conversations_per_sec": conversations / elapsed if elapsed else 0.0,
+        "turns_per_sec": turn_latency.count / elapsed if elapsed else 0.0,
+        "turn_latency_ms": {key: value * 1000 for key, value in turn_latency.summary().items() if key != "count"},
+        "conversation_latency_ms": {
+            key: value * 1000 for key, value in conversation_latency.summary().items() if key != "count"
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded conversations through an agent graph.")
+    parser.add_argument("transcripts", help="JSONL file, one conversation per line")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="booker")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=32, help="conversations batched together per worker task")
+    parser.add_argument("--output", help="write the replies to this JSONL file")
+    args = parser.parse_args()
+
+    stats = replay(args.transcripts, args.agent, args.workers, args.chunk_size, args.output)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
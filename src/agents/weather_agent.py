@@ -1,17 +1,57 @@
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
 from dotenv import load_dotenv
-from langgraph.prebuilt import create_react_agent
 
 load_dotenv()
 
+if TYPE_CHECKING:
+    from src.components.response_cache import ResponseCache
+
+MODEL = "gpt-4o-mini"
+
 
 def get_weather(city: str) -> str:
     """Get weather for a given city."""
     return f"It's always sunny in {city}!"
 
 
-agent = create_react_agent(model="gpt-4o-mini", tools=[get_weather], prompt="You are a helpful assistant")
+def build_agent(model=MODEL):
+    """The react agent around `model`, a model name or a chat model instance."""
+    # langgraph.prebuilt pulls in the whole langchain/openai stack, only import it once the agent is needed
+    from langgraph.prebuilt import create_react_agent
+
+    return create_react_agent(model=model, tools=[get_weather], prompt="You are a helpful assistant")
+
+
+@lru_cache(maxsize=None)
+def get_agent(response_cache: Optional["ResponseCache"] = None):
+    if response_cache is None:
+        return build_agent()
+    from langchain.chat_models import init_chat_model
+
+    # opt-in: model calls for a conversation answered recently (or a similar one) are served from the cache
+    return build_agent(init_chat_model(MODEL, model_provider="openai", temperature=0, cache=response_cache))
+
+
+def main(stream: bool = False):
+    inputs = {"messages": [{"role": "user", "content": "what is the weather in sf"}]}
+    if stream:
+        import asyncio
+
+        from src.components.streaming import StdoutSink, stream_turn
+
+        # tokens and tool calls are printed as they arrive
+        result = asyncio.run(stream_turn(get_agent(), inputs, sink=StdoutSink()))
+        print(f"time to first token {result.ttft * 1000:.0f} ms, total {result.latency * 1000:.0f} ms")
+        return
+
+    # Run the agent
+    response = get_agent().invoke(inputs)
+
+    print(response)
 
-# Run the agent
-response = agent.invoke({"messages": [{"role": "user", "content": "what is the weather in sf"}]})
 
-print(response)
+if __name__ == "__main__":
+    main(stream="--stream" in sys.argv)
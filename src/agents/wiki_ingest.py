@@ -0,0 +1,35 @@
+"""
+Build the offline Wikipedia index used by wikicalcu when WIKICALCU_WIKI_INDEX is set.
+Input is a MediaWiki XML dump or a JSONL corpus of {"title", "text"} records, optionally .bz2 or .gz compressed.
+
+Run with: python -m src.agents.wiki_ingest enwiki-latest-pages-articles.xml.bz2 --index wiki.db
+"""
+
+import argparse
+import json
+
+from src.components.wiki_index import IngestStats, WikiIndex, read_jsonl, read_mediawiki_dump
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a Wikipedia dump into a SQLite FTS5 index.")
+    parser.add_argument("source", help="MediaWiki XML dump or JSONL file")
+    parser.add_argument("--index", default="wiki.db")
+    parser.add_argument("--batch-size", type=int, default=1000, help="pages written per transaction")
+    parser.add_argument("--no-optimize", action="store_true", help="skip merging the index segments at the end")
+    args = parser.parse_args()
+
+    records = read_jsonl(args.source) if ".jsonl" in args.source else read_mediawiki_dump(args.source)
+    index = WikiIndex(args.index)
+
+    def progress(stats: IngestStats):
+        print(f"\r{stats.pages:,} pages, {stats.pages_per_sec:,.0f} pages/s", end="", flush=True)
+
+    stats = index.ingest(records, batch_size=args.batch_size, optimize=not args.no_optimize, progress=progress)
+    print()
+    print(json.dumps({**stats.__dict__, "pages_per_sec": stats.pages_per_sec, "indexed": len(index)}, indent=2))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
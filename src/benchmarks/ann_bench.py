@@ -0,0 +1,95 @@
+"""
+Recall@k vs queries per second of IVFIndex against exact FlatIndex search, sweeping nprobe.
+The corpus is clustered like real embeddings: unit vectors scattered around --topics centroids, queries come
+from the same distribution. Recall depends on that structure, uniform random vectors are IVF's worst case.
+After the sweep 10% of the vectors are deleted and as many inserted, to check that deletes never come back
+and recall holds without retraining.
+Run with: python -m src.benchmarks.ann_bench [--size 200000] [--dims 256] [--k 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.components.vector_index import FlatIndex, IVFIndex, normalize
+
+
+def corpus(rng: np.random.Generator, centers: np.ndarray, size: int, spread: float) -> np.ndarray:
+    vectors = np.empty((size, centers.shape[1]), dtype=np.float32)
+    for start in range(0, size, 65_536):
+        count = min(65_536, size - start)
+        noise = rng.standard_normal((count, centers.shape[1]), dtype=np.float32) * (spread / np.sqrt(centers.shape[1]))
+        vectors[start : start + count] = normalize(centers[rng.integers(0, len(centers), count)] + noise)
+    return vectors
+
+
+def build(index, vectors: np.ndarray, batch_size: int = 10_000) -> float:
+    start = time.perf_counter()
+    for first in range(0, len(vectors), batch_size):
+        index.add(np.arange(first, min(first + batch_size, len(vectors))), vectors[first : first + batch_size])
+    return time.perf_counter() - start
+
+
+def qps(index, queries: np.ndarray, k: int, batch: int) -> tuple[float, np.ndarray]:
+    found = []
+    start = time.perf_counter()
+    for first in range(0, len(queries), batch):
+        found.append(index.search(queries[first : first + batch], k)[0])
+    return len(queries) / (time.perf_counter() - start), np.concatenate(found)
+
+
+def recall(found: np.ndarray, exact: np.ndarray) -> float:
+    return float(np.mean([len(np.intersect1d(a, b)) / len(b) for a, b in zip(found, exact)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVFIndex recall vs throughput against exact search.")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=100)
+    parser.add_argument("--spread", type=float, default=1.2, help="noise around the topic centroids")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = normalize(rng.standard_normal((args.topics, args.dims), dtype=np.float32))
+    vectors = corpus(rng, centers, args.size, args.spread)
+    queries = corpus(rng, centers, args.queries, args.spread)
+
+    flat, ivf = FlatIndex(args.dims), IVFIndex(args.dims)
+    flat_build, ivf_build = build(flat, vectors), build(ivf, vectors)
+    print(f"{args.size:,} vectors x {args.dims} dims, recall@{args.k}, {len(ivf.centroids)} lists")
+    print(f"build: flat {flat_build:.1f} s, ivf {ivf_build:.1f} s (incremental, trainings included)")
+    print(f"{'':<16} {'recall':>8} {'QPS':>9} {'QPS x32':>9}")
+    flat_qps, exact = qps(flat, queries, args.k, 1)
+    flat_batch_qps, _ = qps(flat, queries, args.k, 32)
+    print(f"{'exact':<16} {1.0:>8.3f} {flat_qps:>9,.0f} {flat_batch_qps:>9,.0f}")
+    for nprobe in (1, 2, 4, 8, 16, 32, 64, 128):
+        ivf.nprobe = nprobe
+        ivf_qps, found = qps(ivf, queries, args.k, 1)
+        batch_qps, _ = qps(ivf, queries, args.k, 32)
+        print(f"{f'ivf nprobe={nprobe}':<16} {recall(found, exact):>8.3f} {ivf_qps:>9,.0f} {batch_qps:>9,.0f}")
+
+    # churn: delete 10%, insert as many new vectors, no retraining in between
+    deleted = rng.choice(args.size, args.size // 10, replace=False)
+    fresh = corpus(rng, centers, len(deleted), args.spread)
+    fresh_ids = np.arange(args.size, args.size + len(fresh))
+    start = time.perf_counter()
+    ivf.remove(deleted.tolist())
+    ivf.add(fresh_ids, fresh)
+    churn_s = time.perf_counter() - start
+    flat.remove(deleted.tolist())
+    flat.add(fresh_ids, fresh)
+    ivf.nprobe = 16
+    _, exact = qps(flat, queries, args.k, 32)
+    _, found = qps(ivf, queries, args.k, 32)
+    print(
+        f"after deleting and inserting {len(deleted):,} ({churn_s:.1f} s): recall {recall(found, exact):.3f} at nprobe=16, "
+        f"{np.isin(found, deleted).sum()} deleted ids returned"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Load test for the booker server: sessions/sec and p50/p99 turn latency at several concurrency levels.
+Most levels drive sessions in-process through BookerServer.turn, so 10k sessions don't need 10k sockets;
+the socket levels connect real TCP clients, covering the line protocol, connection handling and drain.
+Run with: python -m src.benchmarks.booker_server_bench
+"""
+
+import asyncio
+import time
+
+from src.agents.booker import get_graph
+from src.agents.booker_server import BookerServer
+
+SCRIPT = ["greet Alice", "check booking 123", "room service 123"]
+
+
+async def run_session(server: BookerServer):
+    thread_id = server.open_session()
+    for text in SCRIPT:
+        await server.turn(thread_id, text)
+    await server.close_session(thread_id)
+
+
+async def run_level(concurrency: int, workers: int = 64, queue_size: int = 1024) -> dict[str, float]:
+    server = BookerServer(get_graph(), workers=workers, queue_size=queue_size)
+    await server.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(server) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+    await server.drain()
+    stats["sessions_per_sec"] = concurrency / elapsed
+    return stats
+
+
+async def run_socket_session(port: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for text in SCRIPT:
+        writer.write(f"{text}\n".encode())
+        await writer.drain()
+        reply = await reader.readline()
+        if not reply.startswith(b"AI: "):
+            raise RuntimeError(f"unexpected reply {reply!r}")
+    writer.write(b"quit\n")
+    await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_socket_level(concurrency: int, workers: int = 64, queue_size: int = 1024) -> dict[str, float]:
+    server = BookerServer(get_graph(), workers=workers, queue_size=queue_size)
+    port = await server.listen("127.0.0.1", 0)
+    # one guest connects and never types: drain must not wait for them
+    _idle_reader, idle_writer = await asyncio.open_connection("127.0.0.1", port)
+    start = time.perf_counter()
+    await asyncio.gather(*(run_socket_session(port) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+    start = time.perf_counter()
+    await asyncio.wait_for(server.drain(), timeout=10)
+    stats["drain_ms"] = (time.perf_counter() - start) * 1000
+    idle_writer.close()
+    stats["sessions_per_sec"] = concurrency / elapsed
+    return stats
+
+
+def report(label: str, concurrency: int, stats: dict[str, float]):
+    print(
+        f"{concurrency:>6} sessions {label:<9} {stats['sessions_per_sec']:10.1f} sessions/s  "
+        f"p50 {stats['turn_p50_ms']:8.2f} ms  p99 {stats['turn_p99_ms']:8.2f} ms"
+        + (f"  drain {stats['drain_ms']:.1f} ms" if "drain_ms" in stats else "")
+    )
+
+
+async def main(levels=(1, 100, 10_000), socket_levels=(1, 100)):
+    for concurrency in levels:
+        report("in-proc", concurrency, await run_level(concurrency))
+    for concurrency in socket_levels:
+        report("socket", concurrency, await run_socket_level(concurrency))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
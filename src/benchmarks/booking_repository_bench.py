@@ -0,0 +1,64 @@
+"""
+Per-lookup cost of the booking repositories as the number of bookings grows.
+Run with: python -m src.benchmarks.booking_repository_bench
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from src.components.booking_repository import InMemoryBookingRepository, SQLiteBookingRepository
+
+STATUSES = ("confirmed", "pending", "cancelled")
+
+
+def make_bookings(size: int) -> dict[str, dict]:
+    rng = random.Random(size)
+    return {
+        str(guest_id): {
+            "status": rng.choice(STATUSES),
+            "name": f"Guest {guest_id}",
+            "guests": rng.randint(1, 4),
+            "room": str(rng.randint(100, 100 + size // 4)),
+        }
+        for guest_id in range(size)
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench(label: str, repository, size: int, repeat: int = 2_000):
+    rng = random.Random(0)
+    ids = [str(rng.randrange(size)) for _ in range(repeat)]
+    lookups = iter(ids * 2)
+    get_us = timed(lambda: repository.get(next(lookups)), repeat)
+    get_many_us = timed(lambda: repository.get_many(rng.sample(ids, 100)), repeat // 10)
+    room_us = timed(lambda: repository.find_by_room(str(rng.randint(100, 100 + size // 4))), repeat)
+    status_us = timed(lambda: repository.find_by_status("pending", limit=20), repeat // 10)
+    print(
+        f"{label:<8} {size:>9,}  get {get_us:7.1f} us  get_many(100) {get_many_us:8.1f} us  "
+        f"by room {room_us:7.1f} us  by status {status_us:7.1f} us"
+    )
+
+
+def main(sizes=(1_000, 100_000, 1_000_000)):
+    for size in sizes:
+        bookings = make_bookings(size)
+        bench("memory", InMemoryBookingRepository(bookings), size)
+        with tempfile.TemporaryDirectory() as directory:
+            repository = SQLiteBookingRepository(os.path.join(directory, "bookings.db"))
+            start = time.perf_counter()
+            repository.upsert_many(bookings)
+            print(f"sqlite load {size:,} bookings in {time.perf_counter() - start:.2f}s")
+            bench("sqlite", repository, size)
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Tail latency and LLM calls per request for the wikicalcu loop, with and without an execution budget.
+Stub models with a heavy-tailed latency stand in for OpenAI.
+Run with: python -m src.benchmarks.budget_bench [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from langchain_core.messages import AIMessage
+
+from src.components.budget import Budget, BudgetStats, run_with_budget
+from src.samples import wikicalcu
+
+THINK_REPLY = json.dumps({"thought": "No tool needed.", "need_tool": False, "tool": None, "tool_input": ""})
+
+
+class SlowModel:
+    def __init__(self, reply: str, rng: random.Random, median: float, tail: float):
+        self.reply = reply
+        self.rng = rng
+        self.median = median
+        self.tail = tail
+
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        # mostly around the median, one call in twenty is a slow outlier
+        latency = self.tail if self.rng.random() < 0.05 else self.rng.uniform(0.5, 1.5) * self.median
+        await asyncio.sleep(latency)
+        return AIMessage(self.reply)
+
+    async def astream(self, prompt: str):
+        yield await self.ainvoke(prompt)
+
+
+class SlowModels:
+    def __init__(self, median: float, tail: float, seed: int = 7):
+        rng = random.Random(seed)
+        self.models = {0: SlowModel(THINK_REPLY, rng, median, tail), 0.7: SlowModel("Done.", rng, median, tail)}
+
+    def get(self, model: str = "", temperature: float = 0.0):
+        return self.models[temperature]
+
+
+async def run(requests: int, budget: Budget, median: float, tail: float) -> BudgetStats:
+    stats = BudgetStats()
+    config = {"configurable": {"models": SlowModels(median, tail)}}
+    await asyncio.gather(
+        *(
+            run_with_budget(wikicalcu.app, wikicalcu.AgentState(current_input=f"q{i}"), budget, config, stats=stats)
+            for i in range(requests)
+        )
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wikicalcu with and without an execution budget.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--median-ms", type=float, default=20.0, help="typical LLM call latency")
+    parser.add_argument("--tail-ms", type=float, default=1000.0, help="latency of the slow 5% of calls")
+    args = parser.parse_args()
+    median, tail = args.median_ms / 1000, args.tail_ms / 1000
+
+    print(f"{'':<28} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'LLM calls':>10}  stopped")
+    for label, budget in [
+        ("unbounded (recursion limit)", Budget(deadline=None, max_llm_calls=None, max_tool_calls=None)),
+        ("4 LLM calls", Budget(deadline=None, max_llm_calls=4, max_tool_calls=2)),
+        ("4 LLM calls, 250 ms", Budget(deadline=0.25, max_llm_calls=4, max_tool_calls=2)),
+    ]:
+        stats = asyncio.run(run(args.requests, budget, median, tail))
+        elapsed = stats.elapsed.summary()
+        print(
+            f"{label:<28} {elapsed['p50'] * 1000:>8.0f} {elapsed['p99'] * 1000:>8.0f} {elapsed['max'] * 1000:>8.0f} "
+            f"{stats.llm_calls.summary()['mean']:>10.1f}  {dict(stats.stopped)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
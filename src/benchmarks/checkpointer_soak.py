@@ -0,0 +1,78 @@
+"""
+Soak test for BoundedMemorySaver: a chat-shaped graph with an ever-growing `add_messages` history,
+driven for many turns across many threads. RSS should level off once the bounds are reached.
+tests/test_bounded_checkpointer.py runs a short version and asserts the bounds.
+Run with: python -m src.benchmarks.checkpointer_soak --turns 1000000
+"""
+
+import argparse
+import random
+import resource
+import time
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from src.components.bounded_checkpointer import BoundedMemorySaver
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def reply(state: State):
+    return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        # ru_maxrss is the peak, not the current value, but is the best we have off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=50_000)
+    parser.add_argument("--report-every", type=int, default=50_000)
+    parser.add_argument("--unbounded", action="store_true", help="use the stock InMemorySaver for comparison")
+    args = parser.parse_args()
+
+    if args.unbounded:
+        checkpointer = InMemorySaver()
+    else:
+        checkpointer = BoundedMemorySaver(max_threads=2_000, max_bytes=64 * 1024 * 1024, ttl=600)
+
+    graph = build_graph(checkpointer)
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for turn in range(1, args.turns + 1):
+        config = {"configurable": {"thread_id": str(rng.randrange(args.threads))}}
+        graph.invoke({"messages": [HumanMessage(content=f"message {turn}")]}, config)
+        if turn % args.report_every == 0:
+            gauges = checkpointer.stats() if isinstance(checkpointer, BoundedMemorySaver) else {}
+            print(
+                f"turn {turn:>9,}  rss {rss_mb():8.1f} MB  {turn / (time.perf_counter() - start):8.0f} turns/s  "
+                f"threads {gauges.get('resident_threads', len(checkpointer.storage)):>6}  "
+                f"bytes {gauges.get('resident_bytes', 0) / 1024 / 1024:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Cost of filling a VectorStore with memories: one put per memory (one embedding request each), put_many
+(one request per batch), and put_many through CachedEmbeddings, cold and then after a restart that reuses
+the cache file. The embedder is FakeEmbeddings behind a fixed latency per request plus a little per text,
+like a remote API. Memories repeat texts ("pizza", "coffee") the way user preferences do.
+A second table tunes the request size for aput_many, which sends `max_concurrency` requests at once.
+Run with: python -m src.benchmarks.embedding_cache_bench [--items 1000] [--call-ms 30] [--text-ms 0.5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from src.benchmarks.fakes import FakeEmbeddings
+from src.components.embedding_cache import CachedEmbeddings
+from src.components.vector_store import VectorStore
+
+NAMESPACE = ("1", "memories")
+
+
+class RemoteEmbeddings(Embeddings):
+    """FakeEmbeddings that take `call_latency` + `text_latency` per text seconds per request, and count them."""
+
+    def __init__(self, call_latency: float, text_latency: float, dims: int = 64):
+        self.embeddings = FakeEmbeddings(dims)
+        self.call_latency = call_latency
+        self.text_latency = text_latency
+        self.requests = 0
+        self.texts = 0
+
+    def _latency(self, texts: list[str]) -> float:
+        self.requests += 1
+        self.texts += len(texts)
+        return self.call_latency + self.text_latency * len(texts)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self._latency(texts))
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self._latency(texts))
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+def memories(count: int, seed: int = 5) -> list[tuple]:
+    """Two indexed fields per memory, drawn from a vocabulary a third the size of the texts."""
+    rng = random.Random(seed)
+    foods = [f"likes dish {i}" for i in range(count // 3)]
+    drinks = [f"drinks beverage {i}" for i in range(count // 3)]
+    return [
+        (NAMESPACE, f"m{i}", {"food_preferences": [rng.choice(foods)], "drink_preferences": [rng.choice(drinks)]})
+        for i in range(count)
+    ]
+
+
+def store(embeddings: Embeddings) -> VectorStore:
+    return VectorStore(index={"embed": embeddings, "dims": 64, "fields": ["food_preferences", "drink_preferences"]})
+
+
+def fill(label: str, embed: Embeddings, remote: RemoteEmbeddings, write):
+    requests, texts = remote.requests, remote.texts
+    start = time.perf_counter()
+    write(store(embed))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:>8.2f} {remote.requests - requests:>9} {remote.texts - texts:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched, cached embedding of store writes.")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--call-ms", type=float, default=30.0, help="latency of each embedding request")
+    parser.add_argument("--text-ms", type=float, default=0.5, help="added latency per text in a request")
+    args = parser.parse_args()
+
+    items = memories(args.items)
+    remote = RemoteEmbeddings(args.call_ms / 1000, args.text_ms / 1000)
+    distinct = {text for _, _, value in items for texts in value.values() for text in texts}
+    print(f"{args.items:,} memories, {2 * args.items:,} texts, {len(distinct):,} distinct")
+    print(f"{'':<34} {'seconds':>8} {'requests':>9} {'texts':>9}")
+
+    def put_each(target: VectorStore):
+        for namespace, key, value in items:
+            target.put(namespace, key, value)
+
+    fill("put, one per memory", remote, remote, put_each)
+    fill("put + cache", CachedEmbeddings(remote), remote, put_each)
+    fill("put_many", remote, remote, lambda target: target.put_many(items))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "embeddings.db")
+        cached = CachedEmbeddings(remote, path=path)
+        fill("put_many + cache, cold", cached, remote, lambda target: target.put_many(items))
+        cached.close()
+        # a new process: fresh store and cache object, same file
+        cached = CachedEmbeddings(remote, path=path)
+        fill("put_many + cache, after restart", cached, remote, lambda target: target.put_many(items))
+        cached.close()
+
+    print("\naput_many, 4 requests in flight, each run with an empty cache")
+    print(f"{'batch_size':<34} {'seconds':>8} {'requests':>9} {'texts':>9}")
+    for batch_size in (16, 64, 256, 1024, 2048):
+        batched = CachedEmbeddings(remote, batch_size=batch_size, max_concurrency=4)
+        fill(f"{batch_size}", batched, remote, lambda target: asyncio.run(target.aput_many(items, batch_size=10_000)))
+        batched.close()
+
+
+if __name__ == "__main__":
+    main()
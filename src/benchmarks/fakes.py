@@ -0,0 +1,67 @@
+"""
+Offline stand-ins for the OpenAI models, so benchmarks run without network access or API keys.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from itertools import cycle
+from typing import Iterable, Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGenerationChunk
+
+
+@lru_cache(maxsize=65536)
+def _token_vector(token: str, dims: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dims)
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings: texts sharing words get similar, unit length vectors."""
+
+    def __init__(self, dims: int = 64):
+        self.dims = dims
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = np.zeros(self.dims)
+        for token in text.lower().split():
+            vector += _token_vector(token, self.dims)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class StubChatModel(GenericFakeChatModel):
+    """Replays scripted replies forever. Tool binding is a no-op, the script decides which tools get called."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        # word by word like the parent, plus the tool calls it leaves out
+        message = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs).generations[0].message
+        chunks = [AIMessageChunk(content=token, id=message.id) for token in re.split(r"(\s)", message.content) if token]
+        if message.tool_calls:
+            tool_call_chunks = [
+                tool_call_chunk(name=call["name"], args=json.dumps(call["args"]), id=call["id"], index=index)
+                for index, call in enumerate(message.tool_calls)
+            ]
+            chunks.append(AIMessageChunk(content="", id=message.id, tool_call_chunks=tool_call_chunks))
+        for chunk in chunks:
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+
+def stub_chat_model(replies: Iterable[AIMessage]) -> StubChatModel:
+    return StubChatModel(messages=cycle(list(replies)))
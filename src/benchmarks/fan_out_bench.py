@@ -0,0 +1,126 @@
+"""
+Tool fan-out with mixed-latency stub tools: the bare asyncio.gather from the old parallel_tool_call.py sketch
+vs a Send-based graph running the tools through FanOutExecutor.
+Most tools answer in tens of milliseconds, a few take seconds, one hangs and one fails.
+Run with: python -m src.benchmarks.fan_out_bench [--tools 20] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Annotated, Dict
+
+from langchain_core.tools import StructuredTool
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+from pydantic import BaseModel, Field
+
+from src._shared.stats import summarize
+from src.components.fan_out import FanOutExecutor, fan_out_status, merge_outputs
+
+HANG = 3600.0
+
+
+def make_tools(count: int, seed: int = 3) -> dict[str, StructuredTool]:
+    rng = random.Random(seed)
+    latencies = [rng.lognormvariate(-3.0, 0.6) for _ in range(count)]  # median about 50 ms
+    latencies[1] = latencies[2] = 2.0
+    latencies[3] = HANG
+
+    def make(name: str, latency: float, fails: bool) -> StructuredTool:
+        async def call(query: str) -> str:
+            await asyncio.sleep(latency)
+            if fails:
+                raise ConnectionError("upstream returned 503")
+            return f"{name}: {query}"
+
+        return StructuredTool.from_function(coroutine=call, name=name, description=name)
+
+    return {f"tool_{i}": make(f"tool_{i}", latency, fails=i == 4) for i, latency in enumerate(latencies)}
+
+
+class State(BaseModel):
+    query: str = ""
+    tools_output: Annotated[Dict[str, dict], merge_outputs] = Field(default_factory=dict)
+    status: str = "RUNNING"
+
+
+class ToolCall(BaseModel):
+    tool: str
+    tool_input: str
+
+
+def build(tools: dict, executor: FanOutExecutor):
+    async def run_tool(call: ToolCall) -> dict:
+        return {"tools_output": {call.tool: await executor.run(tools[call.tool], call.tool_input)}}
+
+    workflow = StateGraph(State)
+    workflow.add_node("run_tool", run_tool, input=ToolCall)
+    workflow.add_node("collect", lambda state: {"status": fan_out_status(state.tools_output)})
+    workflow.add_conditional_edges(
+        START, lambda state: [Send("run_tool", ToolCall(tool=name, tool_input=state.query)) for name in tools]
+    )
+    workflow.add_edge("run_tool", "collect")
+    workflow.add_edge("collect", END)
+    return workflow.compile()
+
+
+async def legacy(tools: dict, query: str, patience: float) -> tuple[list[float], int]:
+    """The old sketch: gather every tool, nothing comes back before all of them have."""
+    start = time.perf_counter()
+    try:
+        async with asyncio.timeout(patience):
+            results = await asyncio.gather(*(tool.ainvoke(query) for tool in tools.values()))
+        return [time.perf_counter() - start] * len(results), len(results)
+    except Exception:
+        return [], 0
+
+
+async def fan_out(graph, query: str) -> tuple[list[float], int]:
+    arrivals, ok = [], 0
+    start = time.perf_counter()
+    async for update in graph.astream(State(query=query), stream_mode="updates"):
+        for result in update.get("run_tool", {}).get("tools_output", {}).values():
+            arrivals.append(time.perf_counter() - start)
+            ok += result["ok"]
+    return arrivals, ok
+
+
+def report(label: str, runs: list[tuple[list[float], int]], tools: int):
+    first = summarize([arrivals[0] for arrivals, _ in runs if arrivals])
+    last = summarize([arrivals[-1] for arrivals, _ in runs if arrivals])
+    first_ms, last_ms = (f"{first['p50'] * 1000:.0f}", f"{last['p50'] * 1000:.0f}") if first["count"] else ("-", "-")
+    ok = sum(count for _, count in runs) / len(runs)
+    print(f"{label:<34} {first_ms:>12} {last_ms:>12} {ok:>7.1f}/{tools}")
+
+
+async def run(tools_count: int, requests: int, max_concurrency: int, timeout: float):
+    tools = make_tools(tools_count)
+    executor = FanOutExecutor(max_concurrency=max_concurrency, default_timeout=timeout)
+    graph = build(tools, executor)
+    patience = timeout * 2
+
+    print(
+        f"{requests} concurrent requests x {tools_count} tools, global limit {max_concurrency}, {timeout:g} s deadline"
+    )
+    print(f"{'':<34} {'first ms p50':>12} {'last ms p50':>12} {'results ok':>10}")
+    runs = await asyncio.gather(*(legacy(tools, f"q{i}", patience) for i in range(requests)))
+    report(f"asyncio.gather (gave up at {patience:g} s)", runs, tools_count)
+    runs = await asyncio.gather(*(fan_out(graph, f"q{i}") for i in range(requests)))
+    report("Send + FanOutExecutor", runs, tools_count)
+    print(f"peak tool calls in flight: {executor.peak_in_flight} (limit {max_concurrency})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent tool fan-out with mixed-latency tools.")
+    parser.add_argument("--tools", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-tool deadline in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.tools, args.requests, args.max_concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
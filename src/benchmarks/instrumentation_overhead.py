@@ -0,0 +1,93 @@
+"""
+Overhead of src._shared.instrumentation on the graph_nodes.py toy graph.
+Reports the direct cost of the node wrapper per call and as a share of an invoke, then the end-to-end
+difference between plain and instrumented graphs next to an A/A run of two plain graphs: on a noisy host the
+end-to-end number is only meaningful once it stands clear of the A/A one.
+Run with: python -m src.benchmarks.instrumentation_overhead
+"""
+
+import gc
+import statistics
+import time
+import timeit
+from operator import add
+from typing import Annotated
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from src._shared.instrumentation import GraphMetrics, instrument, instrument_node
+
+
+class State(TypedDict):
+    foo: str
+    bar: Annotated[list[str], add]
+
+
+def node_a(state: State):
+    return {"foo": "a", "bar": ["a"]}
+
+
+def node_b(state: State):
+    return {"foo": "b", "bar": ["b"]}
+
+
+def build(metrics=None):
+    workflow = StateGraph(State)
+    if metrics is not None:
+        instrument(workflow, "graph_nodes", metrics)
+    workflow.add_node(node_a)
+    workflow.add_node(node_b)
+    workflow.add_edge(START, "node_a")
+    workflow.add_edge("node_a", "node_b")
+    workflow.add_edge("node_b", END)
+    return workflow.compile(checkpointer=InMemorySaver())
+
+
+def timed(graph, runs: int) -> float:
+    start = time.perf_counter()
+    for run in range(runs):
+        graph.invoke({"foo": ""}, {"configurable": {"thread_id": str(run)}})
+    return time.perf_counter() - start
+
+
+def interleaved(left, right, runs: int, rounds: int) -> float:
+    """Relative difference of the median times of graphs built with `right` over `left` metrics."""
+    # interleave rounds, alternating which side goes first, and compare medians.
+    # Fresh graphs every round, so neither side is slowed down by a growing checkpointer.
+    left_times, right_times = [], []
+    for round_ in range(rounds):
+        pair = [(left, left_times), (right, right_times)]
+        for graph_metrics, times in pair if round_ % 2 else reversed(pair):
+            graph = build(graph_metrics)
+            gc.collect()
+            times.append(timed(graph, runs))
+    return statistics.median(right_times) / statistics.median(left_times) - 1
+
+
+def wrapper_cost(calls: int = 200_000) -> float:
+    """Seconds the wrapper adds to one node call."""
+    state = {"foo": "", "bar": ["a", "b"]}
+    wrapped = instrument_node(node_a, "graph_nodes", "node_a", GraphMetrics())
+    plain_s = min(timeit.repeat(lambda: node_a(state), number=calls, repeat=5))
+    wrapped_s = min(timeit.repeat(lambda: wrapped(state), number=calls, repeat=5))
+    return (wrapped_s - plain_s) / calls
+
+
+def main(runs: int = 500, rounds: int = 40):
+    metrics = GraphMetrics()
+    timed(build(), 200), timed(build(metrics), 200)
+
+    invoke_s = timed(build(), runs) / runs
+    cost = wrapper_cost()
+    # two nodes per invoke
+    print(f"plain invoke  {invoke_s * 1e6:8.1f} us")
+    print(f"wrapper       {cost * 1e6:8.2f} us/node call, {2 * cost / invoke_s * 100:.2f}% of an invoke")
+    print(f"end to end    {interleaved(None, metrics, runs, rounds) * 100:+.2f}% instrumented vs plain")
+    print(f"noise         {interleaved(None, None, runs, rounds) * 100:+.2f}% plain vs plain (A/A)")
+    print(f"{len(metrics.to_prometheus().splitlines())} lines of Prometheus text exported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Connection reuse in the wikicalcu nodes: a ChatOpenAI per call (the old behavior) vs the shared ModelRegistry.
+Runs think() + generate_response() against the local OpenAI stub, no network access needed.
+Run with: python -m src.benchmarks.llm_pool_bench [--steps 200] [--connect-delay-ms 20]
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+
+from langchain_openai import ChatOpenAI
+
+from src.benchmarks.openai_stub import OpenAIStub, start_in_thread
+from src.components.llm_clients import DEFAULT_MODEL, ModelRegistry
+
+
+class UnpooledModels:
+    """Builds a new client, and so a new connection pool, on every get() like the nodes used to."""
+
+    def __init__(self, base_url: str, api_key: str):
+        self.base_url = base_url
+        self.api_key = api_key
+
+    def get(self, model: str = DEFAULT_MODEL, temperature: float = 0.0) -> ChatOpenAI:
+        return ChatOpenAI(model=model, temperature=temperature, base_url=self.base_url, api_key=self.api_key)
+
+
+async def run_steps(models, steps: int) -> float:
+    from src.samples.wikicalcu import AgentState, generate_response, think
+
+    config = {"configurable": {"models": models}}
+    state = AgentState(current_input="What is 5 times 12 plus 8?")
+    start = time.perf_counter()
+    for _ in range(steps):
+        state = await think(state, config)
+        state = await generate_response(state, config)
+    return time.perf_counter() - start
+
+
+async def compare(base_url: str, stub: OpenAIStub, steps: int):
+    requests = steps * 2
+    registry = ModelRegistry(base_url=base_url, api_key="stub")
+    for label, models in [("client per call", UnpooledModels(base_url, "stub")), ("shared registry", registry)]:
+        connections = stub.connections
+        elapsed = await run_steps(models, steps)
+        opened = stub.connections - connections
+        print(f"{label:<16} {elapsed / requests * 1000:8.2f} ms/request  {opened:5d} connections opened")
+        # the per-call clients close their pools when collected, let that happen while the loop still runs
+        gc.collect()
+        await asyncio.sleep(0.1)
+    await registry.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection reuse in the wikicalcu nodes.")
+    parser.add_argument("--steps", type=int, default=200, help="think + generate_response pairs")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated generation time per request")
+    parser.add_argument("--connect-delay-ms", type=float, default=20.0, help="simulated TCP + TLS handshake")
+    args = parser.parse_args()
+
+    stub = OpenAIStub(latency=args.latency_ms / 1000, connect_delay=args.connect_delay_ms / 1000)
+    base_url = start_in_thread(stub)
+    print(f"{args.steps * 2} requests, {args.latency_ms} ms generation, {args.connect_delay_ms} ms per new connection")
+    asyncio.run(compare(base_url, stub, args.steps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+A local OpenAI-compatible chat completions server for offline benchmarks.
+Serves POST /v1/chat/completions (plain and streamed) over HTTP/1.1 keep-alive, and GET /stats.
+
+--connect-delay-ms is paid once per new connection and stands in for the TCP and TLS handshakes to a
+remote API, --latency-ms is paid on every request and stands in for generation time.
+
+Run with: python -m src.benchmarks.openai_stub --port 8799 --connect-delay-ms 30 --latency-ms 10
+Then point a client at it: ChatOpenAI(base_url="http://127.0.0.1:8799/v1", api_key="stub")
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+# Prompts asking for the wikicalcu think() JSON get a decision back, everything else gets prose
+THINK_MARKER = "Return in JSON format"
+THINK_REPLY = json.dumps({"thought": "No tool is needed for this.", "need_tool": False, "tool": None, "tool_input": ""})
+TEXT_REPLY = "Here is a clear and helpful response to your question."
+
+
+class OpenAIStub:
+    def __init__(self, latency: float = 0.0, connect_delay: float = 0.0):
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.requests = 0
+
+    def reply_for(self, payload: dict) -> str:
+        prompt = " ".join(str(message.get("content", "")) for message in payload.get("messages", []))
+        return THINK_REPLY if THINK_MARKER in prompt else TEXT_REPLY
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                self.requests += 1
+
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    await self.completion(writer, json.loads(body or b"{}"))
+                elif method == "GET" and path == "/stats":
+                    self.respond(writer, 200, {"connections": self.connections, "requests": self.requests})
+                else:
+                    self.respond(writer, 404, {"error": {"message": f"no route for {method} {path}"}})
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, writer: asyncio.StreamWriter, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+
+    async def completion(self, writer: asyncio.StreamWriter, payload: dict):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        content = self.reply_for(payload)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = payload.get("model", "stub")
+        if not payload.get("stream"):
+            self.respond(
+                writer,
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                    ],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                },
+            )
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        words = content.split(" ")
+        deltas = [{"role": "assistant", "content": ""}]
+        deltas += [{"content": word if index == 0 else f" {word}"} for index, word in enumerate(words)]
+        for delta in deltas:
+            self.write_event(writer, completion_id, created, model, delta, None)
+        self.write_event(writer, completion_id, created, model, {}, "stop")
+        self.write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+
+    def write_event(self, writer, completion_id: str, created: int, model: str, delta: dict, finish_reason):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.write_chunk(writer, f"data: {json.dumps(chunk)}\n\n".encode())
+
+    @staticmethod
+    def write_chunk(writer, data: bytes):
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8799) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def start_in_thread(stub: OpenAIStub, host: str = "127.0.0.1", port: int = 0) -> str:
+    """Run `stub` on its own event loop in a daemon thread and return its base URL."""
+    ready = threading.Event()
+    address = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(stub.serve(host, port))
+        address["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return f"http://{host}:{address['port']}/v1"
+
+
+async def main(host: str, port: int, latency: float, connect_delay: float):
+    server = await OpenAIStub(latency, connect_delay).serve(host, port)
+    print(f"OpenAI stub listening on http://{host}:{port}/v1")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.latency_ms / 1000, args.connect_delay_ms / 1000))
@@ -0,0 +1,133 @@
+"""
+Warm start of PersistentVectorStore: fill a namespace, close, reopen and search straight from the memory map.
+Reports the fill time (what rebuilding an in-memory store costs before any real embedding spend), the time
+to reopen, the heap (RssAnon) and mapped (RssFile) memory after reopening, search latency, and searches
+during the background compaction that follows deleting 40% of the memories. The page cache is warm, as on a
+restart of the same host.
+Run with: python -m src.benchmarks.persistent_store_bench [--size 200000] [--dims 1536] [--dtype float16]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langgraph.store.base import PutOp
+
+from src._shared.stats import summarize
+from src.components.persistent_store import PersistentVectorStore
+
+NAMESPACE = ("1", "memories")
+
+
+class BatchEmbeddings(Embeddings):
+    """Random vectors seeded by the first text of each request: cheap, and no table held in memory."""
+
+    def __init__(self, dims: int):
+        self.dims = dims
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        rng = np.random.default_rng(zlib.crc32(texts[0].encode()))
+        return rng.standard_normal((len(texts), self.dims), dtype=np.float32).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def memory_kb() -> dict[str, int]:
+    with open("/proc/self/status") as status:
+        fields = dict(line.split(":", 1) for line in status)
+    return {name: int(fields[name].split()[0]) for name in ("RssAnon", "RssFile")}
+
+
+def directory_bytes(path: str) -> int:
+    # allocated blocks: the unused tail of a vector file is sparse
+    return sum(os.stat(os.path.join(root, name)).st_blocks * 512 for root, _, names in os.walk(path) for name in names)
+
+
+def latency(store, queries: int) -> dict:
+    samples = []
+    for i in range(queries):
+        start = time.perf_counter()
+        store.search(NAMESPACE, query=f"query {i}", limit=10)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PersistentVectorStore fill, reopen, search and compaction.")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    config = {"embed": BatchEmbeddings(args.dims), "dims": args.dims, "fields": ["text"]}
+    path = tempfile.mkdtemp(prefix="persistent_store_bench-")
+    try:
+        store = PersistentVectorStore(path, index=config, dtype=args.dtype)
+        start = time.perf_counter()
+        for first in range(0, args.size, 10_000):
+            store.put_many(
+                (NAMESPACE, f"m{i}", {"text": f"memory {i}"}) for i in range(first, min(first + 10_000, args.size))
+            )
+        fill_s = time.perf_counter() - start
+        store.close()
+        del store
+        print(
+            f"{args.size:,} memories x {args.dims} dims {args.dtype}, {directory_bytes(path) / 2**20:,.0f} MB on disk"
+        )
+        print(f"fill: {fill_s:.1f} s")
+
+        before = memory_kb()
+        start = time.perf_counter()
+        store = PersistentVectorStore(path, index=config)
+        open_s = time.perf_counter() - start
+        opened = memory_kb()
+        first_s = latency(store, 1)["max"]
+        searched = latency(store, args.queries)
+        after = memory_kb()
+        print(
+            f"reopen: {open_s:.2f} s, heap +{(opened['RssAnon'] - before['RssAnon']) / 1024:,.0f} MB, "
+            f"mapped +{(opened['RssFile'] - before['RssFile']) / 1024:,.0f} MB"
+        )
+        print(
+            f"search: first {first_s * 1000:.0f} ms, then p50 {searched['p50'] * 1000:.1f} ms, "
+            f"p99 {searched['p99'] * 1000:.1f} ms; heap +{(after['RssAnon'] - before['RssAnon']) / 1024:,.0f} MB, "
+            f"mapped +{(after['RssFile'] - before['RssFile']) / 1024:,.0f} MB"
+        )
+
+        deleted = np.random.default_rng(1).choice(args.size, int(args.size * 0.4), replace=False)
+        start = time.perf_counter()
+        for first in range(0, len(deleted), 10_000):
+            store.batch([PutOp(NAMESPACE, f"m{i}", None) for i in deleted[first : first + 10_000].tolist()])
+        delete_s = time.perf_counter() - start
+        # keep searching while the compaction runs, the swap happens in one of these calls
+        samples = []
+        start = time.perf_counter()
+        while store._compacting:
+            samples.append(latency(store, 1)["max"])
+        compact_s = time.perf_counter() - start
+        during = summarize(samples or [0.0])
+        stats = store.stats()
+        start = time.perf_counter()
+        store.close()
+        close_s = time.perf_counter() - start
+        print(
+            f"delete {len(deleted):,}: {delete_s:.1f} s, then {stats['compactions']} background compaction(s) in "
+            f"{compact_s:.1f} s, {stats['dead_vectors']:,} dead vectors left"
+        )
+        print(
+            f"searches meanwhile: p50 {during['p50'] * 1000:.1f} ms, max {during['max'] * 1000:.0f} ms (incl. the swap); "
+            f"close {close_s:.1f} s, {directory_bytes(path) / 2**20:,.0f} MB on disk after"
+        )
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Memory saved vs recall lost by QuantizedIndex, against exact float32 search (FlatIndex), on the clustered
+corpus of ann_bench. Memory is the index's heap: codes, ids and codec for QuantizedIndex, whose float32
+vectors for rescoring live in a memory-mapped file instead (the "disk MB" column, 0 without rescoring).
+Run with: python -m src.benchmarks.quantization_bench [--size 100000] [--dims 1536] [--k 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.benchmarks.ann_bench import build, corpus, qps, recall
+from src.components.quantized_index import QuantizedIndex
+from src.components.vector_index import FlatIndex, normalize
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized index memory and recall against exact search.")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=100)
+    parser.add_argument("--spread", type=float, default=1.2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = normalize(rng.standard_normal((args.topics, args.dims), dtype=np.float32))
+    vectors = corpus(rng, centers, args.size, args.spread)
+    queries = corpus(rng, centers, args.queries, args.spread)
+
+    flat = FlatIndex(args.dims)
+    build(flat, vectors)
+    flat_qps, exact = qps(flat, queries, args.k, 1)
+    print(f"{args.size:,} vectors x {args.dims} dims, recall@{args.k}")
+    print(f"{'':<22} {'heap MB':>8} {'smaller':>8} {'disk MB':>8} {'recall':>8} {'QPS':>7} {'build s':>8}")
+    print(
+        f"{'float32 exact':<22} {flat.nbytes / 2**20:>8.1f} {1.0:>7.1f}x {0:>8} {1.0:>8.3f} {flat_qps:>7,.0f} {'-':>8}"
+    )
+    setups = [
+        ("int8", {"codec": "int8", "rescore": 0}),
+        ("int8, rescore 2x", {"codec": "int8", "rescore": 2}),
+        ("int8, rescore 4x", {"codec": "int8", "rescore": 4}),
+        ("pq/8", {"codec": "pq", "rescore": 0}),
+        ("pq/8, rescore 30x", {"codec": "pq", "rescore": 30}),
+        ("pq/8, rescore 100x", {"codec": "pq", "rescore": 100}),
+        ("pq/4, rescore 30x", {"codec": "pq", "subvector": 4, "rescore": 30}),
+    ]
+    for label, options in setups:
+        index = QuantizedIndex(args.dims, **options)
+        build_s = build(index, vectors)
+        index_qps, found = qps(index, queries, args.k, 1)
+        disk = index._originals.nbytes / 2**20 if index._originals is not None else 0
+        print(
+            f"{label:<22} {index.nbytes / 2**20:>8.1f} {flat.nbytes / index.nbytes:>7.1f}x {disk:>8.0f} "
+            f"{recall(found, exact):>8.3f} {index_qps:>7,.0f} {build_s:>8.1f}"
+        )
+        del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Model calls saved by the ResponseCache on wikicalcu's think node, replaying a workload of repeated and
+reworded questions: 500 questions drawn by Zipf popularity, half of the repeats reworded ("please ...",
+different case, no question mark). A stub model answers each question with its own tool_input, so a
+semantic hit that returns the plan of a question with another answer ("5 times 12" for "5 times 13") is wrong.
+Embeddings are the deterministic bag-of-words fakes.
+Run with: python -m src.benchmarks.response_cache_bench [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+from langchain_core.messages import AIMessageChunk
+
+from src.benchmarks.fakes import FakeEmbeddings
+from src.components.response_cache import ResponseCache
+from src.samples import wikicalcu
+
+PEOPLE = ["Ada Lovelace", "Alan Turing", "Grace Hopper", "Marie Curie", "Niels Bohr", "Emmy Noether"]
+CITIES = ["Paris", "Lisbon", "Kyoto", "Nairobi", "Lima", "Oslo", "Hanoi", "Quebec"]
+
+
+def make_questions(count: int, rng: random.Random) -> dict[str, tuple[str, str]]:
+    """question -> (tool, tool_input) the model plans for it"""
+    questions = {}
+    while len(questions) < count:
+        kind = rng.randrange(3)
+        if kind == 0:
+            a, b, c = rng.randint(2, 20), rng.randint(2, 20), rng.randint(1, 9)
+            questions[f"What is {a} times {b} plus {c}?"] = ("python_repl", f"print({a} * {b} + {c})")
+        elif kind == 1:
+            person = rng.choice(PEOPLE)
+            topic = rng.choice(["born", "famous", "educated", "remembered"])
+            questions[f"Where was {person} {topic}?"] = ("wikipedia", f"{person} {topic}")
+        else:
+            city = rng.choice(CITIES)
+            fact = rng.choice(["population", "history", "climate", "mayor", "area", "founding"])
+            questions[f"What is the {fact} of {city}?"] = ("wikipedia", f"{city} {fact}")
+    return questions
+
+
+def reword(question: str, rng: random.Random) -> str:
+    return rng.choice(
+        [
+            lambda q: "Please tell me: " + q,
+            lambda q: q.lower(),
+            lambda q: q.rstrip("?"),
+            lambda q: q.replace(" ", "  "),
+        ]
+    )(question)
+
+
+def make_workload(questions: list[str], requests: int, rng: random.Random) -> list[tuple[str, str]]:
+    """(asked, original question) pairs"""
+    weights = 1 / np.arange(1, len(questions) + 1) ** 1.1
+    picks = np.random.default_rng(rng.randrange(2**32)).choice(len(questions), requests, p=weights / weights.sum())
+    seen = set()
+    workload = []
+    for pick in picks:
+        question = questions[pick]
+        asked = reword(question, rng) if question in seen and rng.random() < 0.5 else question
+        seen.add(question)
+        workload.append((asked, question))
+    return workload
+
+
+def same_answer(tool_input: str, expected: str) -> bool:
+    # bag-of-words embeddings can't tell "2 times 15" from "15 times 2", which is fine for the answer
+    if expected.startswith("print("):
+        return tool_input.startswith("print(") and eval(tool_input[6:-1]) == eval(expected[6:-1])
+    return tool_input == expected
+
+
+class PlanningModel:
+    """Streams the plan for the question in the prompt, counting calls."""
+
+    def __init__(self, plans: dict[str, tuple[str, str]]):
+        self.plans = plans
+        self.calls = 0
+
+    async def astream(self, prompt: str):
+        self.calls += 1
+        asked = prompt.split("User input: ", 1)[1].split("\n", 1)[0]
+        tool, tool_input = self.plans[asked]
+        reply = json.dumps({"need_tool": True, "tool": tool, "tool_input": tool_input, "thought": "Use " + tool})
+        for start in range(0, len(reply), 8):
+            yield AIMessageChunk(content=reply[start : start + 8])
+
+
+class StubModels:
+    def __init__(self, model: PlanningModel):
+        self.model = model
+
+    def get(self, model: str = "", temperature: float = 0.0):
+        return self.model
+
+
+class EchoTool:
+    async def ainvoke(self, tool_input: str) -> str:
+        return tool_input
+
+    __call__ = ainvoke
+
+
+async def replay(workload, plans, expected, cache) -> dict:
+    model = PlanningModel(plans)
+    config = {"configurable": {"models": StubModels(model), "response_cache": cache}}
+    wrong = 0
+    start = time.perf_counter()
+    for asked, question in workload:
+        update = await wikicalcu.think(wikicalcu.AgentState(current_input=asked), config)
+        wrong += not same_answer(update["tool_input"], expected[question][1])
+    return {"calls": model.calls, "wrong": wrong, "elapsed_s": time.perf_counter() - start}
+
+
+async def run(requests: int, questions_count: int, dims: int):
+    rng = random.Random(5)
+    expected = make_questions(questions_count, rng)
+    workload = make_workload(list(expected), requests, rng)
+    # the model plans reworded questions like their originals
+    plans = {asked: expected[question] for asked, question in workload}
+    for name in ("python_repl", "wikipedia"):
+        wikicalcu.tools_by_name[name] = wikicalcu.Tool(name=name, description="echo", func=EchoTool())
+
+    print(f"{requests} requests over {len(expected)} questions, {len({a for a, _ in workload})} distinct inputs")
+    print(f"{'':<24} {'model calls':>11} {'exact hits':>10} {'semantic':>9} {'hit rate':>9} {'wrong':>6} {'us/req':>7}")
+    for label, cache in [
+        ("no cache", None),
+        ("exact", ResponseCache()),
+        ("semantic, 0.95", ResponseCache(embeddings=FakeEmbeddings(dims), threshold=0.95)),
+        ("semantic, 0.90", ResponseCache(embeddings=FakeEmbeddings(dims), threshold=0.90)),
+        ("semantic, 0.80", ResponseCache(embeddings=FakeEmbeddings(dims), threshold=0.80)),
+    ]:
+        result = await replay(workload, plans, expected, cache)
+        stats = cache.stats() if cache is not None else {"hits": 0, "semantic_hits": 0, "hit_rate": 0.0}
+        print(
+            f"{label:<24} {result['calls']:>11} {stats['hits']:>10} {stats['semantic_hits']:>9} "
+            f"{stats['hit_rate']:>9.1%} {result['wrong']:>6} {result['elapsed_s'] / requests * 1e6:>7.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ResponseCache on a replayed wikicalcu workload.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--dims", type=int, default=256, help="fake embedding dimensions")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.questions, args.dims))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cached Wikipedia lookups in wikicalcu.execute_tool. The Wikipedia tool is swapped for a fake with a
+simulated network round-trip, so this runs offline.
+Run with: python -m src.benchmarks.result_cache_bench [--round-trip-ms 150]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from src.components.result_cache import ResultCache
+from src.samples import wikicalcu
+
+
+class FakeWikipedia:
+    def __init__(self, round_trip: float):
+        self.round_trip = round_trip
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, query: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.round_trip)
+        return f"Page: {query}\nSummary: {query} is a topic with a long and interesting history."
+
+    __call__ = invoke
+
+
+async def lookup(query: str, config: dict) -> float:
+    state = wikicalcu.AgentState(selected_tool="wikipedia", tool_input=query)
+    start = time.perf_counter()
+    await wikicalcu.execute_tool(state, config)
+    return time.perf_counter() - start
+
+
+async def run(round_trip: float, path: str):
+    fake = FakeWikipedia(round_trip)
+    wikicalcu.tools_by_name["wikipedia"] = wikicalcu.Tool(
+        name="wikipedia", description="fake", func=fake, cacheable=True
+    )
+    cache = ResultCache(path)
+    config = {"configurable": {"result_cache": cache}}
+
+    cold = await lookup("Alan Turing", config)
+    warm = [await lookup("Alan Turing", config) for _ in range(1000)]
+    print(f"cold lookup       {cold * 1000:10.1f} ms")
+    print(f"warm lookup p50   {statistics.median(warm) * 1e6:10.1f} us")
+
+    calls = fake.calls
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup("Ada Lovelace", config) for _ in range(50)))
+    print(
+        f"50 concurrent identical lookups: {(time.perf_counter() - start) * 1000:.1f} ms, "
+        f"{fake.calls - calls} backend call(s), {cache.coalesced} coalesced"
+    )
+
+    # a new cache on the same file, as after a restart
+    cache.close()
+    config["configurable"]["result_cache"] = ResultCache(path)
+    calls = fake.calls
+    restarted = await lookup("Alan Turing", config)
+    print(f"after restart     {restarted * 1e6:10.1f} us, {fake.calls - calls} backend call(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached Wikipedia lookups in wikicalcu.")
+    parser.add_argument("--round-trip-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(args.round_trip_ms / 1000, os.path.join(directory, "results.db")))
+
+
+if __name__ == "__main__":
+    main()
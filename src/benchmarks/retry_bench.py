@@ -0,0 +1,117 @@
+"""
+Retry storms on a flaky tool, simulated through the route_by_status graph. Requests arrive at a steady rate
+and call a stub tool that fails 5% of calls, fails every call during a 2 s outage, and fails calls beyond
+its capacity, so retries that pile on keep it overloaded. Compared:
+  immediate retry   the old routing: retry at once until error_count reaches 3
+  backoff + jitter  exponential backoff with full jitter, no circuit breaker
+  + circuit breaker the default: backoff, and a shared breaker failing fast while the tool is down
+Run with: python -m src.benchmarks.retry_bench [--rate 200] [--seconds 6]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from src._shared.stats import summarize
+from src.components.retry import Backoff, RetryScheduler
+from src.samples import route_by_status
+
+
+class FlakyTool:
+    name = "search"
+
+    def __init__(self, outage: tuple[float, float], capacity: int, latency: float = 0.02, error_rate: float = 0.05):
+        self.outage = outage
+        self.capacity = capacity
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(3)
+        self.started = time.perf_counter()
+        self.in_flight = 0
+        # calls per 100 ms
+        self.calls: Counter[int] = Counter()
+
+    async def ainvoke(self, query: str) -> str:
+        now = time.perf_counter() - self.started
+        self.calls[int(now * 10)] += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+            if self.outage[0] <= now < self.outage[1]:
+                raise ConnectionError("upstream down")
+            if self.in_flight > self.capacity:
+                raise ConnectionError("upstream overloaded")
+            if self.rng.random() < self.error_rate:
+                raise ConnectionError("upstream returned 503")
+            return f"results for {query}"
+        finally:
+            self.in_flight -= 1
+
+
+async def request(query: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = await route_by_status.app.ainvoke(route_by_status.AgentState(current_input=query))
+    return time.perf_counter() - start, result["status"]
+
+
+async def simulate(scheduler: RetryScheduler, rate: float, seconds: float, outage: tuple[float, float], capacity: int):
+    tool = FlakyTool(outage, capacity)
+    route_by_status.tools["search"] = tool
+    route_by_status.scheduler = scheduler
+    rng = random.Random(7)
+    tasks = []
+    while time.perf_counter() - tool.started < seconds:
+        tasks.append(asyncio.create_task(request(f"q{len(tasks)}")))
+        await asyncio.sleep(rng.expovariate(rate))
+    results = await asyncio.gather(*tasks)
+    return tool, results
+
+
+def report(label: str, tool: FlakyTool, results: list, outage: tuple[float, float]):
+    latency = summarize([elapsed for elapsed, _ in results])
+    ok = sum(status == "SUCCESS" for _, status in results) / len(results)
+    during = sum(count for bucket, count in tool.calls.items() if outage[0] * 10 <= bucket < outage[1] * 10)
+    after = sum(count for bucket, count in tool.calls.items() if bucket >= outage[1] * 10)
+    print(
+        f"{label:<20} {ok:>7.1%} {latency['p50'] * 1000:>8.0f} {latency['p99'] * 1000:>8.0f} "
+        f"{sum(tool.calls.values()) / len(results):>10.2f} {max(tool.calls.values()) * 10:>10} "
+        f"{during / (outage[1] - outage[0]):>12.0f} {after:>12}"
+    )
+
+
+async def run(rate: float, seconds: float, capacity: int):
+    outage = (1.0, 3.0)
+    print(
+        f"{rate:g} requests/s for {seconds:g} s, tool capacity {capacity} in flight, down from {outage[0]:g}-{outage[1]:g} s"
+    )
+    print(
+        f"{'':<20} {'ok':>7} {'p50 ms':>8} {'p99 ms':>8} {'calls/req':>10} {'peak/s':>10} "
+        f"{'outage/s':>12} {'calls after':>12}"
+    )
+    strategies = [
+        (
+            "immediate retry",
+            RetryScheduler(Backoff(max_attempts=3, jitter=0.0, base_delay=0.0), failure_threshold=10**9),
+        ),
+        ("backoff + jitter", RetryScheduler(Backoff(max_attempts=3, base_delay=0.2), failure_threshold=10**9)),
+        ("+ circuit breaker", RetryScheduler(Backoff(max_attempts=3, base_delay=0.2), reset_timeout=0.5)),
+    ]
+    for label, scheduler in strategies:
+        scheduler.rng.seed(11)
+        tool, results = await simulate(scheduler, rate, seconds, outage, capacity)
+        report(label, tool, results, outage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retry strategies against a flaky tool with an outage.")
+    parser.add_argument("--rate", type=float, default=200.0, help="requests per second")
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--capacity", type=int, default=16, help="calls the tool serves at once")
+    args = parser.parse_args()
+    asyncio.run(run(args.rate, args.seconds, args.capacity))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark: compiled intent router vs the original elif chain in booker.route_request.
+Run with: python -m src.benchmarks.router_bench
+"""
+
+import random
+import time
+
+from src.components.intent_router import IntentRouter
+
+INTENTS = [
+    ("greet", "process_greet"),
+    ("check booking", "process_check_bookings"),
+    ("confirmed check-in", "process_confirmed_check_in"),
+    ("confirm booking", "process_confirmed_check_in"),
+    ("pending check-in", "process_pending_check_in"),
+    ("no booking", "process_no_booking"),
+    ("hotel info", "process_hotel_info"),
+    ("room service", "process_room_service"),
+    ("report issue", "process_report_issue"),
+]
+
+FILLER = "hi there could you please help me with my stay at the hotel tonight thanks a lot".split()
+
+
+def legacy_route(message: str):
+    # The original chain, plus the `.replace(...)` pass each process_* node ran afterwards
+    user_input = message.strip().lower()
+    for phrase, target in INTENTS:
+        if phrase == "confirm booking":
+            continue
+        if phrase in user_input:
+            return target, message.strip().replace(phrase, "").strip()
+    return None, ""
+
+
+def make_corpus(size: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(FILLER, k=rng.randint(3, 40))
+        if rng.random() < 0.8:
+            phrase, _ = rng.choice(INTENTS)
+            words.insert(rng.randint(0, len(words)), f"{phrase} {rng.randint(100, 999)}")
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def bench(label: str, fn, corpus: list[str]) -> float:
+    start = time.perf_counter()
+    for message in corpus:
+        fn(message)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:8.3f}s  {len(corpus) / elapsed:12,.0f} msg/s")
+    return elapsed
+
+
+def main(size: int = 200_000):
+    corpus = make_corpus(size)
+    router = IntentRouter(INTENTS)
+    print(f"Routing {size:,} synthetic messages")
+    legacy = bench("elif chain", legacy_route, corpus)
+    compiled = bench("intent router", router.match, corpus)
+    print(f"speedup: {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Event-loop responsiveness while wikicalcu runs CPU-heavy python_repl snippets concurrently: PythonREPLTool
+inside the async node (the old execute_tool) vs the warm process-pool sandbox.
+A ticker coroutine sleeps 10 ms at a time and records how late it wakes up.
+Run with: python -m src.benchmarks.sandbox_bench [--calls 8]
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_experimental.tools.python.tool import PythonREPLTool
+
+from src._shared.stats import summarize
+from src.components.sandbox import PythonSandbox
+from src.samples import wikicalcu
+
+SNIPPET = "print(sum(i * i for i in range(5_000_000)))"
+TICK = 0.01
+
+
+async def ticker(lags: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def measure(execute, calls: int) -> tuple[dict, float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(execute() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return summarize(lags), elapsed
+
+
+async def run(calls: int, workers: int):
+    repl = PythonREPLTool()
+
+    # the old execute_tool: the tool runs synchronously inside the async node
+    async def legacy():
+        return {"tool_output": str(repl.invoke(SNIPPET)), "status": "GENERATE_RESPONSE"}
+
+    sandbox = PythonSandbox(workers=workers, timeout=30.0)
+    await asyncio.to_thread(sandbox.start)
+    wikicalcu.tools_by_name["python_repl"] = wikicalcu.Tool(name="python_repl", description="sandbox", func=sandbox)
+    state = wikicalcu.AgentState(selected_tool="python_repl", tool_input=SNIPPET)
+
+    async def pooled():
+        result = await wikicalcu.execute_tool(state, {})
+        assert result["status"] == "GENERATE_RESPONSE", result
+        return result
+
+    async def idle():
+        await asyncio.sleep(0.5)
+
+    print(f"{calls} concurrent snippets, {workers} sandbox workers, {TICK * 1000:.0f} ms ticker")
+    print(f"{'':<22} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'wall s':>8}")
+    for label, execute, n in [("idle", idle, 1), ("PythonREPLTool", legacy, calls), ("sandbox", pooled, calls)]:
+        lag, elapsed = await measure(execute, n)
+        print(
+            f"{label:<22} {lag['p50'] * 1000:>11.2f} {lag['p99'] * 1000:>11.2f} {lag['max'] * 1000:>11.2f} "
+            f"{elapsed:>8.2f}"
+        )
+    print(f"sandbox: {sandbox.stats()}")
+    sandbox.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag while python_repl snippets run.")
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.workers))
+
+
+if __name__ == "__main__":
+    main()
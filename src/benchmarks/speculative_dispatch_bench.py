@@ -0,0 +1,131 @@
+"""
+Speculative tool dispatch in wikicalcu.think: the old think (wait for the whole reply, json.loads it, then
+execute_tool) vs the streaming think, which starts the tool as soon as "tool" and "tool_input" are parsed
+and overlaps its latency with the rest of the reply. A stub model streams a fixed reply word by word, the
+Wikipedia tool is swapped for a fake with a fixed latency and an empty result cache on every run. The
+contradicting reply repeats "tool_input" after the thought, so the speculative call is thrown away and the
+tool run again.
+Run with: python -m src.benchmarks.speculative_dispatch_bench [--token-ms 20] [--tool-ms 300]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src._shared.stats import summarize
+from src.components.result_cache import ResultCache
+from src.samples import wikicalcu
+
+THOUGHT = " ".join(["The user asks about a historical figure, so I should look the name up on Wikipedia."] * 4)
+CONFIRMED = json.dumps({"need_tool": True, "tool": "wikipedia", "tool_input": "Ada Lovelace", "thought": THOUGHT})
+CONTRADICTED = CONFIRMED[:-1] + ', "tool_input": "Charles Babbage"}'
+
+
+class StreamingModel:
+    def __init__(self, reply: str, token_latency: float):
+        self.tokens = re.findall(r"\S+\s*", reply)
+        self.token_latency = token_latency
+
+    async def ainvoke(self, prompt: str) -> AIMessage:
+        await asyncio.sleep(self.token_latency * len(self.tokens))
+        return AIMessage("".join(self.tokens))
+
+    async def astream(self, prompt: str):
+        for token in self.tokens:
+            await asyncio.sleep(self.token_latency)
+            yield AIMessageChunk(token)
+
+
+class StubModels:
+    def __init__(self, model: StreamingModel):
+        self.model = model
+
+    def get(self, model: str = "", temperature: float = 0.0):
+        return self.model
+
+
+class FakeWikipedia:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.started = 0
+
+    def invoke(self, query: str) -> str:
+        # cacheable tools are called synchronously on a worker thread, like WikipediaQueryRun
+        self.started += 1
+        time.sleep(self.latency)
+        return f"Page: {query}"
+
+    __call__ = invoke
+
+
+async def legacy_think(state: wikicalcu.AgentState, config: dict) -> dict:
+    """The old think node: the reply is only parsed once it is complete."""
+    response = await wikicalcu.get_models(config).get(temperature=0).ainvoke(state.current_input)
+    result = json.loads(response.content)
+    return {
+        "thought": result["thought"],
+        "selected_tool": result.get("tool"),
+        "tool_input": result.get("tool_input") or "",
+        "status": "NEED_TOOL" if result["need_tool"] else "GENERATE_RESPONSE",
+    }
+
+
+async def think_and_act(think, config: dict) -> tuple[float, str]:
+    """think, then execute_tool if think left the call to it, as the graph would route it."""
+    state = wikicalcu.AgentState(current_input="Who was Ada Lovelace?")
+    start = time.perf_counter()
+    update = await think(state, config)
+    if update["status"] == "NEED_TOOL":
+        update.update(await wikicalcu.execute_tool(state.model_copy(update=update), config))
+    return time.perf_counter() - start, update["tool_output"]
+
+
+async def measure(think, reply: str, token_latency: float, runs: int) -> tuple[dict, str]:
+    cache = ResultCache(":memory:")
+    config = {"configurable": {"models": StubModels(StreamingModel(reply, token_latency)), "result_cache": cache}}
+    results = []
+    for _ in range(runs):
+        # a cold cache, every run pays the tool latency
+        cache.clear()
+        results.append(await think_and_act(think, config))
+    cache.close()
+    return summarize([elapsed for elapsed, _ in results]), results[-1][1]
+
+
+async def run(token_latency: float, tool_latency: float, runs: int):
+    tool = FakeWikipedia(tool_latency)
+    # cacheable like the real one, only idempotent tools are dispatched speculatively
+    wikicalcu.tools_by_name["wikipedia"] = wikicalcu.Tool(
+        name="wikipedia", description="fake", func=tool, cacheable=True
+    )
+    tokens = len(StreamingModel(CONFIRMED, token_latency).tokens)
+    print(f"{tokens} reply tokens at {token_latency * 1000:g} ms, tool latency {tool_latency * 1000:g} ms, {runs} runs")
+    print(f"{'':<34} {'p50 ms':>8} {'max ms':>8} {'tool calls':>10}  tool output")
+    for label, think, reply in [
+        ("parse after reply, then tool", legacy_think, CONFIRMED),
+        ("speculative dispatch", wikicalcu.think, CONFIRMED),
+        ("speculative dispatch, contradicted", wikicalcu.think, CONTRADICTED),
+    ]:
+        tool.started = 0
+        latency, output = await measure(think, reply, token_latency, runs)
+        print(
+            f"{label:<34} {latency['p50'] * 1000:>8.0f} {latency['max'] * 1000:>8.0f} "
+            f"{tool.started / runs:>10.1f}  {output}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speculative tool dispatch from the streamed think reply.")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="delay between streamed reply tokens")
+    parser.add_argument("--tool-ms", type=float, default=300.0, help="latency of the fake Wikipedia tool")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.token_ms / 1000, args.tool_ms / 1000, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Per-step cost of the wikicalcu nodes as the conversation history grows: the old model_dump() + AgentState(**)
+rebuild vs partial deltas merged by LangGraph. Stub models stand in for OpenAI.
+Run with: python -m src.benchmarks.state_update_bench
+"""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from contextlib import aclosing
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+from pydantic import BaseModel
+
+from src.benchmarks.fakes import stub_chat_model
+from src.samples import wikicalcu
+
+HISTORY_SIZES = (0, 1_000, 10_000, 100_000)
+THINK_REPLY = json.dumps({"thought": "No tool needed.", "need_tool": False, "tool": None, "tool_input": ""})
+
+
+class StubModels:
+    def __init__(self):
+        self.models = {0: stub_chat_model([AIMessage(THINK_REPLY)]), 0.7: stub_chat_model([AIMessage("Done.")])}
+
+    def get(self, model: str = "", temperature: float = 0.0):
+        return self.models[temperature]
+
+
+# The nodes as they were: dump the whole state, update it and validate a new AgentState every step
+
+
+class LegacyAgentState(BaseModel):
+    messages: List[Dict[str, str]] = []
+    current_input: str = ""
+    thought: str = ""
+    selected_tool: Optional[str] = None
+    tool_input: str = ""
+    tool_output: str = ""
+    final_answer: str = ""
+    status: str = "STARTING"
+
+
+async def legacy_think(state: LegacyAgentState, config) -> LegacyAgentState:
+    response = await wikicalcu.get_models(config).get(temperature=0).ainvoke(state.current_input)
+    result = json.loads(response.content)
+    state_dict = state.model_dump()
+    state_dict.update(
+        {
+            "thought": result["thought"],
+            "selected_tool": result.get("tool"),
+            "tool_input": result.get("tool_input"),
+            "status": "NEED_TOOL" if result["need_tool"] else "GENERATE_RESPONSE",
+        }
+    )
+    return LegacyAgentState(**state_dict)
+
+
+async def legacy_generate_response(state: LegacyAgentState, config) -> LegacyAgentState:
+    response = await wikicalcu.get_models(config).get(temperature=0.7).ainvoke(state.current_input)
+    state_dict = state.model_dump()
+    state_dict.update({"final_answer": response.content, "status": "SUCCESS"})
+    return LegacyAgentState(**state_dict)
+
+
+def build(state_schema, think, generate_response):
+    workflow = StateGraph(state_schema)
+    workflow.add_node("think", think)
+    workflow.add_node("generate_response", generate_response)
+    workflow.set_entry_point("think")
+    workflow.add_edge("think", "generate_response")
+    workflow.add_edge("generate_response", "think")
+    return workflow.compile()
+
+
+async def run_steps(graph, state, steps: int, config: dict):
+    # the think -> generate_response loop has no exit, stop after `steps` node runs
+    done = 0
+    async with aclosing(graph.astream(state, config, stream_mode="updates")) as updates:
+        async for _ in updates:
+            done += 1
+            if done == steps:
+                break
+
+
+def measure(graph, make_state, steps: int, config: dict) -> tuple[float, float]:
+    """Return (microseconds, bytes allocated at peak) per step."""
+    loop = asyncio.new_event_loop()
+    state = make_state()
+    loop.run_until_complete(run_steps(graph, state, 4, config))
+    start = time.perf_counter()
+    loop.run_until_complete(run_steps(graph, state, steps, config))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    loop.run_until_complete(run_steps(graph, state, steps, config))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    loop.close()
+    return elapsed / steps * 1e6, peak / steps
+
+
+def main(steps: int = 20):
+    config = {"configurable": {"models": StubModels()}, "recursion_limit": steps + 10}
+    legacy = build(LegacyAgentState, legacy_think, legacy_generate_response)
+    deltas = build(wikicalcu.AgentState, wikicalcu.think, wikicalcu.generate_response)
+
+    print(
+        f"{'history':>8} {'legacy us/step':>16} {'deltas us/step':>16} {'legacy KiB/step':>16} {'deltas KiB/step':>16}"
+    )
+    for size in HISTORY_SIZES:
+        messages = [{"role": "user" if i % 2 else "assistant", "content": f"message {i}"} for i in range(size)]
+        legacy_us, legacy_bytes = measure(
+            legacy, lambda: LegacyAgentState(current_input="hi", messages=messages), steps, config
+        )
+        deltas_us, deltas_bytes = measure(
+            deltas, lambda: wikicalcu.AgentState(current_input="hi", messages=messages), steps, config
+        )
+        print(
+            f"{size:>8,} {legacy_us:>16,.0f} {deltas_us:>16,.0f} "
+            f"{legacy_bytes / 1024:>16,.1f} {deltas_bytes / 1024:>16,.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
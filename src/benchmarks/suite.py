@@ -0,0 +1,384 @@
+"""
+Offline benchmark suite for the graph samples and agents, with a JSON history to catch regressions.
+
+    python -m src.benchmarks.suite list
+    python -m src.benchmarks.suite [--history .benchmarks/history.json] run [-k store] [--label my-change]
+    python -m src.benchmarks.suite compare [--threshold 0.1]
+
+The cases import the graphs from src.samples and src.agents, so a regression in those modules shows up here.
+Models and embeddings are replaced with the stand-ins from src.benchmarks.fakes.
+"""
+
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.benchmarks.fakes import FakeEmbeddings, stub_chat_model
+
+HISTORY = os.path.join(".benchmarks", "history.json")
+STORE_SIZES = (1_000, 100_000, 1_000_000)
+# the stock InMemoryStore keeps vectors as lists of floats and scores them one namespace scan at a time
+SEMANTIC_STORE_SIZES = (1_000, 100_000)
+
+
+@dataclass
+class Case:
+    name: str
+    # builds the fixture and returns the operation to time
+    setup: Callable[[], Callable[[], object]]
+    number: int
+    repeat: int = 5
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, number: int, repeat: int = 5):
+    def register(setup):
+        CASES[name] = Case(name, setup, number, repeat)
+        return setup
+
+    return register
+
+
+def run_case(bench: Case) -> dict:
+    operation = bench.setup()
+    operation()
+    gc.collect()
+    samples = [timeit.Timer(operation).timeit(bench.number) / bench.number for _ in range(bench.repeat)]
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "number": bench.number,
+        "repeat": bench.repeat,
+    }
+
+
+# graph_nodes.py
+
+
+@case("graph_nodes.invoke", number=500)
+def graph_nodes_invoke():
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src.samples.graph_nodes import workflow
+
+    graph, threads = workflow.compile(checkpointer=InMemorySaver()), itertools.count()
+    return lambda: graph.invoke({"foo": ""}, {"configurable": {"thread_id": str(next(threads))}})
+
+
+# booker
+
+
+@case("booker.route", number=20_000)
+def booker_route():
+    from src.agents.booker import router
+    from src.benchmarks.router_bench import make_corpus
+
+    messages = iter(make_corpus(1000) * 1000)
+    return lambda: router.match(next(messages))
+
+
+@case("booker.check_booking_tool", number=20_000)
+def booker_check_booking_tool():
+    from src.agents.booker import get_tools
+
+    tool = get_tools()["check_booking"]
+    guest_ids = iter(["123", "456", "789", "000"] * 100_000)
+    return lambda: tool.invoke(next(guest_ids))
+
+
+@case("booker.invoke", number=500)
+def booker_invoke():
+    from src.agents.booker import build_graph
+
+    graph = build_graph()
+    conversation = ["greet John", "check booking 123", "hotel info", "room service towels"]
+    turns = itertools.count()
+
+    def turn():
+        # a new thread every conversation, so the message history doesn't grow with the run length
+        n = next(turns)
+        config = {"configurable": {"thread_id": f"bench-{n // len(conversation)}"}}
+        return graph.invoke({"messages": [("user", conversation[n % len(conversation)])]}, config)
+
+    return turn
+
+
+# subgraphs.py, human_in_the_loop_*.py: the sample graphs, compiled with a fresh checkpointer.
+# Their nodes print, which goes to a buffer while timed.
+
+
+def quiet(operation: Callable[[], object]) -> Callable[[], object]:
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return operation()
+
+    return run
+
+
+@case("subgraphs.invoke_resume", number=200)
+def subgraphs_invoke_resume():
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.types import Command
+
+    from src.samples.subgraphs import builder
+
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    def round_trip():
+        config = {"configurable": {"thread_id": uuid.uuid4()}}
+        graph.invoke({"state_counter": 1}, config)
+        return graph.invoke(Command(resume="35"), config)
+
+    return quiet(round_trip)
+
+
+@case("hitl.review_edit_round_trip", number=200)
+def hitl_review_edit():
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.types import Command
+
+    from src.samples.human_in_the_loop_1 import builder
+
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    def round_trip():
+        config = {"configurable": {"thread_id": uuid.uuid4()}}
+        graph.invoke({}, config=config)
+        return graph.invoke(Command(resume={"edited_summary": "The cat lay on the rug."}), config=config)
+
+    return quiet(round_trip)
+
+
+@case("hitl.validate_age_round_trips", number=100)
+def hitl_validate_age():
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.types import Command
+
+    from src.samples.human_in_the_loop_2 import builder
+
+    graph = builder.compile(checkpointer=MemorySaver())
+
+    def round_trips():
+        # the sample's session: two invalid answers, then a valid one
+        config = {"configurable": {"thread_id": uuid.uuid4()}}
+        graph.invoke({}, config=config)
+        for answer in ("not a number", "-10", "25"):
+            result = graph.invoke(Command(resume=answer), config=config)
+        return result
+
+    return quiet(round_trips)
+
+
+# weather_agent.py
+
+
+def stub_weather_agent():
+    from langchain_core.messages import AIMessage
+
+    from src.agents.weather_agent import build_agent
+
+    model = stub_chat_model(
+        [
+            AIMessage("", tool_calls=[{"name": "get_weather", "args": {"city": "sf"}, "id": "call_1"}]),
+            AIMessage("It's always sunny in sf!"),
+        ]
+    )
+    return build_agent(model)
+
+
+WEATHER_QUESTION = {"messages": [{"role": "user", "content": "what is the weather in sf"}]}
+
+
+@case("weather_agent.invoke", number=200)
+def weather_agent_invoke():
+    agent = stub_weather_agent()
+    return lambda: agent.invoke(WEATHER_QUESTION)
+
+
+@case("weather_agent.stream", number=200)
+def weather_agent_stream():
+    import asyncio
+
+    from src.components.streaming import stream_turn
+
+    agent, loop = stub_weather_agent(), asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(stream_turn(agent, WEATHER_QUESTION))
+
+
+# in_memory_store.py / semantic_search.py
+
+WORDS = "pizza burgers sushi coffee whisky tea pasta salad wine beer tacos ramen curry juice soda".split()
+
+
+def memory(i: int) -> dict:
+    # unique texts: InMemoryStore de-duplicates texts before embedding and then mismatches the vectors
+    kind = WORDS[i % len(WORDS)]
+    return {"kind": kind, "text": f"I like {kind} and {WORDS[i * 7 % len(WORDS)]}, memory {i}"}
+
+
+def fill_store(store, size: int, namespace: tuple, batch_size: int = 1000):
+    from langgraph.store.base import PutOp
+
+    for start in range(0, size, batch_size):
+        store.batch([PutOp(namespace, f"memory-{i}", memory(i)) for i in range(start, min(start + batch_size, size))])
+
+
+def store_put(size: int):
+    from langgraph.store.memory import InMemoryStore
+
+    store, namespace = InMemoryStore(), ("1", "memories")
+    fill_store(store, size, namespace)
+    keys = itertools.count(size)
+    return lambda: store.put(namespace, f"memory-{next(keys)}", {"food_preference": "I like pizza"})
+
+
+def store_search(size: int):
+    from langgraph.store.memory import InMemoryStore
+
+    store, namespace = InMemoryStore(), ("1", "memories")
+    fill_store(store, size, namespace)
+    return lambda: store.search(namespace, filter={"kind": "pizza"}, limit=10)
+
+
+def store_semantic_search(size: int):
+    from langgraph.store.memory import InMemoryStore
+
+    store = InMemoryStore(index={"embed": FakeEmbeddings(64), "dims": 64, "fields": ["text"]})
+    namespace = ("1", "memories")
+    fill_store(store, size, namespace)
+    return lambda: store.search(namespace, query="what does the user like to drink? coffee", limit=10)
+
+
+def vector_store_semantic_search(size: int):
+    from src.components.vector_store import VectorStore
+
+    store = VectorStore(index={"embed": FakeEmbeddings(64), "dims": 64, "fields": ["text"]})
+    namespace = ("1", "memories")
+    fill_store(store, size, namespace)
+    return lambda: store.search(namespace, query="what does the user like to drink? coffee", limit=10)
+
+
+for _size in STORE_SIZES:
+    case(f"store.put[{_size}]", number=2000)(lambda size=_size: store_put(size))
+    case(f"store.search[{_size}]", number=max(1, 100_000 // _size), repeat=3)(lambda size=_size: store_search(size))
+for _size in SEMANTIC_STORE_SIZES:
+    case(f"store.semantic_search[{_size}]", number=max(1, 10_000 // _size), repeat=3)(
+        lambda size=_size: store_semantic_search(size)
+    )
+for _size in STORE_SIZES:
+    case(f"vector_store.semantic_search[{_size}]", number=max(1, 100_000 // _size), repeat=3)(
+        lambda size=_size: vector_store_semantic_search(size)
+    )
+
+
+# History
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as history:
+        return json.load(history)
+
+
+def save_history(path: str, runs: list[dict]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as history:
+        json.dump(runs, history, indent=1)
+    os.replace(tmp, path)
+
+
+def run(pattern: Optional[str], history: str, label: Optional[str]) -> dict:
+    results = {}
+    for name, bench in CASES.items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = run_case(bench)
+        print(f"{name:<40} {results[name]['median_us']:>14,.1f} us/op", flush=True)
+        # drop the fixture (large stores) before the next case
+        gc.collect()
+
+    record = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "label": label,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    save_history(history, load_history(history) + [record])
+    return record
+
+
+def compare(runs: list[dict], threshold: float, baseline: int = -2, current: int = -1) -> list[str]:
+    """Return the cases of `current` that are more than `threshold` slower than in `baseline`."""
+    before, after = runs[baseline]["results"], runs[current]["results"]
+    regressions = []
+    print(f"{'case':<40} {'baseline':>14} {'current':>14} {'change':>9}")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name]["median_us"], after[name]["median_us"]
+        change = new / old - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {old:>14,.1f} {new:>14,.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with a regression history.")
+    parser.add_argument("--history", default=HISTORY, help="JSON file the runs are appended to")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    run_parser.add_argument("--label", help="free-form note stored with the run")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 = 10%%")
+    compare_parser.add_argument("--baseline", type=int, default=-2, help="history index to compare against")
+    compare_parser.add_argument("--current", type=int, default=-1, help="history index to check")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in CASES:
+            print(name)
+    elif args.command == "run":
+        run(args.pattern, args.history, args.label)
+    else:
+        runs = load_history(args.history)
+        if len(runs) < 2:
+            sys.exit(f"need at least two runs in {args.history} to compare")
+        regressions = compare(runs, args.threshold, args.baseline, args.current)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Memoized vs direct booking tool calls against a SQLite repository, with a skewed (hot guest) workload
+and a trickle of booking writes that invalidate cached entries. `backend_latency` adds a sleep per lookup
+to stand in for a networked database.
+Run with: python -m src.benchmarks.tool_cache_bench
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from langchain_core.tools import Tool
+
+from src.benchmarks.booking_repository_bench import make_bookings
+from src.components.booking_repository import SQLiteBookingRepository
+from src.components.tool_cache import ToolCache, memoize_tool
+
+
+def run(tool: Tool, repository, calls: list[str], writes_every: int) -> float:
+    start = time.perf_counter()
+    for index, guest_id in enumerate(calls):
+        if writes_every and index % writes_every == 0:
+            repository.upsert(guest_id, {"status": "confirmed", "name": "Guest", "guests": 2, "room": "101"})
+        tool.invoke(guest_id)
+    return time.perf_counter() - start
+
+
+def bench(repository, calls: list[str], writes_every: int, backend_latency: float):
+    def check_booking(guest_id: str) -> str:
+        if backend_latency:
+            time.sleep(backend_latency)
+        booking = repository.get(guest_id) or {"status": "not_found"}
+        return f"{booking['status']} booking for {booking.get('name')} in room {booking.get('room')}"
+
+    tool = Tool(name="Check Booking", func=check_booking, description="Check bookings for a given booking ID.")
+    cache = ToolCache(max_size=4096, ttl=300)
+    repository.on_change(cache.invalidate)
+    cached = memoize_tool(tool, cache, tag=lambda guest_id: guest_id)
+
+    direct = run(tool, repository, calls, writes_every)
+    memoized = run(cached, repository, calls, writes_every)
+    print(f"backend latency {backend_latency * 1e3:.1f} ms")
+    print(f"  direct    {direct / len(calls) * 1e6:8.1f} us/call")
+    print(f"  memoized  {memoized / len(calls) * 1e6:8.1f} us/call  hit rate {cache.stats()['hit_rate']:.1%}")
+
+
+def main(size: int = 100_000, calls: int = 20_000, writes_every: int = 100):
+    rng = random.Random(0)
+    # a few guests generate most of the traffic
+    guest_ids = [str(int(rng.paretovariate(1.2)) % size) for _ in range(calls)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        repository = SQLiteBookingRepository(os.path.join(directory, "bookings.db"))
+        repository.upsert_many(make_bookings(size))
+
+        for backend_latency in (0.0, 0.001):
+            bench(repository, guest_ids, writes_every, backend_latency)
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Semantic search latency of VectorStore vs the stock InMemoryStore, at 10k, 100k and 1M memories in one
+namespace. Embeddings are random unit vectors looked up by text, so filling the stores costs no embedding.
+The stock store is skipped above --stock-max: it keeps each vector as a list of Python floats (about 32
+bytes per dimension) and scores them one by one.
+Run with: python -m src.benchmarks.vector_store_bench [--sizes 10000 100000 1000000] [--dims 256]
+"""
+
+import argparse
+import time
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langgraph.store.base import PutOp, SearchOp
+from langgraph.store.memory import InMemoryStore
+
+from src._shared.stats import summarize
+from src.components.vector_store import VectorStore
+
+NAMESPACE = ("1", "memories")
+
+
+class TableEmbeddings(Embeddings):
+    """Embeds "memory 12" as row 12 of a fixed random table, any other text as a vector seeded by its checksum."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.vectors[[int(text.rsplit(" ", 1)[1]) for text in texts]].tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.vectors.shape[1]).tolist()
+
+
+def fill(store, size: int, batch_size: int = 10_000) -> float:
+    start = time.perf_counter()
+    for first in range(0, size, batch_size):
+        store.batch(
+            [PutOp(NAMESPACE, f"m{i}", {"text": f"memory {i}"}) for i in range(first, min(first + batch_size, size))]
+        )
+    return time.perf_counter() - start
+
+
+def latency(store, queries: list[str], batch: int) -> dict:
+    """Seconds per query, searching `batch` queries per store.batch call."""
+    samples = []
+    for first in range(0, len(queries), batch):
+        ops = [SearchOp(NAMESPACE, query=query, limit=10) for query in queries[first : first + batch]]
+        start = time.perf_counter()
+        store.batch(ops)
+        samples.append((time.perf_counter() - start) / len(ops))
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore vs InMemoryStore semantic search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dims", type=int, default=256, help="1536 needs 6 GB per million vectors")
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--stock-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{args.dims} dims, limit 10, ms per query")
+    print(f"{'store':<14} {'size':>10} {'fill s':>8} {'p50 ms':>9} {'max ms':>9} {'batch of 32':>12} {'vector MB':>10}")
+    for size in args.sizes:
+        vectors = np.random.default_rng(size).standard_normal((size, args.dims), dtype=np.float32)
+        config = {"embed": TableEmbeddings(vectors), "dims": args.dims, "fields": ["text"]}
+        queries = [f"query {i}" for i in range(args.queries)]
+        stores = [("VectorStore", VectorStore)] + ([("InMemoryStore", InMemoryStore)] if size <= args.stock_max else [])
+        for label, store_class in stores:
+            store = store_class(index=config)
+            fill_s = fill(store, size)
+            single = latency(store, queries[: max(4, args.queries // 4)] if label == "InMemoryStore" else queries, 1)
+            batched = f"{latency(store, queries, 32)['p50'] * 1000:.2f}" if label == "VectorStore" else "-"
+            megabytes = (
+                store.stats()["vector_bytes"] / 2**20 if label == "VectorStore" else size * args.dims * 32 / 2**20
+            )
+            print(
+                f"{label:<14} {size:>10,} {fill_s:>8.1f} {single['p50'] * 1000:>9.2f} {single['max'] * 1000:>9.2f} "
+                f"{batched:>12} {megabytes:>10.0f}"
+            )
+            del store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Ingest throughput, peak memory and query latency of the offline Wikipedia index on a synthetic corpus:
+JSONL pages of Zipf-distributed words, Wikipedia-sized (about 3.5 KB of text each).
+The corpus is written once and reused, ingestion runs from the file like src/agents/wiki_ingest.py.
+Run with: python -m src.benchmarks.wiki_index_bench [--gigabytes 2] [--workdir /tmp/wiki_bench]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import time
+
+import numpy as np
+
+from src._shared.stats import summarize
+from src.components.wiki_index import WikiIndex, read_jsonl
+
+VOCABULARY = 50_000
+WORDS_PER_PAGE = 500
+
+
+def make_vocabulary(rng: np.random.Generator) -> np.ndarray:
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    lengths = rng.integers(3, 10, VOCABULARY)
+    words = {"".join(rng.choice(letters, length)) for length in lengths}
+    return np.array(sorted(words))
+
+
+def write_corpus(path: str, gigabytes: float, vocabulary: np.ndarray, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    # Zipf-like word frequencies, as in natural language
+    weights = 1 / np.arange(1, len(vocabulary) + 1) ** 1.1
+    weights /= weights.sum()
+    target = gigabytes * 2**30
+    written = 0
+    page = 0
+    with open(path + ".partial", "w") as corpus:
+        while written < target:
+            words = vocabulary[rng.choice(len(vocabulary), (64, WORDS_PER_PAGE), p=weights)]
+            lines = []
+            for row in words:
+                title = f"{row[0].capitalize()} {row[1]} {page}"
+                sentences = [" ".join(row[start : start + 20]) + "." for start in range(0, WORDS_PER_PAGE, 20)]
+                text = " ".join(sentences[:5]) + "\n\n" + " ".join(sentences[5:])
+                lines.append(json.dumps({"title": title, "text": text}) + "\n")
+                page += 1
+            chunk = "".join(lines)
+            corpus.write(chunk)
+            written += len(chunk)
+    os.replace(path + ".partial", path)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def query_latency(index: WikiIndex, vocabulary: np.ndarray, queries: int, seed: int = 11) -> dict:
+    rng = random.Random(seed)
+    # rare, mid-frequency and common terms; common words make BM25 score many more pages
+    bands = [(0, 200), (200, 5_000), (5_000, len(vocabulary))]
+    latencies = {}
+    for low, high in bands:
+        samples = []
+        for _ in range(queries):
+            query = " ".join(vocabulary[rng.randrange(low, high)] for _ in range(rng.randint(2, 3)))
+            start = time.perf_counter()
+            index.search(query, k=3)
+            samples.append(time.perf_counter() - start)
+        latencies[f"terms ranked {low}-{high}"] = summarize(samples)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Wikipedia index ingest and query benchmark.")
+    parser.add_argument("--gigabytes", type=float, default=2.0, help="corpus size")
+    parser.add_argument("--workdir", default="/tmp/wiki_bench")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200, help="per frequency band")
+    parser.add_argument("--reuse-index", action="store_true", help="only run the queries against an existing index")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    vocabulary = make_vocabulary(np.random.default_rng(3))
+    corpus = os.path.join(args.workdir, f"corpus-{args.gigabytes:g}gb.jsonl")
+    if not os.path.exists(corpus):
+        print(f"writing {args.gigabytes:g} GB corpus to {corpus}")
+        write_corpus(corpus, args.gigabytes, vocabulary)
+    index_path = os.path.join(args.workdir, f"index-{args.gigabytes:g}gb.db")
+    if args.reuse_index and os.path.exists(index_path):
+        index = WikiIndex(index_path)
+        pages = len(index)
+    else:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(index_path + suffix):
+                os.remove(index_path + suffix)
+        size = os.path.getsize(corpus)
+        rss_before = peak_rss_mb()
+        index = WikiIndex(index_path)
+        start = time.perf_counter()
+        stats = index.ingest(read_jsonl(corpus), batch_size=args.batch_size, optimize=False)
+        ingest_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index.optimize()
+        optimize_s = time.perf_counter() - start
+        pages = stats.pages
+
+        print(f"corpus           {size / 2**30:.2f} GB, {stats.pages:,} pages")
+        print(
+            f"ingest           {ingest_s:.0f} s, {size / 2**20 / ingest_s:.1f} MB/s, {stats.pages_per_sec:,.0f} pages/s"
+        )
+        print(f"optimize         {optimize_s:.0f} s")
+        print(f"index on disk    {os.path.getsize(index_path) / 2**30:.2f} GB")
+        print(f"peak RSS         {rss_before:.0f} MB before ingest, {peak_rss_mb():.0f} MB after")
+    print(f"{'query latency':<28} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for band, latency in query_latency(index, vocabulary, args.queries).items():
+        print(f"{band:<28} {latency['p50'] * 1000:>8.2f} {latency['p99'] * 1000:>8.2f} {latency['max'] * 1000:>8.2f}")
+    with index.pool.connection() as connection:
+        ids = random.Random(5).sample(range(1, pages + 1), min(args.queries, pages))
+        titles = [connection.execute("SELECT title FROM pages WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+    samples = []
+    for title in titles:
+        start = time.perf_counter()
+        index.search(title, k=3)
+        samples.append(time.perf_counter() - start)
+    latency = summarize(samples)
+    print(
+        f"{'exact titles':<28} {latency['p50'] * 1000:>8.2f} {latency['p99'] * 1000:>8.2f} {latency['max'] * 1000:>8.2f}"
+    )
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
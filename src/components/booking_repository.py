@@ -0,0 +1,175 @@
+"""
+Booking repositories for the booker agent.
+Tools look bookings up through a repository instead of a module dict, so the same agent can run
+against the in-memory sample data or a local SQLite database with indexed lookups.
+"""
+
+import queue
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+FIELDS = ("status", "name", "guests", "room")
+
+
+class BookingRepository(ABC):
+    def __init__(self):
+        self._listeners: list[Callable[[list[str]], None]] = []
+
+    @abstractmethod
+    def get(self, guest_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    def get_many(self, guest_ids: Iterable[str]) -> dict[str, dict]: ...
+
+    @abstractmethod
+    def find_by_status(self, status: str, limit: int = 100) -> list[dict]:
+        """Up to `limit` bookings with the given status, in no particular order."""
+
+    @abstractmethod
+    def find_by_room(self, room: str) -> list[dict]: ...
+
+    @abstractmethod
+    def _upsert_many(self, bookings: dict[str, dict]): ...
+
+    def upsert_many(self, bookings: dict[str, dict]):
+        self._upsert_many(bookings)
+        for listener in self._listeners:
+            listener(list(bookings))
+
+    def upsert(self, guest_id: str, booking: dict):
+        self.upsert_many({guest_id: booking})
+
+    def on_change(self, listener: Callable[[list[str]], None]):
+        """Call `listener` with the guest ids of every write, e.g. to invalidate cached tool results."""
+        self._listeners.append(listener)
+
+
+class InMemoryBookingRepository(BookingRepository):
+    def __init__(self, bookings: Optional[dict[str, dict]] = None):
+        super().__init__()
+        self._bookings: dict[str, dict] = {}
+        self._by_status: defaultdict[str, set[str]] = defaultdict(set)
+        self._by_room: defaultdict[str, set[str]] = defaultdict(set)
+        self.upsert_many(bookings or {})
+
+    def get(self, guest_id: str) -> Optional[dict]:
+        return self._bookings.get(guest_id)
+
+    def get_many(self, guest_ids: Iterable[str]) -> dict[str, dict]:
+        return {guest_id: self._bookings[guest_id] for guest_id in guest_ids if guest_id in self._bookings}
+
+    def find_by_status(self, status: str, limit: int = 100) -> list[dict]:
+        guest_ids = islice(self._by_status.get(status, ()), limit)
+        return [self._bookings[guest_id] for guest_id in guest_ids]
+
+    def find_by_room(self, room: str) -> list[dict]:
+        return [self._bookings[guest_id] for guest_id in sorted(self._by_room.get(room, ()))]
+
+    def _upsert_many(self, bookings: dict[str, dict]):
+        for guest_id, booking in bookings.items():
+            previous = self._bookings.get(guest_id)
+            if previous is not None:
+                self._by_status[previous.get("status")].discard(guest_id)
+                if previous.get("room") is not None:
+                    self._by_room[previous["room"]].discard(guest_id)
+            booking = {"guest_id": guest_id, **booking}
+            self._bookings[guest_id] = booking
+            self._by_status[booking.get("status")].add(guest_id)
+            if booking.get("room") is not None:
+                self._by_room[booking["room"]].add(guest_id)
+
+
+class SQLitePool:
+    """A fixed-size pool of SQLite connections shared between threads."""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self._connections: queue.Queue[sqlite3.Connection] = queue.Queue(maxsize=size)
+        for _ in range(size):
+            connection = sqlite3.connect(path, check_same_thread=False, uri=path.startswith("file:"))
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class SQLiteBookingRepository(BookingRepository):
+    # SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+    BATCH_SIZE = 500
+
+    def __init__(self, path: str, pool_size: int = 4):
+        super().__init__()
+        if path == ":memory:":
+            # every pooled connection would otherwise get its own private database
+            path = f"file:bookings-{id(self)}?mode=memory&cache=shared"
+        self.pool = SQLitePool(path, size=pool_size)
+        with self.pool.connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS bookings (
+                    guest_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    name TEXT,
+                    guests INTEGER,
+                    room TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings (status);
+                CREATE INDEX IF NOT EXISTS idx_bookings_room ON bookings (room);
+                """
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        return {key: row[key] for key in row.keys() if row[key] is not None}
+
+    def get(self, guest_id: str) -> Optional[dict]:
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT * FROM bookings WHERE guest_id = ?", (guest_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_many(self, guest_ids: Iterable[str]) -> dict[str, dict]:
+        guest_ids = list(dict.fromkeys(guest_ids))
+        found = {}
+        with self.pool.connection() as connection:
+            for start in range(0, len(guest_ids), self.BATCH_SIZE):
+                batch = guest_ids[start : start + self.BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(f"SELECT * FROM bookings WHERE guest_id IN ({placeholders})", batch)
+                found.update((row["guest_id"], self._to_dict(row)) for row in rows)
+        return found
+
+    def find_by_status(self, status: str, limit: int = 100) -> list[dict]:
+        with self.pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT * FROM bookings WHERE status = ? LIMIT ?", (status, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def find_by_room(self, room: str) -> list[dict]:
+        with self.pool.connection() as connection:
+            rows = connection.execute("SELECT * FROM bookings WHERE room = ? ORDER BY guest_id", (room,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def _upsert_many(self, bookings: dict[str, dict]):
+        rows = ((guest_id, *(booking.get(key) for key in FIELDS)) for guest_id, booking in bookings.items())
+        with self.pool.connection() as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.pool.close()
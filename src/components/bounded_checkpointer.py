@@ -0,0 +1,214 @@
+"""
+A drop-in replacement for InMemorySaver that does not grow without bound.
+Threads are evicted least-recently-used first when they expire (TTL), when there are too many of them,
+or when the total serialized size passes a byte budget. Each thread also keeps only its newest checkpoints.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+class BoundedMemorySaver(InMemorySaver):
+    def __init__(
+        self,
+        *,
+        max_threads: Optional[int] = 10_000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        max_checkpoints_per_thread: Optional[int] = 4,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.evictions: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.RLock()
+        # thread_id -> last access time, least recently used first
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        self._thread_bytes: dict[str, int] = {}
+        self._thread_blobs: defaultdict[str, set[tuple]] = defaultdict(set)
+        self._thread_writes: defaultdict[str, set[tuple]] = defaultdict(set)
+        # thread_id -> (checkpoint_ns, checkpoint_id) -> channel versions, used to find unreferenced blobs
+        self._versions: defaultdict[str, dict[tuple[str, str], dict]] = defaultdict(dict)
+        self._total_bytes = 0
+
+    # Gauges
+
+    @property
+    def resident_threads(self) -> int:
+        return len(self._last_access)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "resident_threads": self.resident_threads,
+            "resident_bytes": self.resident_bytes,
+            **{f"evictions_{reason}": count for reason, count in self.evictions.items()},
+        }
+
+    # Size helpers, computed from the stored serialized payloads
+
+    def _blob_size(self, key: tuple) -> int:
+        blob = self.blobs.get(key)
+        return len(blob[1]) if blob else 0
+
+    def _checkpoint_size(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> int:
+        saved = self.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint_id)
+        return len(saved[0][1]) + len(saved[1][1]) if saved else 0
+
+    def _writes_size(self, key: tuple) -> int:
+        return sum(len(write[2][1]) for write in self.writes.get(key, {}).values())
+
+    def _charge(self, thread_id: str, delta: int):
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + delta
+        self._total_bytes += delta
+
+    def _touch(self, thread_id: str):
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    # Checkpointer interface
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._evict_expired()
+            result = super().get_tuple(config)
+            if thread_id in self._last_access:
+                self._touch(thread_id)
+            elif not any(self.storage.get(thread_id, {}).values()):
+                # the base class' defaultdict creates empty entries for unknown threads on read
+                self.storage.pop(thread_id, None)
+            return result
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        blob_keys = [(thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()]
+        with self._lock:
+            before = sum(self._blob_size(key) for key in blob_keys)
+            before += self._checkpoint_size(thread_id, checkpoint_ns, checkpoint["id"])
+            result = super().put(config, checkpoint, metadata, new_versions)
+            after = sum(self._blob_size(key) for key in blob_keys)
+            after += self._checkpoint_size(thread_id, checkpoint_ns, checkpoint["id"])
+
+            self._thread_blobs[thread_id].update(blob_keys)
+            self._versions[thread_id][(checkpoint_ns, checkpoint["id"])] = dict(checkpoint["channel_versions"])
+            self._charge(thread_id, after - before)
+            self._touch(thread_id)
+            self._trim_thread(thread_id, checkpoint_ns)
+            self._evict(keep=thread_id)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._lock:
+            before = self._writes_size(key)
+            super().put_writes(config, writes, task_id, task_path)
+            self._thread_writes[thread_id].add(key)
+            self._charge(thread_id, self._writes_size(key) - before)
+            self._touch(thread_id)
+            self._evict(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop_thread(thread_id)
+
+    # Eviction
+
+    def _trim_thread(self, thread_id: str, checkpoint_ns: str):
+        """Keep only the newest `max_checkpoints_per_thread` checkpoints and the blobs they reference."""
+        if self.max_checkpoints_per_thread is None:
+            return
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+
+        versions = self._versions[thread_id]
+        freed = 0
+        while len(checkpoints) > self.max_checkpoints_per_thread:
+            # checkpoint ids are time ordered and dicts keep insertion order, so the first one is the oldest
+            oldest = next(iter(checkpoints))
+            freed += self._checkpoint_size(thread_id, checkpoint_ns, oldest)
+            del checkpoints[oldest]
+            writes_key = (thread_id, checkpoint_ns, oldest)
+            freed += self._writes_size(writes_key)
+            self.writes.pop(writes_key, None)
+            self._thread_writes[thread_id].discard(writes_key)
+            versions.pop((checkpoint_ns, oldest), None)
+
+        referenced = {
+            (channel, version)
+            for (ns, _), channel_versions in versions.items()
+            if ns == checkpoint_ns
+            for channel, version in channel_versions.items()
+        }
+        blob_keys = self._thread_blobs[thread_id]
+        for key in [key for key in blob_keys if key[1] == checkpoint_ns and (key[2], key[3]) not in referenced]:
+            freed += self._blob_size(key)
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+        self._charge(thread_id, -freed)
+
+    def _drop_thread(self, thread_id: str, reason: Optional[str] = None):
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in self._thread_writes.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._versions.pop(thread_id, None)
+        self._last_access.pop(thread_id, None)
+        self._total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        if reason:
+            self.evictions[reason] += 1
+
+    def _evict_expired(self):
+        if self.ttl is None:
+            return
+        deadline = time.monotonic() - self.ttl
+        while self._last_access:
+            thread_id, last_access = next(iter(self._last_access.items()))
+            if last_access > deadline:
+                break
+            self._drop_thread(thread_id, reason="ttl")
+
+    def _evict(self, keep: str):
+        self._evict_expired()
+        while self.max_threads is not None and len(self._last_access) > self.max_threads:
+            self._drop_lru(keep, reason="threads")
+        while self.max_bytes is not None and self._total_bytes > self.max_bytes and len(self._last_access) > 1:
+            self._drop_lru(keep, reason="bytes")
+
+    def _drop_lru(self, keep: str, reason: str):
+        thread_id = next(iter(self._last_access))
+        if thread_id == keep:
+            # never evict the thread that is being written, rotate it to the most recent position
+            self._last_access.move_to_end(keep)
+            thread_id = next(iter(self._last_access))
+        self._drop_thread(thread_id, reason=reason)
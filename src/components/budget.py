@@ -0,0 +1,152 @@
+"""
+Per-request execution budgets for agent graphs: a wall-clock deadline, a maximum number of LLM calls and a
+maximum number of tool calls.
+
+    run = await run_with_budget(app, AgentState(current_input=question), Budget(deadline=20, max_llm_calls=4))
+    print(run.answer, run.stopped, run.usage)
+
+Nodes charge the tracker found in config["configurable"]["budget"] (see `charge`). The scheduler stops the
+graph between supersteps once any limit is reached, or cancels it at the deadline, and returns the best
+answer produced so far. A run whose state is `done` (wikicalcu's status "SUCCESS" by default) counts as
+completed, even when it used up a limit on its last step.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from langgraph.errors import GraphRecursionError
+
+from src._shared.stats import Histogram
+
+
+@dataclass(frozen=True)
+class Budget:
+    deadline: Optional[float] = 30.0
+    max_llm_calls: Optional[int] = 6
+    max_tool_calls: Optional[int] = 4
+
+
+class BudgetTracker:
+    def __init__(self, budget: Budget):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.llm_calls = 0
+        self.tool_calls = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining_time(self) -> Optional[float]:
+        if self.budget.deadline is None:
+            return None
+        return max(0.0, self.budget.deadline - self.elapsed)
+
+    def exhausted(self) -> Optional[str]:
+        """The name of the first limit that has been reached, or None."""
+        if self.budget.deadline is not None and self.elapsed >= self.budget.deadline:
+            return "deadline"
+        if self.budget.max_llm_calls is not None and self.llm_calls >= self.budget.max_llm_calls:
+            return "llm_calls"
+        if self.budget.max_tool_calls is not None and self.tool_calls >= self.budget.max_tool_calls:
+            return "tool_calls"
+        return None
+
+    def usage(self) -> dict[str, float]:
+        """Absolute usage, plus the used fraction of every limit that is set."""
+        usage = {"elapsed_s": self.elapsed, "llm_calls": self.llm_calls, "tool_calls": self.tool_calls}
+        for name, used, limit in (
+            ("deadline", self.elapsed, self.budget.deadline),
+            ("llm_calls", self.llm_calls, self.budget.max_llm_calls),
+            ("tool_calls", self.tool_calls, self.budget.max_tool_calls),
+        ):
+            if limit:
+                usage[f"{name}_used"] = used / limit
+        return usage
+
+
+def charge(config: Optional[dict], llm_calls: int = 0, tool_calls: int = 0):
+    """Count calls against the request's budget, a no-op when the graph runs without one."""
+    tracker = (config or {}).get("configurable", {}).get("budget")
+    if tracker is not None:
+        tracker.llm_calls += llm_calls
+        tracker.tool_calls += tool_calls
+
+
+@dataclass
+class BudgetedRun:
+    values: dict
+    answer: str
+    # "completed", "deadline", "llm_calls", "tool_calls" or "recursion_limit"
+    stopped: str
+    usage: dict[str, float]
+
+
+def best_answer(values: dict) -> str:
+    """The most finished output in a wikicalcu-style state: the final answer, else the tool output or thought."""
+    return values.get("final_answer") or values.get("tool_output") or values.get("thought") or ""
+
+
+def succeeded(values: dict) -> bool:
+    """Whether a wikicalcu-style state holds its final answer."""
+    return values.get("status") == "SUCCESS"
+
+
+class BudgetStats:
+    def __init__(self):
+        self.elapsed = Histogram()
+        self.llm_calls = Histogram(min_value=1)
+        self.tool_calls = Histogram(min_value=1)
+        self.stopped: Counter[str] = Counter()
+
+    def record(self, run: BudgetedRun):
+        self.elapsed.record(run.usage["elapsed_s"])
+        self.llm_calls.record(run.usage["llm_calls"])
+        self.tool_calls.record(run.usage["tool_calls"])
+        self.stopped[run.stopped] += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "elapsed_s": self.elapsed.summary(),
+            "llm_calls": self.llm_calls.summary(),
+            "tool_calls": self.tool_calls.summary(),
+            "stopped": dict(self.stopped),
+        }
+
+
+async def run_with_budget(
+    graph,
+    input: Any,
+    budget: Budget,
+    config: Optional[dict] = None,
+    answer: Callable[[dict], str] = best_answer,
+    stats: Optional[BudgetStats] = None,
+    done: Callable[[dict], bool] = succeeded,
+) -> BudgetedRun:
+    tracker = BudgetTracker(budget)
+    config = {**(config or {})}
+    config["configurable"] = {**config.get("configurable", {}), "budget": tracker}
+    values: dict = {}
+    stopped = "completed"
+    try:
+        async with asyncio.timeout(budget.deadline):
+            async with aclosing(graph.astream(input, config, stream_mode="values")) as states:
+                async for values in states:
+                    if done(values):
+                        break
+                    if reason := tracker.exhausted():
+                        stopped = reason
+                        break
+    except TimeoutError:
+        stopped = "deadline"
+    except GraphRecursionError:
+        stopped = "recursion_limit"
+
+    run = BudgetedRun(values, answer(values), stopped, tracker.usage())
+    if stats is not None:
+        stats.record(run)
+    return run
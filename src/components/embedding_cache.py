@@ -0,0 +1,185 @@
+"""
+Embeddings wrapper that batches requests and caches vectors by content hash.
+
+    embeddings = CachedEmbeddings(init_embeddings("openai:text-embedding-3-small"), path="embeddings.db")
+    store = VectorStore(index={"embed": embeddings, "dims": 1536, "fields": ["text"]})
+
+Vectors live in SQLite keyed by sha256(model, text), so re-inserting a text ("pizza", "coffee") never calls
+the model again, across restarts and processes. `model` keeps the vectors of different models apart. The texts
+that do miss are deduplicated and sent in requests of `batch_size`; the async methods send up to
+`max_concurrency` requests at once and do the SQLite lookups and writes on worker threads, so a large cache
+doesn't stall the event loop. Queries go through the same cache under keys of their own: asymmetric models
+(e5, Cohere's input_type, ...) embed a query differently from the same text as a document.
+"""
+
+import asyncio
+import hashlib
+import threading
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.components.booking_repository import SQLitePool
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_LOOKUP_SIZE = 500
+
+
+def content_hash(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        path: str = ":memory:",
+        model: str = "",
+        batch_size: int = 256,
+        max_concurrency: int = 4,
+        max_entries: Optional[int] = 1_000_000,
+        pool_size: int = 2,
+    ):
+        if path == ":memory:":
+            path = f"file:embeddings-{id(self)}?mode=memory&cache=shared"
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", "")
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_entries = max_entries
+        self.pool = SQLitePool(path, size=pool_size)
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._puts_since_trim = 0
+        with self.pool.connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    # Cache
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self.pool.connection() as connection:
+            for start in range(0, len(keys), _LOOKUP_SIZE):
+                chunk = keys[start : start + _LOOKUP_SIZE]
+                rows = connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                found.update((key, np.frombuffer(vector, dtype=np.float32).tolist()) for key, vector in rows)
+        return found
+
+    def _store(self, vectors: dict[str, list[float]]):
+        with self.pool.connection() as connection:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()],
+                )
+        with self._lock:
+            self._puts_since_trim += len(vectors)
+            trim = self.max_entries is not None and self._puts_since_trim >= max(1, self.max_entries // 100)
+        if trim:
+            self.trim()
+
+    def trim(self):
+        """Drop the oldest vectors beyond `max_entries`."""
+        with self._lock:
+            self._puts_since_trim = 0
+        with self.pool.connection() as connection:
+            with connection:
+                excess = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    connection.execute(
+                        "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+                        (excess,),
+                    )
+
+    def _plan(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        """Keys of `texts`, the vectors already cached, and the distinct texts still to embed by key."""
+        keys = [content_hash(self.model, text) for text in texts]
+        cached = self._lookup(list(dict.fromkeys(keys)))
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        missed = sum(key not in cached for key in keys)
+        with self._lock:
+            self.hits += len(keys) - missed
+            self.misses += missed
+        return keys, cached, missing
+
+    def _batches(self, missing: dict[str, str]) -> list[tuple[list[str], list[str]]]:
+        keys, texts = list(missing), list(missing.values())
+        return [
+            (keys[start : start + self.batch_size], texts[start : start + self.batch_size])
+            for start in range(0, len(keys), self.batch_size)
+        ]
+
+    # Embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._plan(texts)
+        for batch_keys, batch_texts in self._batches(missing):
+            embedded = dict(zip(batch_keys, self.embeddings.embed_documents(batch_texts)))
+            with self._lock:
+                self.requests += 1
+            # stored per batch, a failure halfway keeps what was already paid for
+            self._store(embedded)
+            vectors.update(embedded)
+        return [vectors[key] for key in keys]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = await asyncio.to_thread(self._plan, texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed(batch_keys: list[str], batch_texts: list[str]):
+            async with semaphore:
+                embedded = dict(zip(batch_keys, await self.embeddings.aembed_documents(batch_texts)))
+            with self._lock:
+                self.requests += 1
+            await asyncio.to_thread(self._store, embedded)
+            vectors.update(embedded)
+
+        await asyncio.gather(*(embed(*batch) for batch in self._batches(missing)))
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._query(text) or self._remember(text, self.embeddings.embed_query(text))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = await asyncio.to_thread(self._query, text)
+        if vector is None:
+            vector = await asyncio.to_thread(self._remember, text, await self.embeddings.aembed_query(text))
+        return vector
+
+    def _query(self, text: str) -> Optional[list[float]]:
+        key = content_hash(self.model, f"query\0{text}")
+        vector = self._lookup([key]).get(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector
+
+    def _remember(self, text: str, vector: list[float]) -> list[float]:
+        with self._lock:
+            self.requests += 1
+        self._store({content_hash(self.model, f"query\0{text}"): vector})
+        return vector
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "requests": self.requests,
+        }
+
+    def clear(self):
+        with self.pool.connection() as connection:
+            with connection:
+                connection.execute("DELETE FROM embeddings")
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,91 @@
+"""
+Concurrent tool fan-out for agent graphs: a global and a per-tool concurrency limit, per-tool deadlines,
+and errors captured as results so one failing or slow tool never costs the others theirs.
+
+    executor = FanOutExecutor(max_concurrency=8, limits={"search": ToolLimits(concurrency=2, timeout=3.0)})
+    result = await executor.run(search_tool, "query")  # {"ok": True, "output": ..., "elapsed_s": ...}
+
+In a graph, dispatch one `Send` per tool to a node calling `executor.run` and merge its result into a dict
+channel with `merge_outputs` (see src/samples/parallel_tool_call.py). LangGraph runs the sends as concurrent
+tasks of one superstep. With stream_mode="updates" each task's update is streamed as soon as it finishes,
+but the channel only sees the results at the superstep barrier, once every send has returned; the per-tool
+deadlines bound how long that takes.
+"""
+
+import asyncio
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool
+
+
+@dataclass(frozen=True)
+class ToolLimits:
+    # calls of this tool in flight at once, None for no limit beyond the global one
+    concurrency: Optional[int] = None
+    # seconds from dispatch, including the wait for a free slot, None to wait forever
+    timeout: Optional[float] = None
+
+
+def merge_outputs(left: Optional[dict], right: Optional[dict]) -> dict:
+    """Reducer for a {tool name: result} channel, applied to the sends' results at the end of the superstep."""
+    return {**(left or {}), **(right or {})}
+
+
+def fan_out_status(outputs: dict[str, dict]) -> str:
+    """SUCCESS if every tool succeeded (or none was needed), PARTIAL if some did, ERROR if none did."""
+    succeeded = sum(1 for result in outputs.values() if result.get("ok"))
+    if succeeded == len(outputs):
+        return "SUCCESS"
+    return "PARTIAL" if succeeded else "ERROR"
+
+
+class FanOutExecutor:
+    """The semaphores bind to the event loop they are first used on, use one executor per loop."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = 8,
+        default_timeout: Optional[float] = 10.0,
+        limits: Optional[dict[str, ToolLimits]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.limits = limits or {}
+        self._global = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._per_tool: dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _limits(self, name: str) -> ToolLimits:
+        return self.limits.get(name) or ToolLimits(timeout=self.default_timeout)
+
+    def _semaphore(self, name: str):
+        concurrency = self._limits(name).concurrency
+        if concurrency is None:
+            return nullcontext()
+        if name not in self._per_tool:
+            self._per_tool[name] = asyncio.Semaphore(concurrency)
+        return self._per_tool[name]
+
+    async def run(self, tool: BaseTool, tool_input: Any) -> dict[str, Any]:
+        """Call `tool` within its limits. Never raises (except on cancellation), failures are returned."""
+        limits = self._limits(tool.name)
+        deadline = asyncio.timeout(limits.timeout)
+        started = time.perf_counter()
+        try:
+            async with deadline:
+                # the tool's own slot first, so calls queued behind their tool's limit don't hold global slots
+                async with self._semaphore(tool.name), self._global or nullcontext():
+                    self.in_flight += 1
+                    self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                    try:
+                        output = await tool.ainvoke(tool_input)
+                    finally:
+                        self.in_flight -= 1
+            return {"ok": True, "output": output, "elapsed_s": time.perf_counter() - started}
+        except Exception as e:
+            error = f"timed out after {limits.timeout:g}s" if deadline.expired() else f"{type(e).__name__}: {e}"
+        return {"ok": False, "error": error, "elapsed_s": time.perf_counter() - started}
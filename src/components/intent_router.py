@@ -0,0 +1,31 @@
+"""
+Keyword intent router.
+The intent table is built once at import time; a match returns both the target node
+and the argument text following the phrase, so downstream nodes don't re-parse the message.
+"""
+
+from typing import NamedTuple, Optional, Sequence
+
+
+class IntentMatch(NamedTuple):
+    target: str
+    phrase: str
+    argument: str
+
+
+class IntentRouter:
+    def __init__(self, intents: Sequence[tuple[str, str]]):
+        """`intents` is a list of (phrase, target) pairs in priority order, first wins."""
+        self.intents = tuple((phrase.lower(), target) for phrase, target in intents)
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        text = text.strip()
+        lowered = text.lower()
+        # str.find runs in C; for a handful of short phrases this beats any automaton walked in Python
+        for phrase, target in self.intents:
+            index = lowered.find(phrase)
+            if index >= 0:
+                # lower() can change the length of some unicode strings, keep offsets consistent
+                source = text if len(text) == len(lowered) else lowered
+                return IntentMatch(target=target, phrase=phrase, argument=source[index + len(phrase) :].strip())
+        return None
@@ -0,0 +1,135 @@
+"""
+Incremental parsing of a JSON object streamed token by token, e.g. an LLM's structured reply.
+
+    parser = JSONObjectStream()
+    async for chunk in llm.astream(prompt):
+        for key, value in parser.feed(chunk.content):
+            ...  # a top-level field is complete, act on it before the rest of the reply arrives
+    result = parser.close()
+
+Each top-level field is reported once its value is complete. Text before the opening brace, such as a
+```json fence, is skipped. Malformed input raises ValueError from `feed` or `close`.
+"""
+
+import json
+from typing import Any, Iterator
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONObjectStream:
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self._buffer = ""
+        self._pos = 0
+        # before, key, colon, value, comma, done
+        self._state = "before"
+        self._key = ""
+        self._value_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """Add the next chunk, return the top-level (key, value) pairs it completed."""
+        self._buffer += text
+        return list(self._parse())
+
+    def close(self) -> dict[str, Any]:
+        if self._state != "done":
+            raise ValueError(f"incomplete JSON object: {self._buffer[-80:]!r}")
+        return self.fields
+
+    def _parse(self) -> Iterator[tuple[str, Any]]:
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            state = self._state
+            if state == "value":
+                if self._pos == self._value_start and char in _WHITESPACE:
+                    # whitespace before the value
+                    self._value_start += 1
+                elif self._scan_value(char):
+                    yield self._complete_value(self._pos + 1)
+                elif self._depth == 0 and not self._in_string and char in ",}" + _WHITESPACE:
+                    # the end of a bare literal (number, true, false, null) is the delimiter after it
+                    yield self._complete_value(self._pos)
+                    continue
+            elif char in _WHITESPACE:
+                pass
+            elif state == "before":
+                if char == "{":
+                    self._state = "key"
+            elif state == "key":
+                if char == '"':
+                    end = self._string_end(self._pos)
+                    if end is None:
+                        return
+                    self._key = json.loads(buffer[self._pos : end + 1])
+                    self._pos = end
+                    self._state = "colon"
+                elif char == "}" and not self.fields:
+                    self._state = "done"
+                else:
+                    raise ValueError(f"expected a key at {self._pos}: {buffer[self._pos:self._pos + 20]!r}")
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"expected ':' at {self._pos}")
+                self._state = "value"
+                self._value_start = self._pos + 1
+            elif state == "comma":
+                if char == ",":
+                    self._state = "key"
+                elif char == "}":
+                    self._state = "done"
+                else:
+                    raise ValueError(f"expected ',' or '}}' at {self._pos}")
+            elif state == "done":
+                break
+            self._pos += 1
+
+    def _scan_value(self, char: str) -> bool:
+        """Track strings and nesting inside a value, True when a string, object or array value just closed."""
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                return self._depth == 0
+            return False
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]" and self._depth > 0:
+            self._depth -= 1
+            return self._depth == 0
+        return False
+
+    def _complete_value(self, end: int) -> tuple[str, Any]:
+        raw = self._buffer[self._value_start : end].strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid value for {self._key!r}: {raw[:40]!r}") from e
+        self.fields[self._key] = value
+        self._state = "comma"
+        return self._key, value
+
+    def _string_end(self, start: int):
+        escaped = False
+        for index in range(start + 1, len(self._buffer)):
+            char = self._buffer[index]
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                return index
+        return None
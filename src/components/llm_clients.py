@@ -0,0 +1,89 @@
+"""
+One chat model client per (model, temperature), all sharing a bounded, keep-alive HTTP connection pool.
+
+    models = ModelRegistry()
+    llm = models.get("gpt-4o-mini", temperature=0)
+
+Building a ChatOpenAI per call creates a new OpenAI client and with it a new connection pool, so every
+request pays for a fresh TCP connection and TLS handshake. Clients from the registry reuse connections.
+The async pool is bound to the event loop it is first used on, use one registry per loop.
+"""
+
+import threading
+from typing import Any, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        **model_kwargs: Any,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model_kwargs = model_kwargs
+        self._models: dict[tuple[str, float], ChatOpenAI] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        return self._http_client
+
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        if self._http_async_client is None:
+            self._http_async_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._http_async_client
+
+    def get(self, model: str = DEFAULT_MODEL, temperature: float = 0.0) -> ChatOpenAI:
+        key = (model, temperature)
+        llm = self._models.get(key)
+        if llm is not None:
+            return llm
+        with self._lock:
+            if key not in self._models:
+                kwargs = dict(self.model_kwargs)
+                if self.base_url:
+                    kwargs["base_url"] = self.base_url
+                if self.api_key:
+                    kwargs["api_key"] = self.api_key
+                self._models[key] = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                    **kwargs,
+                )
+            return self._models[key]
+
+    def close(self):
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+        self._models.clear()
+
+    async def aclose(self):
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+            self._http_async_client = None
+        self.close()
@@ -0,0 +1,354 @@
+"""
+VectorStore that keeps its items and vectors on disk, so a restart neither loses the memories nor re-embeds them.
+
+    store = PersistentVectorStore("memories", index={"embed": embeddings, "dims": 1536, "fields": ["text"]})
+    ...
+    store.close()
+
+Every namespace gets a directory holding:
+  vectors.<gen>      the vectors, row i holding vector id i, float32 or float16 (`dtype`). Searches read them
+                     through a memory map (MmapIndex), so opening maps the file instead of loading it
+  log.<gen>.jsonl    append-only metadata, one line per put (key, value, timestamps, and the field path and
+                     vector id of each embedding) or per delete
+  CURRENT            the live generation
+Opening replays the logs and nothing else. Updates and deletes leave dead rows in the vector file. Once they
+make up `compact_ratio` of a namespace, a background thread writes the next generation of both files from
+the live rows, and the next store call swaps it in by rewriting CURRENT, so a crash leaves one generation or
+the other whole. Writes go through the page cache, so a process that dies loses nothing; `close` syncs them
+to disk.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from langgraph.store.base import IndexConfig, Item, Op, Result
+
+from src.components.vector_index import MmapIndex
+from src.components.vector_store import VectorStore, _NamespaceVectors
+
+
+def _read_log(path: str, start: int = 0, stop: Optional[int] = None) -> tuple[list[dict], int]:
+    """The records of a log between bytes `start` and `stop`, and the offset after the last complete line."""
+    with open(path, "rb") as log:
+        log.seek(start)
+        data = log.read(-1 if stop is None else stop - start)
+    # a line torn by a crash is left out
+    end = data.rfind(b"\n") + 1
+    # json.dumps escapes newlines inside values, so the lines join into one array: a single, much faster loads
+    records = json.loads(b"[" + data[: end - 1].replace(b"\n", b",") + b"]") if end else []
+    return records, start + end
+
+
+def _fold(records: Iterable[dict]) -> dict[str, dict]:
+    """The last put of every key that wasn't deleted since."""
+    latest: dict[str, dict] = {}
+    for record in records:
+        if record.get("deleted"):
+            latest.pop(record["key"], None)
+        else:
+            latest[record["key"]] = record
+    return latest
+
+
+def _write_atomic(path: str, text: str):
+    with open(path + ".tmp", "w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def _discard(index: MmapIndex, paths: list[str]):
+    index.close(sync=False)
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class _NamespaceFiles:
+    def __init__(self, directory: str, namespace: tuple[str, ...], dtype: np.dtype):
+        self.directory = directory
+        self.namespace = namespace
+        self.dtype = dtype
+        with open(os.path.join(directory, "CURRENT")) as current:
+            self.generation = int(current.read())
+        # left behind by a crash: a retired generation not deleted yet, or a compaction never swapped in
+        for name in os.listdir(directory):
+            if name.startswith(("log.", "vectors.")) and name.split(".")[1] != str(self.generation):
+                os.remove(os.path.join(directory, name))
+        self.log = open(self.log_path(), "a", encoding="utf-8")
+
+    def log_path(self, generation: Optional[int] = None) -> str:
+        return os.path.join(self.directory, f"log.{self.generation if generation is None else generation}.jsonl")
+
+    def vectors_path(self, generation: Optional[int] = None) -> str:
+        return os.path.join(self.directory, f"vectors.{self.generation if generation is None else generation}")
+
+    def append(self, records: list[dict]):
+        self.log.write("".join(json.dumps(record) + "\n" for record in records))
+        self.log.flush()
+
+    def switch(self, generation: int) -> list[str]:
+        """Make `generation` current, and return the files of the one before."""
+        _write_atomic(os.path.join(self.directory, "CURRENT"), str(generation))
+        self.log.close()
+        retired = [self.log_path(), self.vectors_path()]
+        self.generation = generation
+        self.log = open(self.log_path(), "a", encoding="utf-8")
+        return retired
+
+    def close(self):
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.log.close()
+
+
+class _Compacted:
+    """The next generation of a namespace, as of byte `end` of the current log."""
+
+    def __init__(self, generation: int, index: MmapIndex, end: int, renumbered: dict[int, int]):
+        self.generation = generation
+        self.index = index
+        self.end = end
+        # old vector id -> new one, for the live rows
+        self.renumbered = renumbered
+
+
+class PersistentVectorStore(VectorStore):
+    def __init__(
+        self,
+        path: str,
+        *,
+        index: Optional[IndexConfig] = None,
+        dtype: str = "float32",
+        compact_ratio: float = 0.3,
+        compact_min: int = 1024,
+    ) -> None:
+        super().__init__(index=index)
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.compact_ratio = compact_ratio
+        # dead rows below this never trigger a compaction, however small the namespace
+        self.compact_min = compact_min
+        self.compactions = 0
+        self._files: dict[tuple[str, ...], _NamespaceFiles] = {}
+        # field path and vector id of the embeddings added by the batch being written, by (namespace, key)
+        self._pending: defaultdict[tuple[tuple[str, ...], str], list[list]] = defaultdict(list)
+        self._compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compaction")
+        self._compacting: dict[tuple[str, ...], Future] = {}
+        self._writing = 0
+        os.makedirs(path, exist_ok=True)
+        for name in sorted(os.listdir(path)):
+            if os.path.exists(os.path.join(path, name, "namespace.json")):
+                self._open(os.path.join(path, name))
+
+    # Files
+
+    def _open(self, directory: str):
+        with open(os.path.join(directory, "namespace.json")) as meta_file:
+            meta = json.load(meta_file)
+        namespace = tuple(meta["namespace"])
+        files = _NamespaceFiles(directory, namespace, np.dtype(meta["dtype"]))
+        records, end = _read_log(files.log_path())
+        if end < files.log.tell():
+            files.log.truncate(end)
+        self._files[namespace] = files
+        latest = _fold(records)
+        for key, record in latest.items():
+            self._data[namespace][key] = Item(
+                value=record["value"],
+                key=key,
+                namespace=namespace,
+                created_at=datetime.fromisoformat(record["created_at"]),
+                updated_at=datetime.fromisoformat(record["updated_at"]),
+            )
+        if not self.index_config or meta["dims"] is None:
+            return
+        if meta["dims"] != self.index_config["dims"]:
+            raise ValueError(
+                f"{directory} holds {meta['dims']} dimensional vectors, the index has {self.index_config['dims']}"
+            )
+        # ids are never reused within a generation, the next one follows the highest ever logged
+        next_id = 1 + max((id_ for record in records for _path, id_ in record.get("vectors", ())), default=-1)
+        vectors_ns = _NamespaceVectors(None)
+        for key, record in latest.items():
+            for _path, id_ in record["vectors"]:
+                vectors_ns.ids_by_key.setdefault(key, []).append(id_)
+                vectors_ns.keys[id_] = key
+        vectors_ns.next_id = next_id
+        vectors_ns.index = MmapIndex(
+            files.vectors_path(), meta["dims"], files.dtype, size=next_id, live=vectors_ns.keys
+        )
+        self._indexes[namespace] = vectors_ns
+
+    def _namespace_files(self, namespace: tuple[str, ...]) -> _NamespaceFiles:
+        files = self._files.get(namespace)
+        if files is None:
+            directory = os.path.join(self.path, hashlib.sha1(json.dumps(namespace).encode()).hexdigest()[:16])
+            os.makedirs(directory, exist_ok=True)
+            _write_atomic(os.path.join(directory, "CURRENT"), "0")
+            meta = {
+                "namespace": list(namespace),
+                "dims": self.index_config["dims"] if self.index_config else None,
+                "dtype": self.dtype.name,
+            }
+            # written last, a directory without it is an interrupted creation and gets redone
+            _write_atomic(os.path.join(directory, "namespace.json"), json.dumps(meta))
+            files = self._files[namespace] = _NamespaceFiles(directory, namespace, self.dtype)
+        return files
+
+    def _namespace_vectors(self, namespace: tuple[str, ...]) -> _NamespaceVectors:
+        vectors_ns = self._indexes.get(namespace)
+        if vectors_ns is None:
+            files = self._namespace_files(namespace)
+            index = MmapIndex(files.vectors_path(), self.index_config["dims"], files.dtype)
+            vectors_ns = self._indexes[namespace] = _NamespaceVectors(index)
+        return vectors_ns
+
+    # Writes
+
+    def batch(self, ops: Iterable[Op]) -> list[Result]:
+        self._swap_compacted()
+        return super().batch(ops)
+
+    async def abatch(self, ops: Iterable[Op]) -> list[Result]:
+        self._swap_compacted()
+        # a compaction mustn't be swapped in while a write waits for its embeddings
+        self._writing += 1
+        try:
+            return await super().abatch(ops)
+        finally:
+            self._writing -= 1
+
+    def _add_vectors(self, namespace: tuple[str, ...], refs: list[tuple[str, str]], vectors: np.ndarray) -> np.ndarray:
+        ids = super()._add_vectors(namespace, refs, vectors)
+        for id_, (key, path) in zip(ids.tolist(), refs):
+            self._pending[(namespace, key)].append([path, id_])
+        return ids
+
+    def _apply_put_ops(self, put_ops: dict) -> None:
+        super()._apply_put_ops(put_ops)
+        records: defaultdict[tuple[str, ...], list[dict]] = defaultdict(list)
+        for (namespace, key), op in put_ops.items():
+            if op.value is None:
+                if namespace in self._files:
+                    records[namespace].append({"key": key, "deleted": True})
+                continue
+            item = self._data[namespace][key]
+            records[namespace].append(
+                {
+                    "key": key,
+                    "value": item.value,
+                    "created_at": item.created_at.isoformat(),
+                    "updated_at": item.updated_at.isoformat(),
+                    "vectors": self._pending.pop((namespace, key), []),
+                }
+            )
+        for namespace, lines in records.items():
+            self._namespace_files(namespace).append(lines)
+            self._maybe_compact(namespace)
+
+    # Compaction
+
+    def _dead(self, namespace: tuple[str, ...]) -> int:
+        index = self._indexes[namespace].index
+        return index.size - len(index)
+
+    def _maybe_compact(self, namespace: tuple[str, ...]):
+        if namespace not in self._indexes or namespace in self._compacting:
+            return
+        dead = self._dead(namespace)
+        if dead >= max(self.compact_min, self.compact_ratio * self._indexes[namespace].index.size):
+            self._start_compaction(namespace)
+
+    def _start_compaction(self, namespace: tuple[str, ...]):
+        files = self._files[namespace]
+        self._compacting[namespace] = self._compactor.submit(
+            self._compact, files, self._indexes[namespace].index, files.log.tell()
+        )
+
+    @staticmethod
+    def _compact(files: _NamespaceFiles, index: MmapIndex, end: int) -> _Compacted:
+        """Writes the next generation from the log up to `end`. Rows are written once, so reading them while the
+        store keeps appending is safe."""
+        generation = files.generation + 1
+        latest = _fold(_read_log(files.log_path(), 0, end)[0])
+        old_ids = np.array([id_ for record in latest.values() for _path, id_ in record["vectors"]], dtype=np.int64)
+        target = MmapIndex(files.vectors_path(generation), index.dims, index.dtype, size=0)
+        for start in range(0, len(old_ids), MmapIndex.CHUNK):
+            chunk = old_ids[start : start + MmapIndex.CHUNK]
+            target.add(np.arange(start, start + len(chunk)), index.rows(chunk))
+        target.flush()
+        renumbered = dict(zip(old_ids.tolist(), range(len(old_ids))))
+        with open(files.log_path(generation), "w", encoding="utf-8") as log:
+            for record in latest.values():
+                record["vectors"] = [[path, renumbered[id_]] for path, id_ in record["vectors"]]
+                log.write(json.dumps(record) + "\n")
+        return _Compacted(generation, target, end, renumbered)
+
+    def _swap_compacted(self, wait: bool = False):
+        if self._writing:
+            return
+        for namespace, future in list(self._compacting.items()):
+            if not (wait or future.done()):
+                continue
+            del self._compacting[namespace]
+            compacted = future.result()
+            files, vectors_ns = self._files[namespace], self._indexes[namespace]
+            # the writes made while the compaction ran: copy their vectors over and log them renumbered
+            tail, _ = _read_log(files.log_path(), compacted.end)
+            target, renumbered = compacted.index, compacted.renumbered
+            for record in tail:
+                fresh = [id_ for _path, id_ in record.get("vectors", ()) if id_ not in renumbered]
+                if fresh:
+                    renumbered.update(zip(fresh, range(target.size, target.size + len(fresh))))
+                    target.add(np.array([renumbered[id_] for id_ in fresh]), vectors_ns.index.rows(np.array(fresh)))
+                if "vectors" in record:
+                    record["vectors"] = [[path, renumbered[id_]] for path, id_ in record["vectors"]]
+            target.flush()
+            with open(files.log_path(compacted.generation), "a", encoding="utf-8") as log:
+                log.write("".join(json.dumps(record) + "\n" for record in tail))
+                log.flush()
+                os.fsync(log.fileno())
+            retired = files.switch(compacted.generation)
+            vectors_ns.ids_by_key = {
+                key: [renumbered[id_] for id_ in ids] for key, ids in vectors_ns.ids_by_key.items()
+            }
+            vectors_ns.keys = {renumbered[id_]: key for id_, key in vectors_ns.keys.items()}
+            vectors_ns.next_id = target.size
+            # rows copied for keys deleted or rewritten during the compaction
+            target.remove(np.setdiff1d(np.arange(target.size), np.fromiter(vectors_ns.keys, dtype=np.int64)))
+            # unmapping and deleting a large file can take seconds, the compaction thread does it
+            self._compactor.submit(_discard, vectors_ns.index, retired)
+            vectors_ns.index = target
+            self.compactions += 1
+
+    def compact(self):
+        """Compact every namespace with dead rows now, waiting for it."""
+        # a compaction already running only covers the log up to where it started, finish it first
+        self._swap_compacted(wait=True)
+        for namespace in self._indexes:
+            if namespace not in self._compacting and self._dead(namespace):
+                self._start_compaction(namespace)
+        self._swap_compacted(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "dead_vectors": sum(self._dead(namespace) for namespace in self._indexes),
+            "compactions": self.compactions,
+        }
+
+    def close(self):
+        self._swap_compacted(wait=True)
+        self._compactor.shutdown()
+        for vectors_ns in self._indexes.values():
+            vectors_ns.index.close()
+        for files in self._files.values():
+            files.close()
@@ -0,0 +1,255 @@
+"""
+A bounded cache of chat model replies, matched on the normalized prompt and, with an embedding model,
+on the similarity of the query it answers.
+
+    cache = ResponseCache(embeddings=embeddings, threshold=0.95)
+    found, reply = await cache.aget(prompt, namespace="think", query=user_input)
+    if not found:
+        reply = (await llm.ainvoke(prompt)).content
+        await cache.aput(prompt, reply, namespace="think", query=user_input)
+
+Replies are only comparable within a namespace, e.g. one prompt template on one model. The query is the
+part of the prompt that varies, by default the prompt itself; embedding a whole templated prompt makes every
+prompt look alike. The vectors sit in one float32 matrix, a semantic lookup is a single matrix-vector product.
+Only cache replies sampled at temperature 0, and pick the threshold on real traffic: two questions a word
+apart ("5 times 12" and "5 times 13") can be close neighbours.
+
+It is also a LangChain `BaseCache`, so it can be passed as `cache=` to a chat model. The serialized messages
+are the prompt and the model's parameters the namespace.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Sequence
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.embeddings import Embeddings
+
+from src.components.tool_cache import normalize_input
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: float
+    # row in the vector matrix, None without embeddings
+    slot: Optional[int]
+
+
+def messages_text(prompt: str) -> str:
+    """The conversation in a BaseCache prompt (serialized messages) without the system prompt, one line each."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    lines = []
+    for message in messages if isinstance(messages, list) else []:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        if kwargs.get("type") in (None, "system"):
+            continue
+        # tool call ids differ on every run, only the calls themselves say what the message means
+        calls = " ".join(f"{call['name']}({json.dumps(call['args'])})" for call in kwargs.get("tool_calls", []))
+        text = " ".join(part for part in (str(kwargs.get("content", "")), calls) if part)
+        lines.append(f"{kwargs['type']}: {text}".strip())
+    return "\n".join(lines) or prompt
+
+
+class ResponseCache(BaseCache):
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        embeddings: Optional[Embeddings] = None,
+        threshold: float = 0.95,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embeddings = embeddings
+        # cosine similarity a query needs to reuse another query's reply
+        self.threshold = threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        # one row per entry, freed rows are reused
+        self._vectors: Optional[np.ndarray] = None
+        self._namespaces = np.zeros(0, dtype=np.int32)
+        self._slot_keys: list[Optional[tuple[str, str]]] = []
+        self._free: list[int] = []
+        self._namespace_ids: dict[str, int] = {}
+        # the vector of a missed query, so the put that follows the miss doesn't embed it again
+        self._recent: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    # Lookups
+
+    def get(self, prompt: str, namespace: str = "", query: Optional[str] = None) -> tuple[bool, Any]:
+        found, value = self._get_exact((namespace, normalize_input(prompt)))
+        if found or self.embeddings is None:
+            return self._count(found, semantic=False), value
+        query = normalize_input(prompt if query is None else query)
+        vector = self._recent_vector(query)
+        if vector is None:
+            vector = self._remember(query, self.embeddings.embed_query(query))
+        found, value = self._get_similar(namespace, vector)
+        return self._count(found, semantic=True), value
+
+    async def aget(self, prompt: str, namespace: str = "", query: Optional[str] = None) -> tuple[bool, Any]:
+        found, value = self._get_exact((namespace, normalize_input(prompt)))
+        if found or self.embeddings is None:
+            return self._count(found, semantic=False), value
+        query = normalize_input(prompt if query is None else query)
+        vector = self._recent_vector(query)
+        if vector is None:
+            vector = self._remember(query, await self.embeddings.aembed_query(query))
+        found, value = self._get_similar(namespace, vector)
+        return self._count(found, semantic=True), value
+
+    def put(self, prompt: str, value: Any, namespace: str = "", query: Optional[str] = None):
+        vector = None
+        if self.embeddings is not None:
+            query = normalize_input(prompt if query is None else query)
+            vector = self._recent_vector(query)
+            if vector is None:
+                vector = self._remember(query, self.embeddings.embed_query(query))
+        self._put((namespace, normalize_input(prompt)), value, vector)
+
+    async def aput(self, prompt: str, value: Any, namespace: str = "", query: Optional[str] = None):
+        vector = None
+        if self.embeddings is not None:
+            query = normalize_input(prompt if query is None else query)
+            vector = self._recent_vector(query)
+            if vector is None:
+                vector = self._remember(query, await self.embeddings.aembed_query(query))
+        self._put((namespace, normalize_input(prompt)), value, vector)
+
+    def _count(self, found: bool, semantic: bool) -> bool:
+        with self._lock:
+            if not found:
+                self.misses += 1
+            elif semantic:
+                self.semantic_hits += 1
+            else:
+                self.hits += 1
+        return found
+
+    def _get_exact(self, key: tuple[str, str]) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    def _get_similar(self, namespace: str, vector: np.ndarray) -> tuple[bool, Any]:
+        with self._lock:
+            namespace_id = self._namespace_ids.get(namespace)
+            if namespace_id is None or self._vectors is None:
+                return False, None
+            size = len(self._slot_keys)
+            scores = self._vectors[:size] @ vector
+            # freed rows have namespace -1
+            scores[self._namespaces[:size] != namespace_id] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return False, None
+            key = self._slot_keys[best]
+            entry = self._entries[key]
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry.value
+
+    # Storage
+
+    def _recent_vector(self, query: str) -> Optional[np.ndarray]:
+        with self._lock:
+            return self._recent.get(query)
+
+    def _remember(self, query: str, embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+        with self._lock:
+            self._recent[query] = vector
+            while len(self._recent) > 256:
+                self._recent.popitem(last=False)
+        return vector
+
+    def _put(self, key: tuple[str, str], value: Any, vector: Optional[np.ndarray]):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            slot = None if vector is None else self._add_vector(key, vector)
+            self._entries[key] = _Entry(value, expires_at, slot)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _add_vector(self, key: tuple[str, str], vector: np.ndarray) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros((64, len(vector)), dtype=np.float32)
+            self._namespaces = np.full(64, -1, dtype=np.int32)
+        if self._free:
+            slot = self._free.pop()
+            self._slot_keys[slot] = key
+        else:
+            slot = len(self._slot_keys)
+            self._slot_keys.append(key)
+            if slot == len(self._vectors):
+                # grow by doubling, so appends stay amortized O(dims)
+                self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+                self._namespaces = np.concatenate([self._namespaces, np.full(slot, -1, dtype=np.int32)])
+        self._vectors[slot] = vector
+        self._namespaces[slot] = self._namespace_ids.setdefault(key[0], len(self._namespace_ids))
+        return slot
+
+    def _remove(self, key: tuple[str, str]):
+        entry = self._entries.pop(key)
+        if entry.slot is not None:
+            self._namespaces[entry.slot] = -1
+            self._slot_keys[entry.slot] = None
+            self._free.append(entry.slot)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    # BaseCache, for `cache=` on chat models
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        found, value = self.get(prompt, namespace=llm_string, query=messages_text(prompt))
+        return value if found else None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.put(prompt, return_val, namespace=llm_string, query=messages_text(prompt))
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        found, value = await self.aget(prompt, namespace=llm_string, query=messages_text(prompt))
+        return value if found else None
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await self.aput(prompt, return_val, namespace=llm_string, query=messages_text(prompt))
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._vectors = None
+            self._namespaces = np.zeros(0, dtype=np.int32)
+            self._slot_keys.clear()
+            self._free.clear()
+            self._recent.clear()
@@ -0,0 +1,189 @@
+"""
+A persistent, size-bounded cache for the results of idempotent tools such as Wikipedia lookups.
+
+Results live in SQLite, so they survive restarts and are shared between processes. Entries expire after a
+TTL and the least recently used ones are evicted past `max_entries`. Concurrent requests for the same key
+are coalesced: one caller computes the value, the others wait for it (single-flight). If that caller is
+cancelled instead of failing, the waiters don't inherit its cancellation, one of them computes the value.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+from src.components.booking_repository import SQLitePool
+
+# handed to the waiters of a flight whose leader was cancelled
+_RETRY = object()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        path: str = "tool_results.db",
+        max_entries: int = 100_000,
+        ttl: Optional[float] = 7 * 24 * 3600.0,
+        pool_size: int = 4,
+        touch_interval: float = 60.0,
+    ):
+        if path == ":memory:":
+            path = f"file:results-{id(self)}?mode=memory&cache=shared"
+        self.pool = SQLitePool(path, size=pool_size)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # last_access is only rewritten when it is older than this, so hot keys don't turn reads into writes
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._flights: dict[str, Future] = {}
+        self._async_flights: dict[str, asyncio.Future] = {}
+        self._puts_since_trim = 0
+        with self.pool.connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+                """)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        now = time.time()
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "SELECT value, expires_at, last_access FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row["expires_at"] is not None and row["expires_at"] < now):
+                if row is not None:
+                    with connection:
+                        connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return False, None
+            if row["last_access"] < now - self.touch_interval:
+                with connection:
+                    connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return True, json.loads(row["value"])
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self.pool.connection() as connection:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), expires_at, now),
+                )
+        self._puts_since_trim += 1
+        # counting rows is a scan, trim in batches rather than on every put
+        if self._puts_since_trim >= max(1, self.max_entries // 100):
+            self.trim()
+
+    def trim(self):
+        """Drop expired entries, then the least recently used ones beyond `max_entries`."""
+        self._puts_since_trim = 0
+        with self.pool.connection() as connection:
+            with connection:
+                expired = connection.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),)).rowcount
+                excess = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    connection.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                        (excess,),
+                    )
+                self.evictions += expired + max(excess, 0)
+
+    def clear(self):
+        with self.pool.connection() as connection:
+            with connection:
+                connection.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    # Single-flight
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        while True:
+            found, value = self.get(key)
+            if found:
+                return value
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = Future()
+            if leader:
+                break
+            self.coalesced += 1
+            value = flight.result()
+            if value is not _RETRY:
+                return value
+        try:
+            value = compute()
+            self.put(key, value)
+            flight.set_result(value)
+            return value
+        except Exception as error:
+            flight.set_exception(error)
+            raise
+        finally:
+            if not flight.done():
+                # interrupted rather than failed: the waiters start over, one of them computes the value
+                flight.set_result(_RETRY)
+            with self._lock:
+                del self._flights[key]
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Like `get_or_compute`, with the SQLite work on a worker thread so the event loop keeps running."""
+        while True:
+            found, value = await asyncio.to_thread(self.get, key)
+            if found:
+                return value
+            flight = self._async_flights.get(key)
+            if flight is None:
+                break
+            self.coalesced += 1
+            # shield: one waiter being cancelled must not cancel the shared computation's result
+            value = await asyncio.shield(flight)
+            if value is not _RETRY:
+                return value
+        flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await compute()
+            await asyncio.to_thread(self.put, key, value)
+            flight.set_result(value)
+            return value
+        except Exception as error:
+            flight.set_exception(error)
+            # the leader re-raises, mark the exception retrieved in case nobody else was waiting
+            flight.exception()
+            raise
+        finally:
+            if not flight.done():
+                # the leader was cancelled, e.g. by its own session's deadline. That is no answer for the
+                # other sessions waiting on this key: they start over and one of them computes the value
+                flight.set_result(_RETRY)
+            del self._async_flights[key]
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self.pool.close()
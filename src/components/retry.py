@@ -0,0 +1,180 @@
+"""
+Retries for flaky tools: exponential backoff with jitter, and a circuit breaker per tool shared by every
+session in the process, so a failing dependency gets a trickle of probes instead of a retry storm.
+
+    scheduler = RetryScheduler(Backoff(max_attempts=3, base_delay=0.2), failure_threshold=5, reset_timeout=10.0)
+    result = await scheduler.call("search", search.ainvoke, "query")  # retries, or raises
+
+As graph nodes (see src/samples/route_by_status.py): a tool node makes one attempt with `scheduler.attempt`,
+a status node asks `scheduler.next_delay` whether and when to retry, and a retry node sleeps that long.
+An open circuit fails fast with CircuitOpenError, without calling the tool. After `reset_timeout` it lets
+`half_open_calls` probes through, and closes again on the first success.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit for {name} is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Backoff:
+    # attempts in total, the first call included
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    # 1.0 draws the delay uniformly below the exponential cap ("full jitter"), 0.0 always waits the cap
+    jitter: float = 1.0
+
+    def delay(self, failures: int, rng: random.Random = random) -> float:
+        """Delay before the next attempt, after `failures` failed attempts so far."""
+        cap = min(self.max_delay, self.base_delay * self.multiplier ** max(0, failures - 1))
+        return cap * (1 - self.jitter * rng.random())
+
+
+class CircuitBreaker:
+    """closed: calls go through. open: calls fail fast. half_open: a few probes decide which one is next."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0, half_open_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and self.retry_after() == 0:
+                self.state = "half_open"
+                self._probes = 0
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """Whether calls would be rejected right now, without taking a half-open probe."""
+        with self._lock:
+            if self.state == "open":
+                return self.retry_after() > 0
+            return self.state == "half_open" and self._probes >= self.half_open_calls
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def release(self):
+        """Give back a half-open probe whose call ended without a verdict."""
+        with self._lock:
+            if self.state == "half_open" and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryScheduler:
+    def __init__(
+        self,
+        backoff: Backoff = Backoff(),
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        half_open_calls: int = 1,
+        retry_on: tuple[type[BaseException], ...] = (Exception,),
+        rng: Optional[random.Random] = None,
+    ):
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.retry_on = retry_on
+        self.rng = rng or random.Random()
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.setdefault(
+                    name, CircuitBreaker(name, self.failure_threshold, self.reset_timeout, self.half_open_calls)
+                )
+        return breaker
+
+    async def attempt(self, name: str, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """One call through `name`'s circuit breaker. Raises CircuitOpenError without calling when it is open."""
+        breaker = self.breaker(name)
+        if not breaker.allow():
+            raise CircuitOpenError(name, breaker.retry_after())
+        try:
+            result = await func(*args, **kwargs)
+        except self.retry_on:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # cancelled, or an error that says nothing about the tool's health
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    def next_delay(self, name: str, failures: int) -> Optional[float]:
+        """Seconds to wait before retrying after `failures` failed attempts, None to give up."""
+        if failures >= self.backoff.max_attempts or self.breaker(name).is_open():
+            return None
+        return self.backoff.delay(failures, self.rng)
+
+    async def call(self, name: str, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Call with retries. Raises the last error once out of attempts, or CircuitOpenError."""
+        failures = 0
+        while True:
+            try:
+                return await self.attempt(name, func, *args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except self.retry_on:
+                failures += 1
+                delay = self.next_delay(name, failures)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
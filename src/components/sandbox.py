@@ -0,0 +1,284 @@
+"""
+A pool of warm Python worker processes for running REPL code off the event loop.
+
+    sandbox = PythonSandbox(workers=4, timeout=10, memory_limit=512 * 2**20)
+    output = await sandbox.arun("print(sum(range(10**7)))")
+
+Every call runs in a fresh namespace in one of the workers and returns whatever it printed (or the repr
+of the exception it raised). A call that runs past its timeout, or a worker that dies, gets the worker
+killed and replaced; workers are also recycled after `max_calls` calls so leaks don't accumulate.
+Replacements are started on a background thread, callers never wait for a process to start.
+
+This is a resource limiter, not isolation: the code runs with full builtins and the permissions of the
+worker process, so it can read files, open sockets or start processes like any other code in the app.
+Only run code here that you would be willing to run in-process.
+"""
+
+import asyncio
+import builtins
+import importlib
+import io
+import multiprocessing
+import re
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # not available on Windows, memory limits are skipped there
+    resource = None
+
+
+def sanitize_input(code: str) -> str:
+    """Strip whitespace, backticks and a leading "python", as PythonREPLTool does."""
+    code = re.sub(r"^(\s|`)*(?i:python)?\s*", "", code)
+    return re.sub(r"(\s|`)*$", "", code)
+
+
+def _execute(code: str, max_output: int) -> str:
+    output = io.StringIO()
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    try:
+        with redirect_stdout(output):
+            exec(code, namespace)
+        result = output.getvalue()
+    except BaseException as e:
+        result = output.getvalue() + repr(e)
+    return result[:max_output]
+
+
+def _serve(connection: Connection, memory_limit: Optional[int], preload: Sequence[str], max_output: int):
+    """Worker process main loop: receive code, send back its output, until the pool closes the pipe."""
+    # Ctrl-C is the parent's business, it kills the workers when it shuts down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    for module in preload:
+        importlib.import_module(module)
+    # warm: tell the pool we are ready to take calls
+    connection.send(None)
+    while True:
+        try:
+            code = connection.recv()
+        except EOFError:
+            return
+        connection.send(_execute(code, max_output))
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    connection: Connection
+    calls: int = 0
+
+
+class PythonSandbox:
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: Optional[float] = 10.0,
+        memory_limit: Optional[int] = 512 * 2**20,
+        max_calls: int = 100,
+        preload: Sequence[str] = ("math", "statistics", "datetime", "json"),
+        max_output: int = 10_000,
+        sanitize: bool = True,
+    ):
+        self.size = workers
+        self.timeout = timeout
+        # address space limit per worker in bytes, allocations beyond it raise MemoryError inside the call
+        self.memory_limit = memory_limit
+        self.max_calls = max_calls
+        self.preload = tuple(preload)
+        self.max_output = max_output
+        self.sanitize = sanitize
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            # workers are forked from a clean server process, not from this (threaded) one. Importing this module
+            # and `preload` in the server once makes them cheap to start; only effective if it isn't running yet
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload([__name__, *self.preload])
+        else:
+            self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._waiters: list[Future] = []
+        self._spawner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sandbox-spawner")
+        self._started = False
+        self._closed = False
+        self.calls = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+
+    def start(self):
+        """Start the workers. Called on first use if needed; call it up front to keep that off the first request."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._release(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_serve,
+            args=(child, self.memory_limit, self.preload, self.max_output),
+            name="sandbox-worker",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        # wait until the worker has started and imported `preload`, so it only joins the pool warm
+        parent.recv()
+        return _Worker(process, parent)
+
+    def _replace(self, worker: _Worker):
+        worker.connection.close()
+        worker.process.kill()
+        worker.process.join()
+        if not self._closed:
+            self._release(self._spawn())
+
+    def _release(self, worker: _Worker):
+        with self._lock:
+            if self._closed:
+                worker.process.kill()
+                return
+            waiter = None
+            while self._waiters:
+                waiter = self._waiters.pop(0)
+                # skip waiters that gave up (timed out or cancelled) before a worker became free
+                if waiter.set_running_or_notify_cancel():
+                    break
+                waiter = None
+            if waiter is None:
+                self._idle.append(worker)
+                return
+        # outside the lock: done callbacks may release the worker again
+        waiter.set_result(worker)
+
+    def _acquire(self) -> Future:
+        waiter = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("sandbox is closed")
+            if self._idle:
+                waiter.set_running_or_notify_cancel()
+                waiter.set_result(self._idle.pop())
+            else:
+                self._waiters.append(waiter)
+        return waiter
+
+    def _finish(self, worker: _Worker, output: Optional[str]):
+        """Hand the worker back, or replace it if it is dead, hung or due for recycling."""
+        self.calls += 1
+        worker.calls += 1
+        if output is None or worker.calls >= self.max_calls:
+            if output is not None:
+                self.recycled += 1
+            self._spawner.submit(self._replace, worker)
+        else:
+            self._release(worker)
+
+    def _prepare(self, code: str) -> str:
+        return sanitize_input(code) if self.sanitize else code
+
+    def _crashed(self, worker: _Worker) -> str:
+        self.crashes += 1
+        worker.process.join(1)
+        return f"Execution failed: worker exited with code {worker.process.exitcode}"
+
+    def run(self, code: str, timeout: Optional[float] = None) -> str:
+        """Run `code` in a worker, blocking the calling thread. The timeout includes waiting for a free worker."""
+        self.start()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = self._acquire()
+        try:
+            worker: _Worker = waiter.result(timeout)
+        except TimeoutError:
+            # the worker may be handed over just as we give up on it, put it straight back
+            waiter.cancel()
+            waiter.add_done_callback(lambda handed: handed.cancelled() or self._release(handed.result()))
+            self.timeouts += 1
+            return f"Execution timed out after {timeout:g}s waiting for a worker"
+
+        output = None
+        try:
+            worker.connection.send(self._prepare(code))
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not worker.connection.poll(remaining):
+                self.timeouts += 1
+                return f"Execution timed out after {timeout:g}s"
+            output = worker.connection.recv()
+            return output
+        except (EOFError, OSError):
+            return self._crashed(worker)
+        finally:
+            self._finish(worker, output)
+
+    async def arun(self, code: str, timeout: Optional[float] = None) -> str:
+        """Run `code` in a worker without blocking the event loop. The timeout includes waiting for a free worker."""
+        if not self._started:
+            await asyncio.to_thread(self.start)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = self._acquire()
+        try:
+            worker: _Worker = await asyncio.wait_for(asyncio.wrap_future(waiter), timeout)
+        except BaseException as error:
+            # the worker may be handed over just as we give up on it, put it straight back
+            waiter.add_done_callback(lambda handed: handed.cancelled() or self._release(handed.result()))
+            if not isinstance(error, TimeoutError):
+                raise
+            self.timeouts += 1
+            return f"Execution timed out after {timeout:g}s waiting for a worker"
+
+        loop = asyncio.get_running_loop()
+        output = None
+        readable = loop.create_future()
+        fd = worker.connection.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            worker.connection.send(self._prepare(code))
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                await asyncio.wait_for(readable, remaining)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return f"Execution timed out after {timeout:g}s"
+            output = worker.connection.recv()
+            return output
+        except (EOFError, OSError):
+            return self._crashed(worker)
+        finally:
+            loop.remove_reader(fd)
+            self._finish(worker, output)
+
+    # Tool interface, so a sandbox can stand in for PythonREPLTool
+    invoke = run
+    ainvoke = arun
+    __call__ = run
+
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "timeouts": self.timeouts, "crashes": self.crashes, "recycled": self.recycled}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            waiter.cancel()
+        for worker in idle:
+            worker.connection.close()
+            worker.process.kill()
+            worker.process.join()
+        self._spawner.shutdown(wait=True)
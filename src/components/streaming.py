@@ -0,0 +1,150 @@
+"""
+Token-level streaming for compiled graphs.
+
+    result = await stream_turn(graph, {"messages": [("user", text)]}, config, StdoutSink())
+
+Runs the graph with stream_mode=["messages", "custom"] and forwards tokens and tool progress to a sink
+as they arrive. Time to first token is recorded separately from the total latency of the turn.
+"""
+
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from src._shared.stats import Histogram
+
+
+@dataclass
+class StreamEvent:
+    # "token", "tool_start", "tool_end" or "done"
+    kind: str
+    data: dict = field(default_factory=dict)
+    node: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "node": self.node, **self.data}
+
+
+@dataclass
+class StreamResult:
+    text: str
+    ttft: Optional[float]
+    latency: float
+
+
+class Sink:
+    """Where stream events go. Subclasses override `send`, and `close` if they hold resources."""
+
+    async def send(self, event: StreamEvent):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class StdoutSink(Sink):
+    def __init__(self, prefix: str = "AI: ", stream=None):
+        self.prefix = prefix
+        self.stream = stream or sys.stdout
+        self._started = False
+
+    async def send(self, event: StreamEvent):
+        if event.kind == "token":
+            if not self._started:
+                self.stream.write(self.prefix)
+                self._started = True
+            self.stream.write(event.data["text"])
+        elif event.kind in ("tool_start", "tool_end"):
+            self.stream.write(f"[{event.data['tool']} {event.kind.removeprefix('tool_')}]\n")
+        elif event.kind == "done":
+            self.stream.write("\n")
+            self._started = False
+        self.stream.flush()
+
+
+class SSESink(Sink):
+    """Server-Sent Events over an asyncio StreamWriter (or anything with write() and async drain())."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    async def send(self, event: StreamEvent):
+        self.writer.write(f"event: {event.kind}\ndata: {json.dumps(event.to_dict())}\n\n".encode())
+        await self.writer.drain()
+
+
+class WebSocketSink(Sink):
+    """One JSON text frame per event, e.g. WebSocketSink(websocket.send)."""
+
+    def __init__(self, send: Callable[[str], Awaitable[Any]]):
+        self._send = send
+
+    async def send(self, event: StreamEvent):
+        await self._send(json.dumps(event.to_dict()))
+
+
+class StreamStats:
+    def __init__(self):
+        self.ttft = Histogram()
+        self.latency = Histogram()
+
+    def record(self, result: StreamResult):
+        if result.ttft is not None:
+            self.ttft.record(result.ttft)
+        self.latency.record(result.latency)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {"ttft": self.ttft.summary(), "latency": self.latency.summary()}
+
+
+def to_events(mode: str, chunk: Any) -> list[StreamEvent]:
+    """Translate one (mode, chunk) pair from graph.astream into stream events."""
+    if mode == "custom":
+        # nodes report tool progress with get_stream_writer()({"tool": ..., "status": "start" | "end"})
+        if isinstance(chunk, dict) and "tool" in chunk:
+            return [StreamEvent(f"tool_{chunk.get('status', 'start')}", {"tool": chunk["tool"]})]
+        return []
+
+    message, metadata = chunk
+    node = metadata.get("langgraph_node")
+    events = []
+    if isinstance(message, AIMessageChunk):
+        for tool_call in message.tool_call_chunks:
+            if tool_call.get("name"):
+                events.append(StreamEvent("tool_start", {"tool": tool_call["name"]}, node))
+    elif isinstance(message, ToolMessage):
+        return [StreamEvent("tool_end", {"tool": message.name}, node)]
+    if isinstance(message, (AIMessage, AIMessageChunk)) and isinstance(message.content, str) and message.content:
+        events.append(StreamEvent("token", {"text": message.content}, node))
+    return events
+
+
+async def stream_turn(
+    graph,
+    input: Any,
+    config: Optional[dict] = None,
+    sink: Optional[Sink] = None,
+    stats: Optional[StreamStats] = None,
+) -> StreamResult:
+    started = time.perf_counter()
+    ttft = None
+    tokens = []
+    async for mode, chunk in graph.astream(input, config, stream_mode=["messages", "custom"]):
+        for event in to_events(mode, chunk):
+            if event.kind == "token":
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                tokens.append(event.data["text"])
+            if sink is not None:
+                await sink.send(event)
+
+    result = StreamResult("".join(tokens), ttft, time.perf_counter() - started)
+    if sink is not None:
+        await sink.send(StreamEvent("done", {"ttft_ms": (ttft or 0) * 1000, "latency_ms": result.latency * 1000}))
+    if stats is not None:
+        stats.record(result)
+    return result
@@ -0,0 +1,123 @@
+"""
+Memoization for LangChain tools.
+Results are cached per (tool name, normalized input) in an LRU with a TTL. Entries can carry a tag,
+e.g. the guest id a booking tool read, so a write to that record invalidates exactly those results.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+from langchain_core.tools import Tool
+
+
+def normalize_input(tool_input: Any) -> str:
+    """Collapse whitespace so "123", " 123 " and "123\\n" share one cache entry."""
+    return " ".join(str(tool_input).split())
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: float
+    tag: Optional[Hashable]
+
+
+class ToolCache:
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # bumped on every invalidation, a result computed across one must not be cached
+        self.epoch = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._tags: defaultdict[Hashable, set[tuple]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry.value
+
+    def put(self, key: tuple, value: Any, tag: Optional[Hashable] = None, epoch: Optional[int] = None):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, expires_at, tag)
+            if tag is not None:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: list[Hashable]):
+        """Drop every entry tagged with one of `tags`. Matches the BookingRepository.on_change signature."""
+        with self._lock:
+            self.epoch += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key, None)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        if entry.tag is not None:
+            keys = self._tags.get(entry.tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry.tag]
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def memoize_tool(
+    tool: Tool,
+    cache: ToolCache,
+    tag: Optional[Callable[[str], Hashable]] = None,
+    normalize: Callable[[Any], str] = normalize_input,
+) -> Tool:
+    """Return a copy of a single-input `tool` whose results are served from `cache`.
+    The tool is called with the normalized input, the same value as the cache key, so inputs sharing an entry
+    get the same result. `normalize` must therefore only drop what every wrapped tool would ignore anyway.
+    `tag` maps the normalized input to the record it depends on, for invalidation."""
+
+    def cached_func(tool_input: str = "") -> Any:
+        normalized = normalize(tool_input)
+        key = (tool.name, normalized)
+        found, value = cache.get(key)
+        if found:
+            return value
+        epoch = cache.epoch
+        value = tool.func(normalized)
+        cache.put(key, value, tag=tag(normalized) if tag else None, epoch=epoch)
+        return value
+
+    return Tool(name=tool.name, description=tool.description, func=cached_func)
@@ -0,0 +1,368 @@
+"""
+Vector indexes for VectorStore (src/components/vector_store.py), one per namespace.
+
+An index maps integer ids to unit-length float32 vectors, so cosine similarity is a dot product:
+
+    index = FlatIndex(dims=1536)
+    index.add(np.array([1, 2]), normalize(vectors))
+    ids, scores = index.search(normalize(queries), k=10)  # (queries, k) each, best first
+
+Results are padded with id -1 and score -inf when fewer than k vectors are eligible. `allowed` restricts a
+search to some ids, e.g. the items passing a filter.
+
+FlatIndex is exact. IVFIndex is approximate and scans a fraction of the vectors per query, for namespaces
+too large to scan whole; `nprobe` trades recall for speed:
+
+    store = VectorStore(index={..., "backend": functools.partial(IVFIndex, nprobe=32)})
+
+MmapIndex is exact like FlatIndex but keeps the vectors in a file, see PersistentVectorStore. QuantizedIndex
+(src/components/quantized_index.py) keeps compressed codes in memory.
+"""
+
+import math
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+def normalize(vectors) -> np.ndarray:
+    """float32 rows scaled to unit length, zero vectors stay zero (and score 0 against everything)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Positions and scores of the k best in each row of `scores` (queries, candidates), best first."""
+    if k < scores.shape[1]:
+        # argpartition is linear, only the k survivors get sorted
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def pad(ids: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    missing = k - ids.shape[1]
+    if missing <= 0:
+        return ids, scores
+    return (
+        np.pad(ids, ((0, 0), (0, missing)), constant_values=-1),
+        np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf),
+    )
+
+
+class FlatIndex:
+    """Exact search: all vectors in one contiguous matrix, a search is one matrix product and an argpartition."""
+
+    def __init__(self, dims: int, capacity: int = 1024):
+        self.dims = dims
+        self._vectors = np.zeros((capacity, dims), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self._vectors[: len(self)].nbytes + self._ids[: len(self)].nbytes
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: len(self)]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[: len(self)]
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Insert or replace `vectors` (unit length) under `ids`."""
+        ids = np.asarray(ids, dtype=np.int64)
+        replaced = [i for i, id_ in enumerate(ids.tolist()) if id_ in self._rows]
+        for i in replaced:
+            self._vectors[self._rows[int(ids[i])]] = vectors[i]
+        if replaced:
+            keep = np.ones(len(ids), dtype=bool)
+            keep[replaced] = False
+            ids, vectors = ids[keep], vectors[keep]
+        size = len(self)
+        needed = size + len(ids)
+        if needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors))
+            self._vectors = np.concatenate(
+                [self._vectors, np.zeros((capacity - len(self._vectors), self.dims), np.float32)]
+            )
+            self._ids = np.concatenate([self._ids, np.zeros(capacity - len(self._ids), np.int64)])
+        self._vectors[size:needed] = vectors
+        self._ids[size:needed] = ids
+        self._rows.update(zip(ids.tolist(), range(size, needed)))
+
+    def get(self, id_: int) -> np.ndarray:
+        return self._vectors[self._rows[id_]]
+
+    def remove(self, ids: Iterable[int]):
+        for id_ in ids:
+            row = self._rows.pop(int(id_), None)
+            if row is None:
+                continue
+            # move the last row into the hole, so the live rows stay contiguous
+            last = len(self._rows)
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._rows[int(self._ids[row])] = row
+
+    def search(
+        self, queries: np.ndarray, k: int, allowed: Optional[Iterable[int]] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.atleast_2d(queries)
+        size = len(self)
+        if size == 0 or k <= 0:
+            return pad(np.zeros((len(queries), 0), np.int64), np.zeros((len(queries), 0), np.float32), k)
+        # (queries, rows): one BLAS call for the whole batch
+        scores = queries @ self.vectors.T
+        if allowed is not None:
+            mask = np.zeros(size, dtype=bool)
+            mask[[self._rows[id_] for id_ in allowed if id_ in self._rows]] = True
+            scores[:, ~mask] = -np.inf
+        rows, best = top_k(scores, min(k, size))
+        ids = self.ids[rows]
+        ids[np.isneginf(best)] = -1
+        return pad(ids, best, k)
+
+
+class IVFIndex:
+    """Approximate search (IVF-flat): every vector sits in the list of its nearest k-means centroid, a search
+    scores the query against the centroids and then scans only the `nprobe` closest lists.
+
+    Below `train_size` vectors there is a single list and searches are exact. The centroids are trained once
+    the index reaches it, and retrained (with more lists) each time it grows `retrain_growth` times larger.
+    Inserts and deletes in between only touch one list each.
+    """
+
+    def __init__(
+        self,
+        dims: int,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        train_size: int = 10_000,
+        retrain_growth: float = 4.0,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.dims = dims
+        # lists per trained index, None for 4 * sqrt(vectors)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.retrain_growth = retrain_growth
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists = [FlatIndex(dims)]
+        self._list_of: dict[int, int] = {}
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._list_of)
+
+    @property
+    def nbytes(self) -> int:
+        centroids = self.centroids.nbytes if self.centroids is not None else 0
+        return centroids + sum(vectors.nbytes for vectors in self._lists)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        # a replaced vector may belong in another list now
+        self.remove([id_ for id_ in ids.tolist() if id_ in self._list_of])
+        lists = self._assign(vectors)
+        for list_id in np.unique(lists).tolist():
+            members = lists == list_id
+            self._lists[list_id].add(ids[members], vectors[members])
+        self._list_of.update(zip(ids.tolist(), lists.tolist()))
+        if len(self) >= max(self.train_size, self.retrain_growth * self._trained_size):
+            self.train()
+
+    def remove(self, ids: Iterable[int]):
+        for id_ in ids:
+            list_id = self._list_of.pop(int(id_), None)
+            if list_id is not None:
+                self._lists[list_id].remove([id_])
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def train(self):
+        """Spherical k-means on (a sample of) the vectors, then redistribute every vector."""
+        ids = np.concatenate([vectors.ids for vectors in self._lists])
+        vectors = np.concatenate([vectors.vectors for vectors in self._lists])
+        nlist = self.nlist or max(1, int(4 * math.sqrt(len(ids))))
+        # about 64 points per centroid is plenty to place it
+        sample = vectors[self.rng.choice(len(vectors), min(len(vectors), 64 * nlist), replace=False)]
+        centroids = sample[self.rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            # an empty cluster keeps its centroid
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+        self.centroids = centroids
+        self._lists = [FlatIndex(self.dims, capacity=16) for _ in range(nlist)]
+        self._list_of = {}
+        self._trained_size = len(ids)
+        for start in range(0, len(ids), 65_536):
+            chunk = slice(start, start + 65_536)
+            lists = self._assign(vectors[chunk])
+            for list_id in np.unique(lists).tolist():
+                members = lists == list_id
+                self._lists[list_id].add(ids[chunk][members], vectors[chunk][members])
+            self._list_of.update(zip(ids[chunk].tolist(), lists.tolist()))
+
+    def search(
+        self, queries: np.ndarray, k: int, allowed: Optional[Iterable[int]] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.atleast_2d(queries)
+        if self.centroids is None:
+            return self._lists[0].search(queries, k, allowed)
+        if allowed is not None:
+            # the nearest vectors passing a filter may all sit in lists the query doesn't probe, score them exactly
+            return self._search_allowed(queries, k, allowed)
+        probes, _ = top_k(queries @ self.centroids.T, min(self.nprobe, len(self.centroids)))
+        parts: list[list[tuple[np.ndarray, np.ndarray]]] = [[] for _ in queries]
+        # one matrix product per probed list, for all the queries probing it
+        for list_id in np.unique(probes).tolist():
+            vectors = self._lists[list_id]
+            if not len(vectors):
+                continue
+            probing = np.nonzero((probes == list_id).any(axis=1))[0]
+            scores = queries[probing] @ vectors.vectors.T
+            for row, query in enumerate(probing.tolist()):
+                parts[query].append((vectors.ids, scores[row]))
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for query, found in enumerate(parts):
+            if not found:
+                continue
+            ids = np.concatenate([ids for ids, _ in found])
+            scores = np.concatenate([scores for _, scores in found])
+            positions, best = top_k(scores[None], min(k, len(ids)))
+            found_ids = ids[positions[0]]
+            all_ids[query, : len(found_ids)] = found_ids
+            all_scores[query, : len(found_ids)] = best[0]
+        return all_ids, all_scores
+
+    def _search_allowed(self, queries: np.ndarray, k: int, allowed: Iterable[int]) -> tuple[np.ndarray, np.ndarray]:
+        ids = np.array([id_ for id_ in allowed if id_ in self._list_of], dtype=np.int64)
+        if not len(ids):
+            return pad(np.zeros((len(queries), 0), np.int64), np.zeros((len(queries), 0), np.float32), k)
+        vectors = np.stack([self._lists[self._list_of[id_]].get(id_) for id_ in ids.tolist()])
+        positions, best = top_k(queries @ vectors.T, min(k, len(ids)))
+        return pad(ids[positions], best, k)
+
+
+class MmapIndex:
+    """Exact search over vectors in a file, read through a memory map: opening takes no time whatever the size,
+    and the vectors sit in the page cache rather than on the heap. float16 halves the file, but rows are widened
+    to float32 a chunk at a time when scored, which costs more than the matrix product itself.
+
+    Row i of the file holds id i, so ids must be allocated densely from 0 (VectorStore does), and a row is
+    written once. Removing an id leaves a hole; the owner compacts by copying the live rows to a new file.
+    """
+
+    # rows scored per matrix product, bounds the float32 copy of a float16 file
+    CHUNK = 65_536
+
+    def __init__(self, path: str, dims: int, dtype=np.float32, size: int = 0, live: Optional[Iterable[int]] = None):
+        self.path = path
+        self.dims = dims
+        self.dtype = np.dtype(dtype)
+        # rows written so far, live or not
+        self.size = size
+        rows = os.path.getsize(path) // (dims * self.dtype.itemsize) if os.path.exists(path) else 0
+        self._map(max(rows, size, 1024))
+        self._live = np.zeros(len(self._vectors), dtype=bool)
+        if live is not None:
+            self._live[np.fromiter(live, dtype=np.int64)] = True
+        self._count = int(self._live.sum())
+
+    def _map(self, capacity: int):
+        with open(self.path, "ab") as file:
+            if file.tell() < capacity * self.dims * self.dtype.itemsize:
+                file.truncate(capacity * self.dims * self.dtype.itemsize)
+        self._vectors = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity, self.dims))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the file in use, mapped rather than allocated."""
+        return self.size * self.dims * self.dtype.itemsize
+
+    def live_ids(self) -> np.ndarray:
+        return np.flatnonzero(self._live[: self.size])
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        needed = int(ids.max()) + 1
+        if needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors))
+            self._vectors.flush()
+            self._map(capacity)
+            self._live = np.concatenate([self._live, np.zeros(capacity - len(self._live), dtype=bool)])
+        self._vectors[ids] = vectors
+        fresh = np.unique(ids)
+        self._count += len(fresh) - int(self._live[fresh].sum())
+        self._live[ids] = True
+        self.size = max(self.size, needed)
+
+    def get(self, id_: int) -> np.ndarray:
+        return np.asarray(self._vectors[id_], dtype=np.float32)
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        return np.asarray(self._vectors[ids], dtype=np.float32)
+
+    def remove(self, ids: Iterable[int]):
+        ids = np.unique(np.fromiter(ids, dtype=np.int64))
+        ids = ids[ids < self.size]
+        self._count -= int(self._live[ids].sum())
+        self._live[ids] = False
+
+    def search(
+        self, queries: np.ndarray, k: int, allowed: Optional[Iterable[int]] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.atleast_2d(queries)
+        if self._count == 0 or k <= 0:
+            return pad(np.zeros((len(queries), 0), np.int64), np.zeros((len(queries), 0), np.float32), k)
+        scores = np.empty((len(queries), self.size), dtype=np.float32)
+        for start in range(0, self.size, self.CHUNK):
+            rows = self._vectors[start : min(start + self.CHUNK, self.size)]
+            scores[:, start : start + len(rows)] = queries @ rows.astype(np.float32, copy=False).T
+        mask = self._live[: self.size]
+        if allowed is not None:
+            allowed = np.fromiter(allowed, dtype=np.int64)
+            mask = np.zeros(self.size, dtype=bool)
+            mask[allowed[allowed < self.size]] = True
+            mask &= self._live[: self.size]
+        scores[:, ~mask] = -np.inf
+        ids, best = top_k(scores, min(k, self.size))
+        ids[np.isneginf(best)] = -1
+        return pad(ids, best, k)
+
+    def flush(self):
+        self._vectors.flush()
+
+    def close(self, sync: bool = True):
+        if sync:
+            self._vectors.flush()
+        del self._vectors
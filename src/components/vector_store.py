@@ -0,0 +1,238 @@
+"""
+InMemoryStore with NumPy vector search, a drop-in for `InMemoryStore(index={...})`.
+
+    store = VectorStore(index={"embed": embeddings, "dims": 1536, "fields": ["text"]})
+    store.put(("1", "memories"), "m1", {"text": "I like pizza"})
+    store.search(("1", "memories"), query="food", limit=3)
+
+The stock store scores every vector with a Python loop on each search. Here each namespace keeps its vectors
+in an index from src/components/vector_index.py (a contiguous float32 matrix by default), so a search is one
+matrix product and an argpartition. The searches in one `batch` call that hit the same namespace share a
+single matrix product. `index["backend"]` picks another index, any callable taking the dimensions.
+
+Scores, max pooling over an item's fields and filters behave like InMemoryStore's. Unlike it, a put replaces
+an item's old vectors rather than merging them, and a text repeated within a batch is embedded once and used
+for every field it appears in (InMemoryStore mismatches the vectors).
+
+`put_many` writes items in batches, one embedding request per batch instead of one per item. Wrap the
+embeddings in CachedEmbeddings (src/components/embedding_cache.py) so texts seen before skip the model.
+
+This overrides InMemoryStore's private hooks (_insertinmem_store, _apply_put_ops, _filter_items, _batch_search)
+and uses its private helpers, so the Pipfile pins langgraph-checkpoint, which ships the store, to a tested
+range. tests/test_vector_store.py checks the results against InMemoryStore's, run it before widening the pin.
+"""
+
+from collections import defaultdict
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+from langgraph.store.base import IndexConfig, Item, PutOp, Result, SearchItem, SearchOp, _validate_namespace
+from langgraph.store.memory import InMemoryStore, _compare_values
+
+from src.components.vector_index import FlatIndex, normalize
+
+
+class _NamespaceVectors:
+    def __init__(self, index):
+        self.index = index
+        self.ids_by_key: dict[str, list[int]] = {}
+        self.keys: dict[int, str] = {}
+        self.next_id = 0
+
+    def drop(self, key: str):
+        ids = self.ids_by_key.pop(key, ())
+        for id_ in ids:
+            del self.keys[id_]
+        self.index.remove(ids)
+
+
+class VectorStore(InMemoryStore):
+    def __init__(self, *, index: Optional[IndexConfig] = None) -> None:
+        super().__init__(index=index)
+        self.backend = (index or {}).get("backend") or FlatIndex
+        self._indexes: dict[tuple[str, ...], _NamespaceVectors] = {}
+        # (namespace, key) of the items the batch being written added vectors for
+        self._embedded: set[tuple[tuple[str, ...], str]] = set()
+
+    # Writes
+
+    def put_many(self, items: Iterable[tuple], batch_size: int = 1000) -> None:
+        """Store many items, `(namespace, key, value)` or `(namespace, key, value, index)` like `put`'s arguments.
+
+        Each batch of items embeds all its texts in one `embed_documents` call rather than one call per put.
+        """
+        for ops in self._put_ops(items, batch_size):
+            self.batch(ops)
+
+    async def aput_many(self, items: Iterable[tuple], batch_size: int = 1000) -> None:
+        for ops in self._put_ops(items, batch_size):
+            await self.abatch(ops)
+
+    @staticmethod
+    def _put_ops(items: Iterable[tuple], batch_size: int) -> Iterator[list[PutOp]]:
+        ops = []
+        for item in items:
+            _validate_namespace(item[0])
+            ops.append(PutOp(*item))
+            if len(ops) >= batch_size:
+                yield ops
+                ops = []
+        if ops:
+            yield ops
+
+    def _insertinmem_store(self, to_embed: dict[str, list], embeddings: list[list[float]]) -> None:
+        if len(to_embed) != len(embeddings):
+            raise ValueError(
+                f"Number of embeddings ({len(embeddings)}) does not match number of texts ({len(to_embed)})"
+            )
+        vectors = normalize(embeddings)
+        rows: defaultdict[tuple[str, ...], list[tuple[str, str, int]]] = defaultdict(list)
+        # one embedding per distinct text, shared by every field it appeared in
+        for row, refs in enumerate(to_embed.values()):
+            for namespace, key, path in refs:
+                rows[namespace].append((key, path, row))
+        for namespace, refs in rows.items():
+            # the old vectors go only now that the new ones are in hand: a failed embedding keeps them, and of
+            # two puts racing on one key only the vectors of the last one to get here stay
+            keys = {key for key, _path, _row in refs}
+            if namespace in self._indexes:
+                for key in keys:
+                    self._indexes[namespace].drop(key)
+            self._embedded.update((namespace, key) for key in keys)
+            self._add_vectors(namespace, [(key, path) for key, path, _row in refs], vectors[[row for *_, row in refs]])
+
+    def _apply_put_ops(self, put_ops: dict) -> None:
+        # runs right after _insertinmem_store, with no await in between. Puts that brought no new vectors
+        # (deletes, index=False, no text at the indexed fields) still replace the old ones
+        for namespace, key in put_ops:
+            if (namespace, key) not in self._embedded and namespace in self._indexes:
+                self._indexes[namespace].drop(key)
+        self._embedded.clear()
+        super()._apply_put_ops(put_ops)
+
+    def _namespace_vectors(self, namespace: tuple[str, ...]) -> _NamespaceVectors:
+        vectors_ns = self._indexes.get(namespace)
+        if vectors_ns is None:
+            vectors_ns = self._indexes[namespace] = _NamespaceVectors(self.backend(self.index_config["dims"]))
+        return vectors_ns
+
+    def _add_vectors(self, namespace: tuple[str, ...], refs: list[tuple[str, str]], vectors: np.ndarray) -> np.ndarray:
+        """Index one vector per (key, field path) in `refs` under fresh ids, and return the ids."""
+        vectors_ns = self._namespace_vectors(namespace)
+        ids = np.arange(vectors_ns.next_id, vectors_ns.next_id + len(refs))
+        vectors_ns.next_id += len(refs)
+        for id_, (key, _path) in zip(ids.tolist(), refs):
+            vectors_ns.ids_by_key.setdefault(key, []).append(id_)
+            vectors_ns.keys[id_] = key
+        vectors_ns.index.add(ids, vectors)
+        return ids
+
+    # Searches
+
+    def _filter_items(self, op: SearchOp) -> Optional[list]:
+        # semantic searches are answered from the indexes, don't walk every item up front
+        if op.query and self.embeddings is not None:
+            return None
+        return super()._filter_items(op)
+
+    def _namespaces(self, prefix: tuple[str, ...]) -> list[tuple[str, ...]]:
+        return [namespace for namespace in self._data if namespace[: len(prefix)] == prefix]
+
+    def _allowed(self, namespace: tuple[str, ...], op: SearchOp) -> Optional[list[int]]:
+        if not op.filter:
+            return None
+        vectors_ns = self._indexes[namespace]
+        return [
+            id_
+            for key, item in self._data[namespace].items()
+            if all(_compare_values(item.value.get(field), value) for field, value in op.filter.items())
+            for id_ in vectors_ns.ids_by_key.get(key, ())
+        ]
+
+    def _batch_search(self, ops: dict, queryinmem_store: dict[str, list[float]], results: list[Result]) -> None:
+        listings = {i: entry for i, entry in ops.items() if entry[1] is not None}
+        if listings:
+            super()._batch_search(listings, queryinmem_store, results)
+        semantic = {i: op for i, (op, candidates) in ops.items() if candidates is None}
+        if not semantic:
+            return
+        queries = {text: normalize(vector)[0] for text, vector in queryinmem_store.items()}
+        # per namespace, the searches without a filter share one matrix product
+        shared: defaultdict[tuple[str, ...], list[int]] = defaultdict(list)
+        hits: dict[int, list[tuple[float, tuple[str, ...], str]]] = {i: [] for i in semantic}
+        for i, op in semantic.items():
+            for namespace in self._namespaces(op.namespace_prefix):
+                if namespace not in self._indexes:
+                    continue
+                if op.filter:
+                    hits[i] += self._search_namespace(namespace, [op], queries, self._allowed(namespace, op))[0]
+                else:
+                    shared[namespace].append(i)
+        for namespace, batch in shared.items():
+            found = self._search_namespace(namespace, [semantic[i] for i in batch], queries, None)
+            for i, namespace_hits in zip(batch, found):
+                hits[i] += namespace_hits
+        for i, op in semantic.items():
+            results[i] = self._search_items(op, sorted(hits[i], key=lambda hit: -hit[0]))
+
+    def _search_namespace(
+        self, namespace: tuple[str, ...], ops: list[SearchOp], queries: dict[str, np.ndarray], allowed
+    ) -> list[list[tuple[float, tuple[str, ...], str]]]:
+        """The best (score, namespace, key) per item for each op, enough to fill its offset + limit."""
+        vectors_ns = self._indexes[namespace]
+        matrix = np.stack([queries[op.query] for op in ops])
+        wanted = max(op.offset + op.limit for op in ops)
+        k = wanted
+        while True:
+            ids, scores = vectors_ns.index.search(matrix, k, allowed)
+            found = []
+            for row_ids, row_scores in zip(ids.tolist(), scores.tolist()):
+                # max pooling: an item scores as its best field, the first hit of each key is that field
+                best: dict[str, float] = {}
+                for id_, score in zip(row_ids, row_scores):
+                    if id_ >= 0 and vectors_ns.keys[id_] not in best:
+                        best[vectors_ns.keys[id_]] = score
+                found.append([(score, namespace, key) for key, score in best.items()])
+            # items with several fields can crowd each other out of the top k, widen the search until
+            # every op has enough distinct items or there is nothing left
+            if k >= len(vectors_ns.index) or all(len(hits) >= wanted for hits in found):
+                return found
+            k *= 4
+
+    def _search_items(self, op: SearchOp, hits: list[tuple[float, tuple[str, ...], str]]) -> list[SearchItem]:
+        kept: list[tuple[Optional[float], Item]] = [
+            (score, self._data[namespace][key]) for score, namespace, key in hits[op.offset : op.offset + op.limit]
+        ]
+        if len(kept) < op.limit:
+            # like InMemoryStore, fill up with the items that have no vectors
+            scored = {(namespace, key) for _, namespace, key in hits}
+            for namespace in self._namespaces(op.namespace_prefix):
+                vectors_ns = self._indexes.get(namespace)
+                for key, item in self._data[namespace].items():
+                    if len(kept) >= op.limit:
+                        break
+                    if (namespace, key) in scored or (vectors_ns and key in vectors_ns.ids_by_key):
+                        continue
+                    if op.filter and not all(
+                        _compare_values(item.value.get(field), value) for field, value in op.filter.items()
+                    ):
+                        continue
+                    kept.append((None, item))
+        return [
+            SearchItem(
+                namespace=item.namespace,
+                key=item.key,
+                value=item.value,
+                created_at=item.created_at,
+                updated_at=item.updated_at,
+                score=score,
+            )
+            for score, item in kept
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "namespaces": len(self._indexes),
+            "vectors": sum(len(vectors_ns.index) for vectors_ns in self._indexes.values()),
+            "vector_bytes": sum(getattr(vectors_ns.index, "nbytes", 0) for vectors_ns in self._indexes.values()),
+        }
@@ -0,0 +1,296 @@
+"""
+An offline Wikipedia: a SQLite FTS5 full-text index over a Wikipedia dump (or any JSONL corpus of
+{"title", "text"} records), ranked with BM25.
+
+    index = WikiIndex("wiki.db")
+    index.ingest(read_mediawiki_dump("enwiki-latest-pages-articles.xml.bz2"))
+    WikipediaQueryRun(api_wrapper=OfflineWikipediaAPIWrapper(index=index))
+
+Ingestion streams: records are parsed one at a time and written in fixed-size batches, one transaction per
+batch, so memory stays bounded by the batch size and SQLite's page cache whatever the size of the dump.
+See src/agents/wiki_ingest.py for the command line.
+"""
+
+import bz2
+import gzip
+import json
+import re
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional
+
+from langchain_community.utilities import WikipediaAPIWrapper
+from langchain_community.utilities.wikipedia import WIKIPEDIA_MAX_QUERY_LENGTH
+from langchain_core.documents import Document
+from pydantic import model_validator
+
+from src.components.booking_repository import SQLitePool
+
+# dropped from queries: they match most of the corpus, which makes BM25 score nearly every page
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he in is it its of on or that the to was were will with what who "
+    "when where which how why does did do i you me my we our your this these those there".split()
+)
+SUMMARY_CHARS = 1000
+
+
+@dataclass
+class SearchResult:
+    title: str
+    summary: str
+    snippet: str
+    score: float
+
+
+def _open(path: str) -> IO[bytes]:
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """Records from a JSONL file (optionally .gz or .bz2), one {"title", "text"} object per line."""
+    with _open(path) as lines:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+# A light wikitext to plain text conversion, enough for full-text search and summaries
+_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_TABLE = re.compile(r"\{\|.*?\|\}", re.S)
+_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S)
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_TAG = re.compile(r"<[^>]+>")
+_FILE_LINK = re.compile(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", re.I)
+_LINK = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]")
+_EXTERNAL_LINK = re.compile(r"\[https?://\S+ ?([^\]]*)\]")
+_EMPHASIS = re.compile(r"'{2,}")
+_HEADING = re.compile(r"^=+\s*(.*?)\s*=+$", re.M)
+
+
+def strip_wikitext(text: str) -> str:
+    text = _COMMENT.sub("", text)
+    text = _REF.sub("", text)
+    # templates nest, remove the innermost ones until none are left
+    previous = None
+    while previous != text:
+        previous, text = text, _TEMPLATE.sub("", text)
+    text = _TABLE.sub("", text)
+    text = _FILE_LINK.sub("", text)
+    text = _LINK.sub(r"\1", text)
+    text = _EXTERNAL_LINK.sub(r"\1", text)
+    text = _EMPHASIS.sub("", text)
+    text = _HEADING.sub(r"\1", text)
+    text = _TAG.sub("", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def read_mediawiki_dump(path: str) -> Iterator[dict]:
+    """Articles from a MediaWiki XML dump (e.g. enwiki-latest-pages-articles.xml.bz2), redirects skipped."""
+    with _open(path) as dump:
+        context = ET.iterparse(dump, events=("start", "end"))
+        _, root = next(context)
+        namespace = root.tag[: root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        for event, element in context:
+            if event != "end" or element.tag != f"{namespace}page":
+                continue
+            if element.findtext(f"{namespace}ns") == "0" and element.find(f"{namespace}redirect") is None:
+                yield {
+                    "title": element.findtext(f"{namespace}title"),
+                    "text": strip_wikitext(element.findtext(f"{namespace}revision/{namespace}text") or ""),
+                }
+            # drop parsed pages as we go, or the whole dump ends up in the element tree
+            element.clear()
+            root.clear()
+
+
+def summarize_text(text: str, limit: int = SUMMARY_CHARS) -> str:
+    """The lead paragraph, cut at a sentence end near `limit` characters."""
+    lead = text.strip().split("\n\n", 1)[0].strip()
+    if len(lead) <= limit:
+        return lead
+    cut = lead.rfind(". ", 0, limit)
+    return lead[: cut + 1] if cut > 0 else lead[:limit]
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(term for term in re.findall(r"\w+", query.lower()) if term not in STOPWORDS))
+
+
+def to_match_query(terms: List[str], operator: str = "AND") -> str:
+    """Terms to an FTS5 query, quoted so user input can't use the query syntax."""
+    # inside an FTS5 string a double quote is escaped by doubling it
+    return f" {operator} ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+@dataclass
+class IngestStats:
+    pages: int = 0
+    skipped: int = 0
+    chars: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed_s if self.elapsed_s else 0.0
+
+
+class WikiIndex:
+    def __init__(self, path: str = "wiki.db", pool_size: int = 4, title_weight: float = 10.0):
+        if path == ":memory:":
+            path = f"file:wiki-{id(self)}?mode=memory&cache=shared"
+        self.pool = SQLitePool(path, size=pool_size)
+        with self.pool.connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                    summary TEXT NOT NULL,
+                    content TEXT NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+                    title, content, content='pages', content_rowid='id', tokenize='porter unicode61'
+                );
+                """
+            )
+            # ORDER BY rank uses this, and FTS5 can then stop after the top k rows
+            with connection:
+                connection.execute(
+                    "INSERT INTO pages_fts (pages_fts, rank) VALUES ('rank', ?)", (f"bm25({title_weight}, 1.0)",)
+                )
+
+    # Ingestion
+
+    def ingest(
+        self,
+        records: Iterable[dict],
+        batch_size: int = 1000,
+        optimize: bool = True,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+    ) -> IngestStats:
+        """Index `records` ({"title", "text"} and optionally "summary"). Titles already in the index are skipped."""
+        stats = IngestStats()
+        started = time.perf_counter()
+        records = iter(records)
+        with self.pool.connection() as connection:
+            # an index can always be rebuilt from the dump, trade durability for ingest speed
+            connection.execute("PRAGMA synchronous=OFF")
+            try:
+                while batch := list(islice(records, batch_size)):
+                    rows = []
+                    for record in batch:
+                        text = record.get("text") or record.get("content") or ""
+                        summary = record.get("summary") or summarize_text(text)
+                        rows.append((record["title"], summary, text))
+                        stats.chars += len(text)
+                    with connection:
+                        last_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM pages").fetchone()[0]
+                        inserted = connection.executemany(
+                            "INSERT OR IGNORE INTO pages (title, summary, content) VALUES (?, ?, ?)", rows
+                        ).rowcount
+                        connection.execute(
+                            "INSERT INTO pages_fts (rowid, title, content) "
+                            "SELECT id, title, content FROM pages WHERE id > ?",
+                            (last_id,),
+                        )
+                    stats.pages += inserted
+                    stats.skipped += len(rows) - inserted
+                    stats.elapsed_s = time.perf_counter() - started
+                    if progress is not None:
+                        progress(stats)
+                if optimize:
+                    self._optimize(connection)
+            finally:
+                connection.execute("PRAGMA synchronous=NORMAL")
+        stats.elapsed_s = time.perf_counter() - started
+        return stats
+
+    @staticmethod
+    def _optimize(connection: sqlite3.Connection):
+        # merge the index segments written batch by batch into one b-tree, queries read fewer pages
+        with connection:
+            connection.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+
+    def optimize(self):
+        with self.pool.connection() as connection:
+            self._optimize(connection)
+
+    # Queries
+
+    def search(self, query: str, k: int = 3, snippet_tokens: int = 24) -> List[SearchResult]:
+        """The `k` best pages for `query`. A page whose title is the query itself always comes first."""
+        results: List[SearchResult] = []
+        with self.pool.connection() as connection:
+            exact = connection.execute("SELECT title, summary FROM pages WHERE title = ?", (query.strip(),)).fetchone()
+            if exact is not None:
+                results.append(SearchResult(exact["title"], exact["summary"], exact["summary"], float("-inf")))
+            terms = query_terms(query)
+            rows = []
+            # pages with all the terms, and only if there are none, pages with any of them. AND is also much cheaper:
+            # BM25 only scores the pages in the intersection, where OR scores every page with any of the terms
+            for operator in ("AND", "OR") if len(terms) > 1 else ("AND",) if terms else ():
+                rows = connection.execute(
+                    "SELECT p.title, p.summary, snippet(pages_fts, 1, '', '', ' ... ', ?) AS snippet, rank "
+                    "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+                    "WHERE pages_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (snippet_tokens, to_match_query(terms, operator), k + 1),
+                ).fetchall()
+                if rows:
+                    break
+            results.extend(
+                SearchResult(row["title"], row["summary"], row["snippet"], row["rank"])
+                for row in rows
+                if exact is None or row["title"] != exact["title"]
+            )
+        return results[:k]
+
+    def get(self, title: str) -> Optional[dict]:
+        with self.pool.connection() as connection:
+            row = connection.execute("SELECT title, summary, content FROM pages WHERE title = ?", (title,)).fetchone()
+        return dict(row) if row else None
+
+    def __len__(self) -> int:
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self.pool.close()
+
+
+class OfflineWikipediaAPIWrapper(WikipediaAPIWrapper):
+    """WikipediaAPIWrapper answering from a local WikiIndex, same output format, no network."""
+
+    index: Any = None
+    wiki_client: Any = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_environment(cls, values: dict) -> Any:
+        # overrides the parent's check for the `wikipedia` package, which is not needed here
+        return values
+
+    def run(self, query: str) -> str:
+        results = self.index.search(query[:WIKIPEDIA_MAX_QUERY_LENGTH], k=self.top_k_results)
+        summaries = [f"Page: {result.title}\nSummary: {result.summary}" for result in results if result.summary]
+        if not summaries:
+            return "No good Wikipedia Search Result was found"
+        return "\n\n".join(summaries)[: self.doc_content_chars_max]
+
+    def lazy_load(self, query: str) -> Iterator[Document]:
+        for result in self.index.search(query[:WIKIPEDIA_MAX_QUERY_LENGTH], k=self.top_k_results):
+            page = self.index.get(result.title)
+            if page is not None:
+                yield Document(
+                    page_content=page["content"][: self.doc_content_chars_max],
+                    metadata={"title": page["title"], "summary": page["summary"], "source": "offline"},
+                )
+
+    def load(self, query: str) -> List[Document]:
+        return list(self.lazy_load(query))
@@ -5,6 +5,8 @@ from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
 from typing_extensions import TypedDict
 
+from src._shared.instrumentation import instrument
+
 
 class State(TypedDict):
     foo: str
@@ -19,17 +21,23 @@ def node_b(state: State):
     return {"foo": "b", "bar": ["b"]}
 
 
-workflow = StateGraph(State)
+workflow = instrument(StateGraph(State), "graph_nodes")
 workflow.add_node(node_a)
 workflow.add_node(node_b)
 workflow.add_edge(START, "node_a")
 workflow.add_edge("node_a", "node_b")
 workflow.add_edge("node_b", END)
 
-checkpointer = InMemorySaver()
-graph = workflow.compile(checkpointer=checkpointer)
 
-config = {"configurable": {"thread_id": "1"}}
-response = graph.invoke({"foo": ""}, config)
+def main():
+    checkpointer = InMemorySaver()
+    graph = workflow.compile(checkpointer=checkpointer)
+
+    config = {"configurable": {"thread_id": "1"}}
+    response = graph.invoke({"foo": ""}, config)
+
+    print(response)
+
 
-print(response)
+if __name__ == "__main__":
+    main()
@@ -47,27 +47,33 @@ builder.add_edge("generate_summary", "human_review_edit")
 builder.add_edge("human_review_edit", "downstream_use")
 builder.add_edge("downstream_use", END)
 
-# Set up in-memory checkpointing for interrupt support
-checkpointer = MemorySaver()
-graph = builder.compile(checkpointer=checkpointer)
-
-# Invoke the graph until it hits the interrupt
-config = {"configurable": {"thread_id": uuid.uuid4()}}
-result = graph.invoke({}, config=config)
-
-# Output interrupt payload
-print(result["__interrupt__"])
-# Example output:
-# Interrupt(
-#   value={
-#     'task': 'Please review and edit the generated summary if necessary.',
-#     'generated_summary': 'The cat sat on the mat and looked at the stars.'
-#   },
-#   resumable=True,
-#   ...
-# )
-
-# Resume the graph with human-edited input
-edited_summary = "The cat lay on the rug, gazing peacefully at the night sky."
-resumed_result = graph.invoke(Command(resume={"edited_summary": edited_summary}), config=config)
-print(resumed_result)
+
+def main():
+    # Set up in-memory checkpointing for interrupt support
+    checkpointer = MemorySaver()
+    graph = builder.compile(checkpointer=checkpointer)
+
+    # Invoke the graph until it hits the interrupt
+    config = {"configurable": {"thread_id": uuid.uuid4()}}
+    result = graph.invoke({}, config=config)
+
+    # Output interrupt payload
+    print(result["__interrupt__"])
+    # Example output:
+    # Interrupt(
+    #   value={
+    #     'task': 'Please review and edit the generated summary if necessary.',
+    #     'generated_summary': 'The cat sat on the mat and looked at the stars.'
+    #   },
+    #   resumable=True,
+    #   ...
+    # )
+
+    # Resume the graph with human-edited input
+    edited_summary = "The cat lay on the rug, gazing peacefully at the night sky."
+    resumed_result = graph.invoke(Command(resume={"edited_summary": edited_summary}), config=config)
+    print(resumed_result)
+
+
+if __name__ == "__main__":
+    main()
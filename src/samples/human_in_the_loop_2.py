@@ -51,23 +51,29 @@ builder.set_entry_point("get_valid_age")
 builder.add_edge("get_valid_age", "report_age")
 builder.add_edge("report_age", END)
 
-# Create the graph with a memory checkpointer
-checkpointer = MemorySaver()
-graph = builder.compile(checkpointer=checkpointer)
-
-# Run the graph until the first interrupt
-config = {"configurable": {"thread_id": uuid.uuid4()}}
-result = graph.invoke({}, config=config)
-print(result["__interrupt__"])  # First prompt: "Please enter your age..."
-
-# Simulate an invalid input (e.g., string instead of integer)
-result = graph.invoke(Command(resume="not a number"), config=config)
-print(result["__interrupt__"])  # Follow-up prompt with validation message
-
-# Simulate a second invalid input (e.g., negative number)
-result = graph.invoke(Command(resume="-10"), config=config)
-print(result["__interrupt__"])  # Another retry
-
-# Provide valid input
-final_result = graph.invoke(Command(resume="25"), config=config)
-print(final_result)  # Should include the valid age
+
+def main():
+    # Create the graph with a memory checkpointer
+    checkpointer = MemorySaver()
+    graph = builder.compile(checkpointer=checkpointer)
+
+    # Run the graph until the first interrupt
+    config = {"configurable": {"thread_id": uuid.uuid4()}}
+    result = graph.invoke({}, config=config)
+    print(result["__interrupt__"])  # First prompt: "Please enter your age..."
+
+    # Simulate an invalid input (e.g., string instead of integer)
+    result = graph.invoke(Command(resume="not a number"), config=config)
+    print(result["__interrupt__"])  # Follow-up prompt with validation message
+
+    # Simulate a second invalid input (e.g., negative number)
+    result = graph.invoke(Command(resume="-10"), config=config)
+    print(result["__interrupt__"])  # Another retry
+
+    # Provide valid input
+    final_result = graph.invoke(Command(resume="25"), config=config)
+    print(final_result)  # Should include the valid age
+
+
+if __name__ == "__main__":
+    main()
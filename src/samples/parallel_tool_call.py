@@ -1,19 +1,100 @@
-async def parallel_tools_execution(state: AgentState) -> AgentState:
-    """Parallel execution of multiple tools"""
-    tools = identify_required_tools(state.current_input)
+import asyncio
+from typing import Annotated, Dict, List, Union
 
-    async def execute_tool(tool):
-        result = await tool.ainvoke(state.current_input)
-        return {tool.name: result}
+from langchain_core.tools import BaseTool, tool
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+from pydantic import BaseModel, Field
 
-    # Execute all tools in parallel
-    results = await asyncio.gather(*[execute_tool(tool) for tool in tools])
+from src.components.fan_out import FanOutExecutor, ToolLimits, fan_out_status, merge_outputs
 
-    # Merge results
-    tools_output = {}
-    for result in results:
-        tools_output.update(result)
 
-    return AgentState(
-        messages=state.messages, current_input=state.current_input, tools_output=tools_output, status="SUCCESS"
-    )
+class AgentState(BaseModel):
+    messages: List[Dict[str, str]] = []
+    current_input: str = ""
+    # {tool name: {"ok": True, "output": ...} or {"ok": False, "error": ...}}, merged once every tool is done
+    tools_output: Annotated[Dict[str, dict], merge_outputs] = Field(default_factory=dict)
+    status: str = "RUNNING"
+
+
+class ToolCall(BaseModel):
+    tool: str
+    tool_input: str
+
+
+# Stub tools with different latencies, stand-ins for remote APIs
+@tool
+async def weather(city: str) -> str:
+    """Current weather for a city."""
+    await asyncio.sleep(0.2)
+    return f"Sunny in {city}"
+
+
+@tool
+async def news(topic: str) -> str:
+    """Latest headlines about a topic."""
+    await asyncio.sleep(0.5)
+    return f"3 headlines about {topic}"
+
+
+@tool
+async def stock_price(symbol: str) -> str:
+    """Latest stock price for a ticker symbol."""
+    await asyncio.sleep(2.0)
+    return f"{symbol}: 123.45"
+
+
+tools: Dict[str, BaseTool] = {t.name: t for t in (weather, news, stock_price)}
+KEYWORDS = {"weather": ("weather", "rain", "sunny"), "news": ("news", "headlines"), "stock_price": ("stock", "price")}
+
+
+def identify_required_tools(current_input: str) -> List[str]:
+    text = current_input.lower()
+    return [name for name, words in KEYWORDS.items() if any(word in text for word in words)]
+
+
+# At most 8 tool calls in flight, and the slow stock API gets 1 at a time and a 1 s deadline
+executor = FanOutExecutor(
+    max_concurrency=8,
+    default_timeout=5.0,
+    limits={"stock_price": ToolLimits(concurrency=1, timeout=1.0)},
+)
+
+
+def parallel_tools_execution(state: AgentState) -> Union[List[Send], str]:
+    """Fan out: one concurrent run_tool task per required tool, straight to collect if none is needed"""
+    sends = [
+        Send("run_tool", ToolCall(tool=name, tool_input=state.current_input))
+        for name in identify_required_tools(state.current_input)
+    ]
+    return sends or "collect"
+
+
+async def run_tool(call: ToolCall) -> dict:
+    result = await executor.run(tools[call.tool], call.tool_input)
+    return {"tools_output": {call.tool: result}}
+
+
+def collect(state: AgentState) -> dict:
+    return {"status": fan_out_status(state.tools_output)}
+
+
+workflow = StateGraph(AgentState)
+workflow.add_node("run_tool", run_tool, input=ToolCall)
+workflow.add_node("collect", collect)
+workflow.add_conditional_edges(START, parallel_tools_execution, ["run_tool", "collect"])
+workflow.add_edge("run_tool", "collect")
+workflow.add_edge("collect", END)
+app = workflow.compile()
+
+
+async def main():
+    state = AgentState(current_input="weather, news and the stock price for Paris")
+    # each tool's update is streamed as soon as it finishes, the slow stock API can't hold the others back.
+    # tools_output itself is only updated once all of them are done, within the stock API's 1 s deadline
+    async for update in app.astream(state, stream_mode="updates"):
+        print(update)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,59 @@
-from typing import List, Dict, Literal
+import asyncio
+import random
+from typing import Dict, List, Literal, Optional
+
+from langchain_core.tools import BaseTool, tool
+from langgraph.graph import END, StateGraph
 from pydantic import BaseModel
-from langgraph.graph import StateGraph, END
+
+from src.components.retry import Backoff, CircuitOpenError, RetryScheduler
 
 
 class AgentState(BaseModel):
     messages: List[Dict[str, str]] = []
     current_input: str = ""
+    tool: str = "search"
     tools_output: Dict[str, str] = {}
     status: str = "RUNNING"
     error_count: int = 0
+    last_error: str = ""
+    # set by check_status after an error, None when retrying is pointless
+    retry_delay: Optional[float] = None
+
+
+# Stub tool standing in for a flaky remote API
+@tool
+async def search(query: str) -> str:
+    """Search the web."""
+    await asyncio.sleep(0.05)
+    if random.random() < 0.3:
+        raise ConnectionError("upstream returned 503")
+    return f"results for {query}"
+
+
+tools: Dict[str, BaseTool] = {search.name: search}
+
+# Shared by every session: once a tool keeps failing, its circuit opens and every session fails fast
+# instead of piling retries onto it. Retries back off exponentially with full jitter, so sessions that
+# failed together don't retry together.
+scheduler = RetryScheduler(Backoff(max_attempts=3, base_delay=0.2, max_delay=5.0), failure_threshold=5)
+
+
+async def execute_tool(state: AgentState) -> dict:
+    try:
+        output = await scheduler.attempt(state.tool, tools[state.tool].ainvoke, state.current_input)
+    except CircuitOpenError as e:
+        return {"status": "ERROR", "last_error": str(e)}
+    except Exception as e:
+        return {"status": "ERROR", "error_count": state.error_count + 1, "last_error": f"{type(e).__name__}: {e}"}
+    return {"status": "SUCCESS", "tools_output": {**state.tools_output, state.tool: output}}
+
+
+def check_status(state: AgentState) -> dict:
+    if state.status != "ERROR":
+        return {}
+    # a rejected call (circuit open) has error_count unchanged, next_delay gives up on it all the same
+    return {"retry_delay": scheduler.next_delay(state.tool, max(state.error_count, 1))}
 
 
 def route_by_status(state: AgentState) -> Literal["process", "retry", "error", "end"]:
@@ -16,7 +61,7 @@ def route_by_status(state: AgentState) -> Literal["process", "retry", "error", "
     if state.status == "SUCCESS":
         return "end"
     elif state.status == "ERROR":
-        if state.error_count >= 3:
+        if state.retry_delay is None:
             return "error"
         return "retry"
     elif state.status == "NEED_TOOL":
@@ -24,8 +69,22 @@ def route_by_status(state: AgentState) -> Literal["process", "retry", "error", "
     return "process"
 
 
+async def retry_handler(state: AgentState) -> dict:
+    await asyncio.sleep(state.retry_delay)
+    return {"status": "RETRYING", "retry_delay": None}
+
+
+def error_handler(state: AgentState) -> dict:
+    return {"status": "FAILED", "messages": [*state.messages, {"role": "assistant", "content": state.last_error}]}
+
+
 # Build the graph structure
 workflow = StateGraph(AgentState)
+workflow.add_node("check_status", check_status)
+workflow.add_node("execute_tool", execute_tool)
+workflow.add_node("retry_handler", retry_handler)
+workflow.add_node("error_handler", error_handler)
+workflow.set_entry_point("check_status")
 
 # Add conditional edges
 workflow.add_conditional_edges(
@@ -33,3 +92,18 @@ workflow.add_conditional_edges(
     route_by_status,
     {"process": "execute_tool", "retry": "retry_handler", "error": "error_handler", "end": END},
 )
+workflow.add_edge("execute_tool", "check_status")
+workflow.add_edge("retry_handler", "execute_tool")
+workflow.add_edge("error_handler", END)
+app = workflow.compile()
+
+
+async def main():
+    results = await asyncio.gather(*(app.ainvoke(AgentState(current_input=f"query {i}")) for i in range(20)))
+    for result in results:
+        print(result["status"], result["error_count"], result["tools_output"] or result["last_error"])
+    print(scheduler.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,9 +4,11 @@ from typing import Annotated, TypedDict
 
 from langchain.embeddings import init_embeddings
 from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.store.memory import InMemoryStore
 from typing_extensions import TypedDict
 
+from src.components.embedding_cache import CachedEmbeddings
+from src.components.vector_store import VectorStore
+
 
 class UserPreferences(TypedDict):
     context: Annotated[list[str], add]
@@ -17,9 +19,10 @@ class UserPreferences(TypedDict):
 user_id = "1"
 namespace_for_memory = (user_id, "memories")
 
-in_memory_store = InMemoryStore(
+# vectors are cached by content in embeddings.db, restarting the sample doesn't re-embed the same texts
+in_memory_store = VectorStore(
     index={
-        "embed": init_embeddings("openai:text-embedding-3-small"),
+        "embed": CachedEmbeddings(init_embeddings("openai:text-embedding-3-small"), path="embeddings.db"),
         "dims": 1536,
         "fields": ["food_preferences", "drink_preferences", "$"],
     }
@@ -27,19 +30,23 @@ in_memory_store = InMemoryStore(
 checkpointer = InMemorySaver()
 
 
-in_memory_store.put(
-    namespace_for_memory,
-    str(uuid.uuid4()),
-    {"food_preferences": ["I love Italian cuisine"], "context": ["Discussing dinner plans"]},
-    index=["food_preferences", "drink_preferences"],  # Only embed "food_preferences" field
+# one embedding request for all the memories
+in_memory_store.put_many(
+    [
+        (
+            namespace_for_memory,
+            str(uuid.uuid4()),
+            {"food_preferences": ["I love Italian cuisine"], "context": ["Discussing dinner plans"]},
+            ["food_preferences", "drink_preferences"],  # Only embed "food_preferences" field
+        ),
+        (namespace_for_memory, str(uuid.uuid4()), {"system_info": "Last updated: 2024-01-01"}, False),
+        (namespace_for_memory, str(uuid.uuid4()), {"food_preferences": ["pizza"]}),
+        (namespace_for_memory, str(uuid.uuid4()), {"food_preferences": ["burgers"]}),
+        (namespace_for_memory, str(uuid.uuid4()), {"drink_preferences": ["coffee"]}),
+        (namespace_for_memory, str(uuid.uuid4()), {"drink_preferences": ["whisky"]}),
+    ]
 )
 
-in_memory_store.put(namespace_for_memory, str(uuid.uuid4()), {"system_info": "Last updated: 2024-01-01"}, index=False)
-in_memory_store.put(namespace_for_memory, str(uuid.uuid4()), {"food_preferences": ["pizza"]})
-in_memory_store.put(namespace_for_memory, str(uuid.uuid4()), {"food_preferences": ["burgers"]})
-in_memory_store.put(namespace_for_memory, str(uuid.uuid4()), {"drink_preferences": ["coffee"]})
-in_memory_store.put(namespace_for_memory, str(uuid.uuid4()), {"drink_preferences": ["whisky"]})
-
 # memories = in_memory_store.search(namespace_for_memory, query="What does the user like to eat?", limit=3)
 # memories = in_memory_store.search(namespace_for_memory, query="What does the user like to drink?", limit=3)
 memories = in_memory_store.search(
@@ -11,6 +11,8 @@ from langgraph.constants import START
 from langgraph.graph import StateGraph
 from langgraph.types import Command, interrupt
 
+from src._shared.instrumentation import instrument
+
 
 class State(TypedDict):
     """The graph state."""
@@ -41,7 +43,7 @@ def human_node(state: State):
 
 checkpointer = MemorySaver()
 
-subgraph_builder = StateGraph(State)
+subgraph_builder = instrument(StateGraph(State), "subgraph")
 subgraph_builder.add_node("some_node", node_in_subgraph)
 subgraph_builder.add_node("human_node", human_node)
 subgraph_builder.add_edge(START, "some_node")
@@ -66,24 +68,30 @@ def parent_node(state: State):
     return subgraph_state
 
 
-builder = StateGraph(State)
+builder = instrument(StateGraph(State), "subgraphs")
 builder.add_node("parent_node", parent_node)
 builder.add_edge(START, "parent_node")
 
-# A checkpointer must be enabled for interrupts to work!
-checkpointer = MemorySaver()
-graph = builder.compile(checkpointer=checkpointer)
 
-config = {
-    "configurable": {
-        "thread_id": uuid.uuid4(),
+def main():
+    # A checkpointer must be enabled for interrupts to work!
+    checkpointer = MemorySaver()
+    graph = builder.compile(checkpointer=checkpointer)
+
+    config = {
+        "configurable": {
+            "thread_id": uuid.uuid4(),
+        }
     }
-}
 
-for chunk in graph.stream({"state_counter": 1}, config):
-    print(chunk)
+    for chunk in graph.stream({"state_counter": 1}, config):
+        print(chunk)
+
+    print("--- Resuming ---")
+
+    for chunk in graph.stream(Command(resume="35"), config):
+        print(chunk)
 
-print("--- Resuming ---")
 
-for chunk in graph.stream(Command(resume="35"), config):
-    print(chunk)
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,39 @@
-import json
-from typing import Callable, Dict, List, Optional
+import asyncio
+import contextlib
+import operator
+import os
+from functools import lru_cache
+from typing import Annotated, Callable, Optional
 
-from langchain_community.chat_models import ChatOpenAI
 from langchain_community.tools import WikipediaQueryRun
 from langchain_community.utilities import WikipediaAPIWrapper
-from langchain_experimental.tools.python.tool import PythonREPLTool
-from langgraph.graph import StateGraph
-from pydantic import BaseModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, Field
+
+from src._shared.instrumentation import instrument
+from src.components.budget import Budget, charge, run_with_budget
+from src.components.json_stream import JSONObjectStream
+from src.components.llm_clients import ModelRegistry
+from src.components.result_cache import ResultCache
+from src.components.sandbox import PythonSandbox
+from src.components.tool_cache import normalize_input
+from src.components.wiki_index import OfflineWikipediaAPIWrapper, WikiIndex
 
 
 class Tool(BaseModel):
     name: str
     description: str
     func: Callable
+    # idempotent tools: results are cached persistently and concurrent identical calls share one request
+    cacheable: bool = False
 
 
+# Nodes return only the fields they change and LangGraph merges them into its channels. Nodes return just the
+# new messages and the reducer appends them. The history stays a plain list, so checkpointers can serialize it.
 class AgentState(BaseModel):
-    messages: List[Dict[str, str]] = []
+    messages: Annotated[list, operator.add] = Field(default_factory=list)
     current_input: str = ""
     thought: str = ""
     selected_tool: Optional[str] = None
@@ -26,64 +43,148 @@ class AgentState(BaseModel):
     status: str = "STARTING"
 
 
+def wikipedia_api() -> WikipediaAPIWrapper:
+    # workers without outbound network answer from a local index, built with src/agents/wiki_ingest.py
+    path = os.getenv("WIKICALCU_WIKI_INDEX")
+    return OfflineWikipediaAPIWrapper(index=WikiIndex(path)) if path else WikipediaAPIWrapper()
+
+
 # Define tools
+# python_repl code runs in a pool of warm worker processes, with a timeout and a memory limit per call,
+# so a CPU-heavy snippet doesn't stall the event loop and every other session with it
+sandbox = PythonSandbox(workers=2, timeout=10.0, memory_limit=512 * 2**20)
 tools = [
-    Tool(name="python_repl", description="Used for executing python code", func=PythonREPLTool()),
+    Tool(name="python_repl", description="Used for executing python code", func=sandbox),
     Tool(
         name="wikipedia",
         description="Used for querying Wikipedia information",
-        func=WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper()),
+        func=WikipediaQueryRun(api_wrapper=wikipedia_api()),
+        cacheable=True,
     ),
 ]
+tools_by_name = {tool.name: tool for tool in tools}
+tool_descriptions = [t.name + ": " + t.description for t in tools]
+
+
+@lru_cache(maxsize=None)
+def get_result_cache() -> ResultCache:
+    return ResultCache(os.getenv("WIKICALCU_RESULT_CACHE", "wikicalcu_results.db"), max_entries=50_000)
+
+
+# Chat model clients, one per (model, temperature), sharing a keep-alive connection pool.
+# Pass {"configurable": {"models": ModelRegistry(base_url=...)}} to use another registry, e.g. a local stub server.
+models = ModelRegistry()
+
+
+def get_models(config: Optional[RunnableConfig]) -> ModelRegistry:
+    return (config or {}).get("configurable", {}).get("models") or models
 
 
 # Think node
-async def think(state: AgentState) -> AgentState:
+async def think(state: AgentState, config: RunnableConfig) -> dict:
+    # the tool fields come first so the tool can be dispatched while the thought is still being generated
     prompt = f"""
     Based on user input and current conversation history, think about the next action.
     User input: {state.current_input}
-    Available tools: {[t.name + ': ' + t.description for t in tools]}
+    Available tools: {tool_descriptions}
     Decide:
     1. Whether a tool is needed
     2. If needed, which tool to use
     3. What parameters to call the tool with
-    Return in JSON format: {{"thought": "thought process", "need_tool": true/false, "tool": "tool name", "tool_input": "parameters"}}
+    Return in JSON format: {{"need_tool": true/false, "tool": "tool name", "tool_input": "parameters", "thought": "thought process"}}
     """
-    llm = ChatOpenAI(temperature=0)
-    response = await llm.ainvoke(prompt)
-    result = json.loads(response.content)
-    state_dict = state.model_dump()
-    state_dict.update(
-        {
+    # opt-in: {"configurable": {"response_cache": ResponseCache(...)}} reuses the plan made for a recent input
+    cache = (config or {}).get("configurable", {}).get("response_cache")
+    cached, reply = await cache.aget(prompt, "think", state.current_input) if cache is not None else (False, "")
+    if cached:
+        stream = replay(reply)
+    else:
+        charge(config, llm_calls=1)
+        stream = get_models(config).get(temperature=0).astream(prompt)
+    parser = JSONObjectStream()
+    speculation: Optional[asyncio.Task] = None
+    text = ""
+    try:
+        async for chunk in stream:
+            text += chunk.content
+            parser.feed(chunk.content)
+            fields = parser.fields
+            # speculative dispatch: run the tool as soon as the choice is complete, overlapping the rest of the reply.
+            # Only idempotent tools, the rest of the reply may still change the choice and the call is thrown away
+            if (
+                speculation is None
+                and "tool_input" in fields
+                and fields.get("need_tool", True)
+                and fields.get("tool") in tools_by_name
+                and tools_by_name[fields["tool"]].cacheable
+            ):
+                speculated = (fields["tool"], fields["tool_input"] or "")
+                speculation = asyncio.create_task(run_tool(*speculated, config))
+        result = parser.close()
+        update = {
             "thought": result["thought"],
             "selected_tool": result.get("tool"),
-            "tool_input": result.get("tool_input"),
+            "tool_input": result.get("tool_input") or "",
             "status": "NEED_TOOL" if result["need_tool"] else "GENERATE_RESPONSE",
         }
-    )
-    return AgentState(**state_dict)
-
-
-# Execute tool node
-async def execute_tool(state: AgentState) -> AgentState:
-    tool = next((t for t in tools if t.name == state.selected_tool), None)
+    except (ValueError, KeyError) as e:
+        # malformed JSON or a missing field: answer without a tool instead of failing the request
+        await cancel(speculation)
+        return {"status": "ERROR", "thought": f"Could not parse the plan: {e!r}"}
+    except BaseException:
+        await cancel(speculation)
+        raise
+    if cache is not None and not cached:
+        await cache.aput(prompt, text, "think", state.current_input)
+
+    if speculation is not None:
+        # the rest of the reply can still contradict the choice, e.g. a repeated key overriding it
+        if update["status"] == "NEED_TOOL" and (update["selected_tool"], update["tool_input"]) == speculated:
+            update.update(await speculation)
+        else:
+            await cancel(speculation)
+    return update
+
+
+async def replay(reply: str):
+    yield AIMessageChunk(content=reply)
+
+
+async def cancel(task: Optional[asyncio.Task]):
+    if task is not None and not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+async def run_tool(name: str, tool_input: str, config: Optional[RunnableConfig]) -> dict:
+    tool = tools_by_name.get(name)
     if not tool:
-        state_dict = state.model_dump()
-        state_dict.update({"status": "ERROR", "thought": "Selected tool not found"})
-        return AgentState(**state_dict)
+        return {"status": "ERROR", "thought": "Selected tool not found"}
+    charge(config, tool_calls=1)
     try:
-        result = tool.func.invoke(state.tool_input)
-        state_dict = state.model_dump()
-        state_dict.update({"tool_output": str(result), "status": "GENERATE_RESPONSE"})
-        return AgentState(**state_dict)
+        if tool.cacheable:
+            cache = (config or {}).get("configurable", {}).get("result_cache")
+            if cache is None:
+                cache = get_result_cache()
+            tool_input = normalize_input(tool_input)
+            result = await cache.aget_or_compute(
+                f"{tool.name}:{tool_input}", lambda: asyncio.to_thread(lambda: str(tool.func.invoke(tool_input)))
+            )
+        else:
+            result = await tool.func.ainvoke(tool_input)
+        return {"tool_output": str(result), "status": "GENERATE_RESPONSE"}
     except Exception as e:
-        state_dict = state.model_dump()
-        state_dict.update({"status": "ERROR", "thought": f"Tool execution failed: {str(e)}"})
-        return AgentState(**state_dict)
+        return {"status": "ERROR", "thought": f"Tool execution failed: {str(e)}"}
+
+
+# Execute tool node, for tool calls think() did not already run speculatively
+async def execute_tool(state: AgentState, config: RunnableConfig) -> dict:
+    return await run_tool(state.selected_tool, state.tool_input, config)
 
 
 # Generate final response
-async def generate_response(state: AgentState) -> AgentState:
+async def generate_response(state: AgentState, config: RunnableConfig) -> dict:
     prompt = f"""
     Generate a response to the user based on the following information:
     User input: {state.current_input}
@@ -91,15 +192,18 @@ async def generate_response(state: AgentState) -> AgentState:
     Tool output: {state.tool_output}
     Please generate a clear and helpful response.
     """
-    llm = ChatOpenAI(temperature=0.7)
+    llm = get_models(config).get(temperature=0.7)
+    charge(config, llm_calls=1)
     response = await llm.ainvoke(prompt)
-    state_dict = state.model_dump()
-    state_dict.update({"final_answer": response.content, "status": "SUCCESS"})
-    return AgentState(**state_dict)
+    return {
+        "final_answer": response.content,
+        "status": "SUCCESS",
+        "messages": [{"role": "assistant", "content": response.content}],
+    }
 
 
 # Build graph
-workflow = StateGraph(AgentState)
+workflow = instrument(StateGraph(AgentState), "wikicalcu")
 workflow.add_node("think", think)
 workflow.add_node("execute_tool", execute_tool)
 workflow.add_node("generate_response", generate_response)
@@ -115,20 +219,28 @@ workflow.add_conditional_edges(
 )
 
 workflow.add_edge("execute_tool", "generate_response")
-workflow.add_edge("generate_response", "think")
+# the request is answered once generate_response succeeds, anything else goes back to think.
+# Run the app with run_with_budget() so a request that never succeeds still stops.
+workflow.add_conditional_edges(
+    "generate_response",
+    lambda state: END if state.status == "SUCCESS" else "think",
+    {END: END, "think": "think"},
+)
 
 # Compile
 app = workflow.compile()
 
+# Per-request limits: wall clock, LLM calls (think + generate_response) and tool calls
+BUDGET = Budget(deadline=30.0, max_llm_calls=4, max_tool_calls=2)
+
 
 async def main():
     # initial_state = AgentState(current_input="What is 5 times 12 plus 8?")
     initial_state = AgentState(current_input="please execute the following code: print('Hello, world!')")
-    final_state = await app.ainvoke(initial_state)
-    print(final_state.final_answer)
+    run = await run_with_budget(app, initial_state, BUDGET)
+    print(run.answer)
+    print(f"stopped: {run.stopped}, usage: {run.usage}")
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
@@ -0,0 +1,21 @@
+import pytest
+
+from src.benchmarks.suite import CASES, compare
+
+# the store cases at 100k and 1M items take minutes to fill, the smallest size covers the same code
+SMOKE = [name for name in CASES if "[" not in name or name.endswith("[1000]")]
+
+
+@pytest.mark.parametrize("name", SMOKE)
+def test_case_runs(name):
+    operation = CASES[name].setup()
+    operation()
+
+
+def test_compare_flags_slowdowns_over_threshold():
+    runs = [
+        {"results": {"a": {"median_us": 100.0}, "b": {"median_us": 100.0}}},
+        {"results": {"a": {"median_us": 105.0}, "b": {"median_us": 150.0}}},
+    ]
+
+    assert compare(runs, threshold=0.1) == ["b"]
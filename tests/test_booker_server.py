@@ -0,0 +1,109 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from src.agents.booker_server import BookerServer
+
+
+class EchoGraph:
+    checkpointer = None
+
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def ainvoke(self, state, config=None):
+        self.started.set()
+        await asyncio.sleep(0.01)
+        return {"messages": [AIMessage(content=f"echo {state['messages'][-1].content}")]}
+
+
+async def _session(port: int, texts: list[str]) -> list[bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = []
+    for text in texts:
+        writer.write(f"{text}\n".encode())
+        await writer.drain()
+        replies.append(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+def test_socket_session_round_trip():
+    async def run():
+        server = BookerServer(EchoGraph(), workers=2)
+        port = await server.listen("127.0.0.1", 0)
+        replies = await asyncio.gather(*(_session(port, ["hi", "bye"]) for _ in range(5)))
+        await asyncio.wait_for(server.drain(), timeout=5)
+        return replies, server.stats()
+
+    replies, stats = asyncio.run(run())
+    assert all(reply == [b"AI: echo hi\n", b"AI: echo bye\n"] for reply in replies)
+    assert stats["turns"] == 10
+
+
+def test_drain_does_not_wait_for_idle_clients():
+    async def run():
+        server = BookerServer(EchoGraph(), workers=2)
+        port = await server.listen("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # let the handler park in readline
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(server.drain(), timeout=5)
+        farewell = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return farewell, server
+
+    farewell, server = asyncio.run(run())
+    assert farewell == b"Server is shutting down.\n"
+    assert server.sessions_closed == server.sessions_opened == 1
+
+
+def test_drain_finishes_a_turn_in_flight():
+    async def run():
+        graph = EchoGraph()
+        server = BookerServer(graph, workers=1)
+        port = await server.listen("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"hello\n")
+        await writer.drain()
+        await graph.started.wait()
+        await asyncio.wait_for(server.drain(), timeout=5)
+        received = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return received
+
+    assert asyncio.run(run()).startswith(b"AI: echo hello\n")
+
+
+def test_invalid_utf8_gets_an_error_and_the_session_goes_on():
+    async def run():
+        server = BookerServer(EchoGraph(), workers=1)
+        port = await server.listen("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"\xff\xfe\nhi\n")
+        await writer.drain()
+        replies = [await reader.readline(), await reader.readline()]
+        writer.close()
+        await asyncio.wait_for(server.drain(), timeout=5)
+        return replies
+
+    assert asyncio.run(run()) == [b"Error: input is not valid UTF-8.\n", b"AI: echo hi\n"]
+
+
+def test_a_line_over_the_limit_closes_the_session():
+    async def run():
+        server = BookerServer(EchoGraph(), workers=1)
+        port = await server.listen("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # asyncio's default stream limit is 64 KiB
+        writer.write(b"x" * 100_000 + b"\n")
+        await writer.drain()
+        received = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        await asyncio.wait_for(server.drain(), timeout=5)
+        return received, server
+
+    received, server = asyncio.run(run())
+    assert received == b"Error: line too long, closing the session.\n"
+    assert server.sessions_closed == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from src.components.booking_repository import InMemoryBookingRepository, SQLiteBookingRepository
+
+BOOKINGS = {
+    "1": {"status": "confirmed", "name": "Ana", "guests": 2, "room": "101"},
+    "2": {"status": "pending", "name": "Ben", "guests": 1, "room": "102"},
+    "3": {"status": "confirmed", "name": "Chloe", "guests": 3, "room": "101"},
+    "4": {"status": "pending", "name": "Dev", "guests": 2},
+}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request):
+    if request.param == "memory":
+        yield InMemoryBookingRepository(BOOKINGS)
+        return
+    repository = SQLiteBookingRepository(":memory:")
+    repository.upsert_many(BOOKINGS)
+    yield repository
+    repository.close()
+
+
+def test_get(repository):
+    assert repository.get("1") == {"guest_id": "1", **BOOKINGS["1"]}
+    assert repository.get("4") == {"guest_id": "4", **BOOKINGS["4"]}
+    assert repository.get("missing") is None
+
+
+def test_get_many_skips_unknown_ids(repository):
+    assert set(repository.get_many(["1", "3", "missing", "1"])) == {"1", "3"}
+
+
+def test_get_many_past_the_sql_variable_limit():
+    repository = SQLiteBookingRepository(":memory:")
+    repository.upsert_many({str(i): {"status": "confirmed"} for i in range(1_200)})
+
+    assert len(repository.get_many(str(i) for i in range(1_500))) == 1_200
+    repository.close()
+
+
+def test_find_by_status_and_room(repository):
+    assert {booking["guest_id"] for booking in repository.find_by_status("confirmed")} == {"1", "3"}
+    assert len(repository.find_by_status("pending", limit=1)) == 1
+    assert [booking["guest_id"] for booking in repository.find_by_room("101")] == ["1", "3"]
+
+
+def test_upsert_moves_the_indexes_and_notifies(repository):
+    changed = []
+    repository.on_change(changed.append)
+
+    repository.upsert("2", {"status": "confirmed", "name": "Ben", "guests": 1, "room": "101"})
+
+    assert changed == [["2"]]
+    assert {booking["guest_id"] for booking in repository.find_by_status("pending")} == {"4"}
+    assert [booking["guest_id"] for booking in repository.find_by_room("101")] == ["1", "2", "3"]
+    assert repository.find_by_room("102") == []
@@ -0,0 +1,80 @@
+import random
+
+from langchain_core.messages import HumanMessage
+
+from src.benchmarks.checkpointer_soak import build_graph
+from src.components import bounded_checkpointer
+from src.components.bounded_checkpointer import BoundedMemorySaver
+
+
+def _stored_bytes(saver: BoundedMemorySaver) -> int:
+    """The serialized size of everything the saver holds, recomputed from scratch."""
+    checkpoints = sum(
+        len(saved[0][1]) + len(saved[1][1])
+        for namespaces in saver.storage.values()
+        for checkpoints in namespaces.values()
+        for saved in checkpoints.values()
+    )
+    blobs = sum(len(blob[1]) for blob in saver.blobs.values())
+    writes = sum(len(write[2][1]) for writes in saver.writes.values() for write in writes.values())
+    return checkpoints + blobs + writes
+
+
+def _soak(saver: BoundedMemorySaver, turns: int, threads: int, seed: int = 0):
+    graph = build_graph(saver)
+    rng = random.Random(seed)
+    for turn in range(turns):
+        config = {"configurable": {"thread_id": str(rng.randrange(threads))}}
+        graph.invoke({"messages": [HumanMessage(content=f"message {turn}")]}, config)
+        stats = saver.stats()
+        assert stats["resident_threads"] <= saver.max_threads
+        assert stats["resident_bytes"] <= saver.max_bytes
+
+
+def test_soak_stays_under_thread_and_byte_bounds():
+    saver = BoundedMemorySaver(max_threads=50, max_bytes=200_000, ttl=None, max_checkpoints_per_thread=2)
+    _soak(saver, turns=2_000, threads=400)
+
+    stats = saver.stats()
+    assert stats["evictions_threads"] > 0
+    # the gauge tracks what is really stored, nothing leaks past an eviction
+    assert stats["resident_bytes"] == _stored_bytes(saver)
+    assert set(saver.storage) <= set(saver._last_access)
+    assert all(len(checkpoints) <= 2 for namespaces in saver.storage.values() for checkpoints in namespaces.values())
+
+
+def test_byte_budget_evicts_before_thread_limit():
+    saver = BoundedMemorySaver(max_threads=10_000, max_bytes=30_000, ttl=None)
+    _soak(saver, turns=600, threads=300, seed=1)
+
+    assert saver.stats()["evictions_bytes"] > 0
+    assert saver.resident_bytes == _stored_bytes(saver)
+
+
+def test_ttl_expires_idle_threads(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bounded_checkpointer.time, "monotonic", lambda: now[0])
+    saver = BoundedMemorySaver(max_threads=None, max_bytes=None, ttl=60)
+    graph = build_graph(saver)
+    for thread in range(20):
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": f"old{thread}"}})
+
+    now[0] += 61
+    graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": "new"}})
+
+    assert saver.stats()["resident_threads"] == 1
+    assert saver.stats()["evictions_ttl"] == 20
+    assert set(saver.storage) == {"new"}
+    assert saver.resident_bytes == _stored_bytes(saver)
+
+
+def test_delete_thread_releases_its_bytes():
+    saver = BoundedMemorySaver()
+    graph = build_graph(saver)
+    for thread in ("a", "b"):
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": thread}})
+
+    saver.delete_thread("a")
+
+    assert saver.resident_threads == 1
+    assert saver.resident_bytes == _stored_bytes(saver)
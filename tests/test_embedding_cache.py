@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from src.benchmarks.fakes import FakeEmbeddings
+from src.components.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    def __init__(self, dims: int = 16):
+        super().__init__(dims)
+        self.texts: list[str] = []
+
+    def embed_documents(self, texts):
+        self.texts += texts
+        return super().embed_documents(texts)
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(0.01)
+        return self.embed_documents(texts)
+
+
+class RecordingCache(CachedEmbeddings):
+    """Records the threads the SQLite lookups and writes run on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads: set[threading.Thread] = set()
+
+    def _lookup(self, keys):
+        self.threads.add(threading.current_thread())
+        return super()._lookup(keys)
+
+    def _store(self, vectors):
+        self.threads.add(threading.current_thread())
+        super()._store(vectors)
+
+
+def test_repeated_texts_are_embedded_once():
+    model = CountingEmbeddings()
+    cache = CachedEmbeddings(model, batch_size=2)
+
+    first = cache.embed_documents(["pizza", "coffee", "pizza", "tea"])
+    second = cache.embed_documents(["tea", "pizza"])
+
+    assert sorted(model.texts) == ["coffee", "pizza", "tea"]
+    # cached vectors come back as float32
+    np.testing.assert_allclose(second, [first[3], first[0]], rtol=1e-6)
+    assert cache.stats() == {"hits": 2, "misses": 4, "hit_rate": 2 / 6, "requests": 2}
+
+
+def test_vectors_survive_a_new_instance(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = CachedEmbeddings(CountingEmbeddings(), path=path)
+    vectors = cache.embed_documents(["coffee"]) + [cache.embed_query("tea")]
+
+    model = CountingEmbeddings()
+    reopened = CachedEmbeddings(model, path=path)
+
+    np.testing.assert_allclose(reopened.embed_documents(["coffee"]) + [reopened.embed_query("tea")], vectors, rtol=1e-6)
+    assert model.texts == []
+    assert reopened.stats()["requests"] == 0
+
+
+def test_different_models_do_not_share_vectors():
+    model = CountingEmbeddings()
+    path = "file:shared-models?mode=memory&cache=shared"
+    small, large = CachedEmbeddings(model, path=path, model="small"), CachedEmbeddings(model, path=path, model="large")
+
+    small.embed_documents(["pizza"])
+    large.embed_documents(["pizza"])
+
+    assert model.texts == ["pizza", "pizza"]
+
+
+def test_queries_and_documents_do_not_share_vectors():
+    class AsymmetricEmbeddings(CountingEmbeddings):
+        """Embeds a query with a prefix, like e5's "query: " and "passage: "."""
+
+        def embed_documents(self, texts):
+            self.texts += texts
+            return [FakeEmbeddings.embed_query(self, text) for text in texts]
+
+        def embed_query(self, text):
+            self.texts.append(f"query {text}")
+            return FakeEmbeddings.embed_query(self, f"query {text}")
+
+    model = AsymmetricEmbeddings()
+    cache = CachedEmbeddings(model)
+
+    [document] = cache.embed_documents(["coffee"])
+    query = cache.embed_query("coffee")
+
+    assert model.texts == ["coffee", "query coffee"]
+    assert not np.allclose(query, document)
+    np.testing.assert_allclose(cache.embed_query("coffee"), query, rtol=1e-6)
+    np.testing.assert_allclose(cache.embed_documents(["coffee"]), [document], rtol=1e-6)
+    assert model.texts == ["coffee", "query coffee"]
+
+
+def test_trim_keeps_the_newest_vectors():
+    cache = CachedEmbeddings(CountingEmbeddings(), max_entries=10)
+    cache.embed_documents([f"text {i}" for i in range(25)])
+
+    with cache.pool.connection() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 10
+
+
+def test_async_calls_count_requests_and_keep_sqlite_off_the_loop():
+    async def run(cache):
+        loop_thread = threading.current_thread()
+        documents = await asyncio.gather(
+            *(cache.aembed_documents([f"text {i}-{j}" for j in range(8)]) for i in range(8))
+        )
+        query = await cache.aembed_query("text 0-0")
+        np.testing.assert_allclose(await cache.aembed_query("text 0-0"), query, rtol=1e-6)
+        return loop_thread, documents, query
+
+    cache = RecordingCache(CountingEmbeddings(), batch_size=4, max_concurrency=2)
+    loop_thread, documents, query = asyncio.run(run(cache))
+
+    np.testing.assert_allclose(query, documents[0][0], rtol=1e-6)
+    # 16 document batches and the first query
+    assert cache.stats()["requests"] == 17
+    assert cache.stats()["hits"] == 1
+    assert loop_thread not in cache.threads
@@ -0,0 +1,85 @@
+import asyncio
+
+from langchain_core.tools import tool
+
+from src.components.fan_out import FanOutExecutor, ToolLimits, fan_out_status, merge_outputs
+from src.samples import parallel_tool_call
+
+
+@tool
+async def quick(query: str) -> str:
+    """Answers at once."""
+    return f"quick {query}"
+
+
+@tool
+async def hung(query: str) -> str:
+    """Never answers."""
+    await asyncio.Event().wait()
+
+
+@tool
+async def broken(query: str) -> str:
+    """Always fails."""
+    raise RuntimeError("backend down")
+
+
+def test_failures_and_timeouts_are_returned_not_raised():
+    async def run():
+        executor = FanOutExecutor(default_timeout=0.05)
+        return await asyncio.gather(*(executor.run(t, "q") for t in (quick, hung, broken)))
+
+    ok, timed_out, failed = asyncio.run(run())
+    assert ok["ok"] and ok["output"] == "quick q"
+    assert timed_out == {"ok": False, "error": "timed out after 0.05s", "elapsed_s": timed_out["elapsed_s"]}
+    assert failed["error"] == "RuntimeError: backend down"
+    assert fan_out_status({"quick": ok, "hung": timed_out}) == "PARTIAL"
+    assert fan_out_status({"hung": timed_out}) == "ERROR"
+
+
+def test_per_tool_and_global_concurrency_limits():
+    running, peak = 0, 0
+
+    @tool
+    async def slow(query: str) -> str:
+        """Takes a moment."""
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return query
+
+    async def run():
+        executor = FanOutExecutor(max_concurrency=4, limits={"slow": ToolLimits(concurrency=2, timeout=5)})
+        await asyncio.gather(*(executor.run(slow, str(i)) for i in range(10)))
+        await asyncio.gather(*(executor.run(quick, str(i)) for i in range(10)))
+        return executor
+
+    executor = asyncio.run(run())
+    assert peak == 2
+    assert executor.peak_in_flight <= 4
+
+
+def test_merge_outputs_keeps_every_tool():
+    assert merge_outputs({"a": 1}, {"b": 2}) == {"a": 1, "b": 2}
+    assert merge_outputs(None, {"b": 2}) == {"b": 2}
+
+
+def test_no_required_tools_completes():
+    state = asyncio.run(parallel_tool_call.app.ainvoke(parallel_tool_call.AgentState(current_input="hello")))
+
+    assert state["status"] == "SUCCESS"
+    assert state["tools_output"] == {}
+
+
+def test_updates_stream_per_tool_and_merge_at_the_barrier():
+    async def run():
+        state = parallel_tool_call.AgentState(current_input="weather and news for Paris")
+        return [update async for update in parallel_tool_call.app.astream(state, stream_mode="updates")]
+
+    updates = asyncio.run(run())
+
+    # the faster weather tool's update comes first, then news, then collect with both merged
+    assert [next(iter(update["run_tool"]["tools_output"])) for update in updates[:2]] == ["weather", "news"]
+    assert updates[2] == {"collect": {"status": "SUCCESS"}}
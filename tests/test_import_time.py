@@ -0,0 +1,52 @@
+"""
+Import-time budget for the agent entry points, measured with `python -X importtime` in a fresh interpreter,
+so a module that starts building models or graphs at import time fails here.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time budgets in milliseconds
+BUDGETS_MS = {
+    "src.agents.booker": 50,
+    "src.agents.weather_agent": 50,
+}
+
+
+def import_time_ms(module: str, runs: int = 3) -> float:
+    """Best-of-N cumulative import time of `module` in a fresh interpreter."""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # lines look like: "import time:   self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                cumulative = int(parts[1]) / 1000
+                best = cumulative if best is None else min(best, cumulative)
+    if best is None:
+        raise RuntimeError(f"{module} did not show up in the -X importtime output")
+    return best
+
+
+@pytest.mark.parametrize("module, budget", BUDGETS_MS.items())
+def test_import_time_within_budget(module: str, budget: float):
+    assert import_time_ms(module) <= budget
+
+
+@pytest.mark.parametrize("module", BUDGETS_MS)
+def test_import_does_not_load_langchain(module: str):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(any(m.startswith('langchain') for m in sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
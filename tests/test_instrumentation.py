@@ -0,0 +1,76 @@
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import interrupt
+from typing_extensions import TypedDict
+
+from src._shared import instrumentation
+from src._shared.instrumentation import GraphMetrics, instrument
+
+
+class State(TypedDict):
+    items: list
+
+
+def _graph(metrics: GraphMetrics, second, checkpointer=None):
+    builder = instrument(StateGraph(State), "test", metrics)
+    builder.add_node("first", lambda state: {"items": state["items"] + [1]})
+    builder.add_node("second", second)
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _fail(state: State):
+    raise ValueError("boom")
+
+
+def _ask(state: State):
+    interrupt("name?")
+    return {}
+
+
+def test_records_calls_latency_and_steps():
+    metrics = GraphMetrics()
+    graph = _graph(metrics, lambda state: {})
+    for _ in range(3):
+        graph.invoke({"items": []})
+    metrics.flush()
+
+    assert metrics.nodes[("test", "first")].calls == 3
+    assert metrics.nodes[("test", "second")].latency.count == 3
+    assert {step for _, step in metrics.step_latency} == {1, 2}
+
+
+def test_errors_are_counted_and_interrupts_are_not():
+    metrics = GraphMetrics()
+    with pytest.raises(ValueError):
+        _graph(metrics, _fail).invoke({"items": []})
+    _graph(metrics, _ask, InMemorySaver()).invoke({"items": []}, {"configurable": {"thread_id": "1"}})
+    metrics.flush()
+
+    assert metrics.nodes[("test", "second")].errors == 1
+    assert metrics.nodes[("test", "second")].calls == 2
+
+
+def test_state_size_is_sampled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "STATE_SIZE_EVERY", 4)
+    metrics = GraphMetrics()
+    graph = _graph(metrics, lambda state: {})
+    for _ in range(8):
+        graph.invoke({"items": [1, 2]})
+    metrics.flush()
+
+    first = metrics.nodes[("test", "first")]
+    assert first.calls == 8
+    assert first.state_size.count == 2
+
+
+def test_prometheus_export():
+    metrics = GraphMetrics()
+    _graph(metrics, lambda state: {}).invoke({"items": []})
+    text = metrics.to_prometheus()
+
+    assert 'langgraph_node_calls_total{graph="test",node="first"} 1' in text
+    assert 'langgraph_node_latency_by_step_seconds_count{graph="test",step="1"} 1' in text
@@ -0,0 +1,42 @@
+from langchain_core.messages import HumanMessage
+
+from src.agents.booker import INTENTS, route_request
+from src.components.intent_router import IntentMatch, IntentRouter
+
+
+def test_first_phrase_in_priority_order_wins():
+    router = IntentRouter([("check booking", "check"), ("booking", "any")])
+
+    assert router.match("please check booking 42") == IntentMatch("check", "check booking", "42")
+    assert router.match("my booking") == IntentMatch("any", "booking", "")
+
+
+def test_matching_ignores_case_but_keeps_the_argument_as_typed():
+    router = IntentRouter(INTENTS)
+
+    assert router.match("  Report Issue 123 Water Leak ") == IntentMatch(
+        "process_report_issue", "report issue", "123 Water Leak"
+    )
+
+
+def test_no_match():
+    assert IntentRouter(INTENTS).match("what's the weather?") is None
+
+
+def test_unicode_whose_lowercase_changes_length():
+    # "İ" lowercases to two code points, the argument is cut from the lowered text instead
+    match = IntentRouter([("greet", "greet")]).match("İ greet Ana")
+
+    assert match.target == "greet" and match.argument == "ana"
+
+
+def test_route_request_splits_guest_id_and_details():
+    update = route_request({"messages": [HumanMessage("report issue 123 water leak")]})
+
+    assert update == {
+        "next_node": "process_report_issue",
+        "argument": "123 water leak",
+        "guest_id": "123",
+        "details": "water leak",
+    }
+    assert route_request({"messages": [HumanMessage("hello")]})["next_node"] is None
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.components.json_stream import JSONObjectStream
+
+REPLY = {"need_tool": True, "tool": "wikipedia", "tool_input": 'Ada "Countess" Lovelace', "thought": "a, b } c"}
+
+
+def _feed(text: str, size: int) -> tuple[JSONObjectStream, list]:
+    parser = JSONObjectStream()
+    completed = []
+    for start in range(0, len(text), size):
+        completed += parser.feed(text[start : start + size])
+    return parser, completed
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_fields_complete_in_order_whatever_the_chunking(size):
+    parser, completed = _feed(json.dumps(REPLY), size)
+
+    assert completed == list(REPLY.items())
+    assert parser.close() == REPLY
+
+
+def test_a_field_is_reported_as_soon_as_its_value_ends():
+    parser = JSONObjectStream()
+
+    assert parser.feed('{"need_tool": true, "tool": "wiki') == [("need_tool", True)]
+    assert parser.feed('pedia", "tool_input": "x"') == [("tool", "wikipedia"), ("tool_input", "x")]
+    # a bare number only ends at its delimiter
+    assert parser.feed(', "n": 12') == []
+    assert parser.feed("}") == [("n", 12)]
+    assert parser.done
+
+
+def test_nested_values_and_a_leading_fence():
+    parser, completed = _feed('```json\n{"a": {"b": [1, {"c": "}"}]}, "d": null}\n```', 2)
+
+    assert completed == [("a", {"b": [1, {"c": "}"}]}), ("d", None)]
+    assert parser.close() == {"a": {"b": [1, {"c": "}"}]}, "d": None}
+
+
+def test_empty_object():
+    parser = JSONObjectStream()
+    parser.feed("{}")
+
+    assert parser.close() == {}
+
+
+@pytest.mark.parametrize("text", ['{"a": tru}', "{a: 1}", '{"a" 1}', '{"a": 1 "b": 2}'])
+def test_malformed_input_raises_value_error(text):
+    with pytest.raises(ValueError):
+        JSONObjectStream().feed(text)
+
+
+def test_incomplete_input_raises_on_close():
+    parser = JSONObjectStream()
+    parser.feed('{"a": 1, "b": "unfinished')
+
+    with pytest.raises(ValueError, match="incomplete"):
+        parser.close()
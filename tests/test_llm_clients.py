@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from src.benchmarks.openai_stub import TEXT_REPLY, OpenAIStub, start_in_thread
+from src.components.llm_clients import ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def stub():
+    stub = OpenAIStub()
+    stub.base_url = start_in_thread(stub)
+    return stub
+
+
+def test_get_returns_one_client_per_model_and_temperature():
+    registry = ModelRegistry(api_key="stub")
+
+    llm = registry.get("gpt-4o-mini", temperature=0)
+
+    assert registry.get("gpt-4o-mini", temperature=0) is llm
+    assert registry.get("gpt-4o-mini", temperature=0.7) is not llm
+    assert registry.get("gpt-4o", temperature=0) is not llm
+    assert registry.get("gpt-4o-mini", temperature=0.7).temperature == 0.7
+    registry.close()
+
+
+def test_clients_share_the_registry_http_clients():
+    registry = ModelRegistry(api_key="stub")
+    clients = [registry.get("gpt-4o-mini", 0), registry.get("gpt-4o-mini", 0.7), registry.get("gpt-4o", 0)]
+
+    assert {id(llm.root_client._client) for llm in clients} == {id(registry.http_client)}
+    assert {id(llm.root_async_client._client) for llm in clients} == {id(registry.http_async_client)}
+    registry.close()
+
+
+def test_registry_passes_base_url_and_model_kwargs():
+    registry = ModelRegistry(base_url="http://127.0.0.1:1/v1", api_key="stub", max_retries=0)
+
+    llm = registry.get()
+
+    assert llm.openai_api_base == "http://127.0.0.1:1/v1"
+    assert llm.max_retries == 0
+    registry.close()
+
+
+def test_calls_through_the_registry_reuse_one_connection(stub):
+    registry = ModelRegistry(base_url=stub.base_url, api_key="stub")
+    connections, requests = stub.connections, stub.requests
+
+    replies = [registry.get(temperature=temperature).invoke("hi").content for temperature in (0, 0.7, 0, 0.7)]
+
+    assert replies == [TEXT_REPLY] * 4
+    assert stub.requests - requests == 4
+    assert stub.connections - connections == 1
+    registry.close()
+
+
+def test_async_calls_through_the_registry_reuse_one_connection(stub):
+    registry = ModelRegistry(base_url=stub.base_url, api_key="stub")
+    connections = stub.connections
+
+    async def run():
+        replies = [(await registry.get(temperature=t).ainvoke("hi")).content for t in (0, 0.7, 0)]
+        await registry.aclose()
+        return replies
+
+    assert asyncio.run(run()) == [TEXT_REPLY] * 3
+    assert stub.connections - connections == 1
+
+
+def test_separate_registries_open_separate_connections(stub):
+    registries = [ModelRegistry(base_url=stub.base_url, api_key="stub") for _ in range(2)]
+    connections = stub.connections
+
+    for registry in registries:
+        registry.get().invoke("hi")
+        registry.get().invoke("hi")
+        registry.close()
+
+    assert stub.connections - connections == 2
+
+
+def test_close_drops_clients_and_pools():
+    registry = ModelRegistry(api_key="stub")
+    llm, http_client = registry.get(), registry.http_client
+
+    registry.close()
+
+    assert http_client.is_closed
+    assert registry.get() is not llm
+    assert registry.http_client is not http_client
+    registry.close()
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.benchmarks.fakes import FakeEmbeddings
+from src.components.persistent_store import PersistentVectorStore
+
+NAMESPACE = ("1", "memories")
+
+
+def _open(path, **options) -> PersistentVectorStore:
+    return PersistentVectorStore(
+        str(path), index={"embed": FakeEmbeddings(16), "dims": 16, "fields": ["text"]}, **options
+    )
+
+
+def test_items_and_vectors_survive_a_reopen(tmp_path):
+    store = _open(tmp_path)
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"memory number {i}"}) for i in range(50)])
+    store.put(NAMESPACE, "m1", {"text": "black coffee"})
+    store.delete(NAMESPACE, "m2")
+    expected = [(item.key, item.score) for item in store.search(NAMESPACE, query="coffee", limit=5)]
+    store.close()
+
+    reopened = _open(tmp_path)
+
+    assert reopened.get(NAMESPACE, "m1").value == {"text": "black coffee"}
+    assert reopened.get(NAMESPACE, "m2") is None
+    assert [(item.key, item.score) for item in reopened.search(NAMESPACE, query="coffee", limit=5)] == expected
+    reopened.close()
+
+
+def test_racing_puts_on_one_key_log_only_the_last_vectors(tmp_path):
+    class SlowEmbeddings(FakeEmbeddings):
+        async def aembed_documents(self, texts):
+            await asyncio.sleep(0.05 if "coffee" in texts else 0.0)
+            return self.embed_documents(texts)
+
+    index = {"embed": SlowEmbeddings(16), "dims": 16, "fields": ["text"]}
+    store = PersistentVectorStore(str(tmp_path), index=index)
+
+    async def run():
+        await asyncio.gather(
+            store.aput(NAMESPACE, "k", {"text": "coffee"}), store.aput(NAMESPACE, "k", {"text": "pizza"})
+        )
+
+    asyncio.run(run())
+    store.close()
+    reopened = _open(tmp_path)
+
+    [found] = reopened.search(NAMESPACE, query="coffee", limit=1)
+    assert found.value == {"text": "coffee"}
+    assert found.score == pytest.approx(1.0)
+    assert reopened.stats()["vectors"] == 1
+    reopened.close()
+
+
+def test_a_torn_log_line_is_dropped(tmp_path):
+    store = _open(tmp_path)
+    store.put(NAMESPACE, "kept", {"text": "kept"})
+    log = store._files[NAMESPACE].log_path()
+    store.close()
+    with open(log, "a") as file:
+        file.write('{"key": "torn", "val')
+
+    reopened = _open(tmp_path)
+
+    assert [item.key for item in reopened.search(NAMESPACE)] == ["kept"]
+    reopened.put(NAMESPACE, "after", {"text": "after"})
+    reopened.close()
+    assert {item.key for item in _open(tmp_path).search(NAMESPACE)} == {"kept", "after"}
+
+
+def test_updates_past_the_ratio_compact_in_the_background(tmp_path):
+    store = _open(tmp_path, compact_ratio=0.3, compact_min=10)
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"memory {i}"}) for i in range(40)])
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"updated {i}"}) for i in range(20)])
+    store.close()
+
+    reopened = _open(tmp_path)
+
+    assert reopened.stats()["dead_vectors"] == 0
+    assert reopened.get(NAMESPACE, "m5").value == {"text": "updated 5"}
+    assert reopened.search(NAMESPACE, query="updated 7", limit=1)[0].key == "m7"
+    reopened.close()
+
+
+def test_compact_also_covers_writes_made_during_a_running_compaction(tmp_path):
+    store = _open(tmp_path, compact_ratio=0.3, compact_min=10)
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"memory {i}"}) for i in range(40)])
+    # hold the compaction thread so the compaction the next writes trigger stays queued behind it
+    release = threading.Event()
+    store._compactor.submit(release.wait)
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"updated {i}"}) for i in range(20)])
+    assert NAMESPACE in store._compacting
+    # rewritten while that compaction is pending, so it can't drop their old rows
+    store.put_many([(NAMESPACE, f"m{i}", {"text": f"again {i}"}) for i in range(20, 40)])
+    release.set()
+
+    store.compact()
+
+    assert store.stats()["dead_vectors"] == 0
+    assert store.stats()["vectors"] == 40
+    assert store.search(NAMESPACE, query="again 30", limit=1)[0].key == "m30"
+    store.close()
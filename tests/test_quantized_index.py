@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.components.quantized_index import QuantizedIndex
+from src.components.vector_index import FlatIndex, normalize
+
+
+def _vectors(count: int, dims: int = 32, seed: int = 0) -> np.ndarray:
+    return normalize(np.random.default_rng(seed).standard_normal((count, dims)))
+
+
+def _recall(index, exact, queries, k: int = 10) -> float:
+    found, _ = index.search(queries, k)
+    expected, _ = exact.search(queries, k)
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(found.tolist(), expected.tolist())])
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError, match="codec"):
+        QuantizedIndex(32, codec="int4")
+
+
+@pytest.mark.parametrize(
+    "options, codes_dtype, min_recall",
+    [
+        ({"codec": "int8"}, np.int8, 0.95),
+        ({"codec": "pq", "rescore": 16, "subvector": 4}, np.uint8, 0.8),
+        ({"codec": "int8", "rescore": 0}, np.int8, 0.8),
+    ],
+)
+def test_recall_against_exact_search(options, codes_dtype, min_recall):
+    vectors, queries = _vectors(2_000), _vectors(20, seed=1)
+    ids = np.arange(len(vectors))
+    index, exact = QuantizedIndex(32, train_size=500, **options), FlatIndex(32)
+    index.add(ids, vectors)
+    exact.add(ids, vectors)
+
+    assert index.trained and index._codes.dtype == codes_dtype
+    assert _recall(index, exact, queries) >= min_recall
+
+
+def test_exact_until_trained():
+    vectors = _vectors(100)
+    index = QuantizedIndex(32, train_size=1_000)
+    index.add(np.arange(100), vectors)
+
+    ids, scores = index.search(vectors[:3], 1)
+
+    assert not index.trained
+    assert ids[:, 0].tolist() == [0, 1, 2]
+    np.testing.assert_allclose(scores[:, 0], 1.0, rtol=1e-5)
+
+
+def test_remove_and_allowed_after_training():
+    vectors = _vectors(1_000)
+    index = QuantizedIndex(32, train_size=200)
+    index.add(np.arange(1_000), vectors)
+
+    index.remove([5, 6])
+    removed, _ = index.search(vectors[5], 1)
+    allowed, _ = index.search(vectors[7], 3, allowed=[7, 8])
+
+    assert len(index) == 998
+    assert removed[0, 0] != 5
+    assert allowed[0, 0] == 7 and set(allowed[0].tolist()) <= {7, 8, -1}
@@ -0,0 +1,65 @@
+import time
+from typing import Annotated
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from src.agents.replay import chunked, replay_chunk
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(checkpointer=None):
+    def reply(state: State):
+        text = state["messages"][-1].content
+        # "sleep 50" takes 50 ms, anything else is instant
+        if text.startswith("sleep"):
+            time.sleep(int(text.split()[1]) / 1000)
+        return {"messages": [AIMessage(content=f"{len(state['messages'])}: {text}")]}
+
+    builder = StateGraph(State)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def test_turns_are_timed_individually():
+    conversations = [{"id": "slow", "messages": ["sleep 200"]}, {"id": "fast", "messages": ["hi"]}]
+    _results, turns, _totals = replay_chunk(conversations, graph=_graph())
+
+    summary = turns.summary()
+    assert summary["count"] == 2
+    # before, both turns recorded the 200 ms of the whole batch
+    assert summary["mean"] < 0.15 and summary["max"] >= 0.2
+
+
+@pytest.mark.parametrize("checkpointer", [None, InMemorySaver()])
+def test_conversations_keep_their_own_history(checkpointer):
+    conversations = [{"id": "a", "messages": ["one", "two"]}, {"id": "b", "messages": ["uno"]}]
+    results, _turns, totals = replay_chunk(conversations, graph=_graph(checkpointer))
+
+    assert results == [
+        {"id": "a", "turns": [{"reply": "1: one"}, {"reply": "3: two"}]},
+        {"id": "b", "turns": [{"reply": "1: uno"}]},
+    ]
+    assert totals.count == 2
+
+
+def test_duplicate_ids_split_into_separate_chunks():
+    conversations = [{"id": "a"}, {"id": "b"}, {"id": "a"}, {"id": "c"}, {"id": "d"}]
+
+    chunks = [[conversation["id"] for conversation in chunk] for chunk in chunked(conversations, 3)]
+
+    assert chunks == [["a", "b"], ["a", "c", "d"]]
+
+
+def test_replay_chunk_rejects_duplicate_ids():
+    with pytest.raises(ValueError):
+        replay_chunk([{"id": "a", "messages": ["x"]}, {"id": "a", "messages": ["y"]}], graph=_graph())
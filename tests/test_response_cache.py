@@ -0,0 +1,227 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.components import response_cache
+from src.components.response_cache import ResponseCache, messages_text
+
+
+class TableEmbeddings(Embeddings):
+    """Fixed vectors per text, so the similarity between two queries is known exactly. Counts the calls."""
+
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+        self.calls: list[str] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls.append(text)
+        return self.vectors.get(text, [0.0, 0.0, 1.0])
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+# cosine similarities to "5 times 12": 0.98 for "five times twelve", 0.8 for "5 times 13"
+VECTORS = {"5 times 12": [1.0, 0.0, 0.0], "five times twelve": [0.98, 0.199, 0.0], "5 times 13": [0.8, 0.6, 0.0]}
+
+
+def _clock(monkeypatch, start: float = 1000.0) -> list[float]:
+    now = [start]
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_exact_hit_on_the_normalized_prompt():
+    cache = ResponseCache()
+    cache.put("What is  5 times 12?\n", "60")
+
+    assert cache.get(" What is 5 times 12? ") == (True, "60")
+    assert cache.get("What is 5 times 13?") == (False, None)
+    assert cache.stats() | {"hit_rate": None} == {
+        "size": 1,
+        "hits": 1,
+        "semantic_hits": 0,
+        "misses": 1,
+        "hit_rate": None,
+        "evictions": 0,
+    }
+
+
+def test_exact_hit_does_not_embed():
+    embeddings = TableEmbeddings(VECTORS)
+    cache = ResponseCache(embeddings=embeddings)
+    cache.put("prompt", "60", query="5 times 12")
+    embeddings.calls.clear()
+
+    assert cache.get("prompt", query="5 times 12") == (True, "60")
+    assert embeddings.calls == []
+
+
+def test_semantic_hit_above_the_threshold():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS), threshold=0.95)
+    cache.put("Question: 5 times 12", "60", query="5 times 12")
+
+    assert cache.get("Question: five times twelve", query="five times twelve") == (True, "60")
+    assert cache.get("Question: 5 times 13", query="5 times 13") == (False, None)
+    assert (cache.semantic_hits, cache.misses) == (1, 1)
+
+
+def test_threshold_decides_what_is_similar_enough():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS), threshold=0.75)
+    cache.put("Question: 5 times 12", "60", query="5 times 12")
+
+    assert cache.get("Question: 5 times 13", query="5 times 13") == (True, "60")
+
+
+def test_query_defaults_to_the_prompt():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60")
+
+    assert cache.get("five times twelve") == (True, "60")
+
+
+def test_missed_query_is_embedded_once_for_the_put_that_follows():
+    embeddings = TableEmbeddings(VECTORS)
+    cache = ResponseCache(embeddings=embeddings)
+
+    assert cache.get("Question: 5 times 12", query="5 times 12") == (False, None)
+    cache.put("Question: 5 times 12", "60", query="5 times 12")
+
+    assert embeddings.calls == ["5 times 12"]
+
+
+def test_namespaces_are_isolated():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60", namespace="think")
+
+    assert cache.get("5 times 12", namespace="answer") == (False, None)
+    assert cache.get("five times twelve", namespace="answer") == (False, None)
+    assert cache.get("five times twelve", namespace="think") == (True, "60")
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = _clock(monkeypatch)
+    cache = ResponseCache(ttl=10, embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60")
+
+    now[0] += 9
+    assert cache.get("5 times 12") == (True, "60")
+    now[0] += 2
+    assert cache.get("five times twelve") == (False, None)
+    assert cache.get("5 times 12") == (False, None)
+    assert cache.stats()["size"] == 0
+    # the expired entry gave its vector row back
+    assert cache._free == [0]
+
+
+def test_no_ttl_never_expires(monkeypatch):
+    now = _clock(monkeypatch)
+    cache = ResponseCache(ttl=None)
+    cache.put("prompt", "reply")
+
+    now[0] += 10**9
+    assert cache.get("prompt") == (True, "reply")
+
+
+def test_lru_eviction_frees_the_vector_row_for_the_next_entry():
+    cache = ResponseCache(max_entries=2, embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60")
+    cache.put("5 times 13", "65")
+    # touch the first entry, the second is now the least recently used
+    assert cache.get("5 times 12") == (True, "60")
+
+    cache.put("five times twelve", "sixty")
+
+    assert cache.evictions == 1
+    assert cache.get("5 times 13") == (False, None)
+    assert cache._slot_keys == [("", "5 times 12"), None, ("", "five times twelve")]
+    assert cache._free == [1]
+    # freed rows have namespace -1, semantic lookups skip them
+    assert list(cache._namespaces[:3]) == [0, -1, 0]
+
+    cache.put("5 times 13", "65 again")
+
+    # it takes the free row, and evicts "5 times 12" in turn
+    assert cache._slot_keys == [None, ("", "5 times 13"), ("", "five times twelve")]
+    assert cache._free == [0]
+    np.testing.assert_allclose(cache._vectors[1], VECTORS["5 times 13"], rtol=1e-6)
+
+
+def test_freed_rows_are_skipped_by_semantic_lookups():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS), threshold=0.75)
+    cache.put("5 times 12", "60", namespace="a")
+    cache.put("5 times 13", "65", namespace="b")
+    cache._remove(("a", "5 times 12"))
+
+    assert list(cache._namespaces[:2]) == [-1, 1]
+    assert cache.get("five times twelve", namespace="a") == (False, None)
+
+
+def test_overwriting_an_entry_reuses_its_row():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60")
+    cache.put("5 times 12", "sixty")
+
+    assert cache._slot_keys == [("", "5 times 12")]
+    assert cache._free == []
+    assert cache.get("five times twelve") == (True, "sixty")
+
+
+def test_async_get_and_put():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS))
+
+    async def run():
+        await cache.aput("Question: 5 times 12", "60", query="5 times 12")
+        return await cache.aget("Question: five times twelve", query="five times twelve")
+
+    assert asyncio.run(run()) == (True, "60")
+
+
+def test_messages_text_drops_the_system_prompt_and_tool_call_ids():
+    call = {"name": "calculator", "args": {"expression": "5*12"}, "id": "call_123"}
+    prompt = dumps([SystemMessage("Be brief."), HumanMessage("5 times 12?"), AIMessage("", tool_calls=[call])])
+
+    assert messages_text(prompt) == 'human: 5 times 12?\nai: calculator({"expression": "5*12"})'
+    assert messages_text("not json") == "not json"
+    assert messages_text(json.dumps({"not": "a list"})) == json.dumps({"not": "a list"})
+
+
+def test_chat_model_replies_come_from_the_cache():
+    cache = ResponseCache(embeddings=TableEmbeddings({"human: 5 times 12": [1.0, 0.0, 0.0]}))
+    llm = GenericFakeChatModel(messages=iter([AIMessage("60"), AIMessage("a second call")]), cache=cache)
+
+    first = llm.invoke([SystemMessage("Be brief."), HumanMessage("5 times 12")])
+    # same conversation under another system prompt: a semantic hit on the messages text
+    second = llm.invoke([SystemMessage("Answer briefly."), HumanMessage("5 times 12")])
+
+    assert first.content == second.content == "60"
+    assert (cache.hits, cache.semantic_hits, cache.misses) == (0, 1, 1)
+    assert llm.invoke([SystemMessage("Be brief."), HumanMessage("5 times 12")]).content == "60"
+    assert cache.hits == 1
+
+
+def test_model_parameters_are_separate_namespaces():
+    cache = ResponseCache()
+    llm = GenericFakeChatModel(messages=iter([AIMessage("plain"), AIMessage("with stop")]), cache=cache)
+
+    assert llm.invoke("hi").content == "plain"
+    # another stop sequence is another llm_string, the cached reply doesn't apply
+    assert llm.invoke("hi", stop=["."]).content == "with stop"
+    assert cache.stats()["size"] == 2
+    assert len({namespace for namespace, _ in cache._entries}) == 2
+
+
+def test_clear_empties_the_cache():
+    cache = ResponseCache(embeddings=TableEmbeddings(VECTORS))
+    cache.put("5 times 12", "60")
+
+    cache.clear()
+
+    assert cache.get("five times twelve") == (False, None)
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.components.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    yield cache
+    cache.close()
+
+
+def test_put_get_survives_reopen(tmp_path):
+    path = str(tmp_path / "results.db")
+    cache = ResultCache(path)
+    cache.put("wikipedia:paris", {"summary": "Capital of France"})
+    cache.close()
+
+    reopened = ResultCache(path)
+    assert reopened.get("wikipedia:paris") == (True, {"summary": "Capital of France"})
+    assert reopened.get("wikipedia:rome") == (False, None)
+    reopened.close()
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"), ttl=-1)
+    cache.put("key", "value")
+
+    assert cache.get("key") == (False, None)
+    cache.close()
+
+
+def test_trim_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"), max_entries=3, touch_interval=0)
+    for key in "abc":
+        cache.put(key, key)
+    cache.get("a")
+    cache.put("d", "d")
+
+    assert len(cache) == 3
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, "a")
+    cache.close()
+
+
+def test_concurrent_calls_compute_once(cache):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("key", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_leader_cancellation_does_not_reach_waiters(cache):
+    async def run():
+        leader_started = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(len(calls))
+            leader_started.set()
+            await asyncio.sleep(0.05)
+            return f"value {len(calls)}"
+
+        leader = asyncio.create_task(cache.aget_or_compute("key", compute))
+        await leader_started.wait()
+        follower = asyncio.create_task(cache.aget_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, calls
+
+    value, calls = asyncio.run(run())
+    # the follower took over and computed the value itself
+    assert value == "value 2"
+    assert len(calls) == 2
+
+
+def test_leader_failure_reaches_waiters(cache):
+    async def compute():
+        await asyncio.sleep(0.02)
+        raise LookupError("no page")
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("key", compute) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, LookupError) for result in asyncio.run(run()))
+    assert cache.get("key") == (False, None)
+
+
+def test_sqlite_work_runs_off_the_event_loop(cache, monkeypatch):
+    threads = []
+    get, put = cache.get, cache.put
+    monkeypatch.setattr(cache, "get", lambda key: threads.append(threading.current_thread()) or get(key))
+    monkeypatch.setattr(cache, "put", lambda key, value: threads.append(threading.current_thread()) or put(key, value))
+
+    async def compute():
+        return "value"
+
+    asyncio.run(cache.aget_or_compute("key", compute))
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_sync_single_flight(cache):
+    gate = threading.Event()
+    calls = 0
+
+    def compute():
+        nonlocal calls
+        calls += 1
+        gate.wait(1)
+        return "value"
+
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute))) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    gate.set()
+    for worker in workers:
+        worker.join()
+
+    assert results == ["value"] * 4
+    assert calls == 1
@@ -0,0 +1,107 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.components import retry
+from src.components.retry import Backoff, CircuitBreaker, CircuitOpenError, RetryScheduler
+
+
+class Flaky:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self, value):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"attempt {self.calls}")
+        return value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    # the module's own clock only, asyncio.sleep keeps the real one
+    monkeypatch.setattr(retry, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_backoff_caps_and_jitter():
+    backoff = Backoff(base_delay=0.5, max_delay=3.0, jitter=0.0)
+
+    assert [backoff.delay(failures) for failures in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    jittered = Backoff(base_delay=1.0, jitter=1.0)
+    assert all(0 < jittered.delay(1, random.Random(seed)) <= 1.0 for seed in range(20))
+
+
+def test_call_retries_until_success():
+    scheduler = RetryScheduler(Backoff(max_attempts=3, base_delay=0.001))
+    flaky = Flaky(failures=2)
+
+    assert asyncio.run(scheduler.call("search", flaky, "ok")) == "ok"
+    assert flaky.calls == 3
+    assert scheduler.stats()["search"]["state"] == "closed"
+
+
+def test_call_raises_the_last_error_out_of_attempts():
+    scheduler = RetryScheduler(Backoff(max_attempts=2, base_delay=0.001))
+    flaky = Flaky(failures=5)
+
+    with pytest.raises(ConnectionError, match="attempt 2"):
+        asyncio.run(scheduler.call("search", flaky, "ok"))
+    assert flaky.calls == 2
+
+
+def test_errors_outside_retry_on_are_not_retried():
+    scheduler = RetryScheduler(Backoff(max_attempts=3, base_delay=0.001), retry_on=(ConnectionError,))
+
+    async def broken():
+        raise KeyError("bug")
+
+    with pytest.raises(KeyError):
+        asyncio.run(scheduler.call("search", broken))
+    assert scheduler.breaker("search").failures == 0
+
+
+def test_breaker_opens_fails_fast_and_probes_after_the_timeout(clock):
+    breaker = CircuitBreaker("search", failure_threshold=2, reset_timeout=10.0)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == "open" and not breaker.allow() and breaker.is_open()
+    clock[0] += 10
+    # one half-open probe, the next caller is turned away until it reports back
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    assert breaker.stats() == {"state": "closed", "failures": 0, "times_opened": 1, "rejected": 2}
+
+
+def test_a_failed_probe_reopens_and_a_cancelled_one_is_given_back(clock):
+    breaker = CircuitBreaker("search", failure_threshold=1, reset_timeout=5.0)
+    breaker.record_failure()
+    clock[0] += 5
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+
+def test_open_circuit_skips_the_call_and_stops_retries(clock):
+    scheduler = RetryScheduler(Backoff(max_attempts=5, base_delay=0.001), failure_threshold=2, reset_timeout=30.0)
+    flaky = Flaky(failures=10)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scheduler.call("search", flaky, "ok"))
+    # the second failure opened the circuit, no third attempt
+    assert flaky.calls == 2
+    with pytest.raises(CircuitOpenError) as error:
+        asyncio.run(scheduler.attempt("search", flaky, "ok"))
+    assert flaky.calls == 2 and error.value.retry_after == 30.0
+    assert scheduler.next_delay("search", 1) is None
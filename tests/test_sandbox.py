@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+from src.components.sandbox import PythonSandbox, sanitize_input
+
+
+def test_sanitize_input_strips_markdown_fences():
+    assert sanitize_input("```python\nprint(1)\n```") == "print(1)"
+
+
+def test_run_returns_output_and_errors():
+    sandbox = PythonSandbox(workers=1, timeout=10)
+    try:
+        assert sandbox.run("print(6 * 7)") == "42\n"
+        assert sandbox.run("1 / 0") == "ZeroDivisionError('division by zero')"
+    finally:
+        sandbox.close()
+
+
+def test_run_kills_and_replaces_a_hung_worker():
+    sandbox = PythonSandbox(workers=1, timeout=0.2)
+    try:
+        assert sandbox.run("while True: pass") == "Execution timed out after 0.2s"
+        assert sandbox.run("print('alive')", timeout=10) == "alive\n"
+        assert sandbox.stats()["timeouts"] == 1
+    finally:
+        sandbox.close()
+
+
+def test_run_times_out_waiting_for_a_worker():
+    sandbox = PythonSandbox(workers=1, timeout=10)
+    sandbox.start()
+    busy = threading.Thread(target=sandbox.run, args=("import time; time.sleep(0.5)",))
+    try:
+        busy.start()
+        while not busy.is_alive() or sandbox._idle:
+            pass
+        assert sandbox.run("print(1)", timeout=0.1) == "Execution timed out after 0.1s waiting for a worker"
+        busy.join()
+        # the worker went back to the pool, not to the caller that gave up on it
+        assert sandbox.run("print(1)", timeout=10) == "1\n"
+    finally:
+        busy.join()
+        sandbox.close()
+
+
+def test_arun_does_not_block_the_event_loop():
+    async def run():
+        sandbox = PythonSandbox(workers=2, timeout=10)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            outputs = await asyncio.gather(
+                *(sandbox.arun("import time; time.sleep(0.2); print('ok')") for _ in range(2))
+            )
+        finally:
+            task.cancel()
+            sandbox.close()
+        return outputs, ticks
+
+    outputs, ticks = asyncio.run(run())
+    assert outputs == ["ok\n", "ok\n"]
+    assert ticks >= 10
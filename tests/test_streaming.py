@@ -0,0 +1,106 @@
+import asyncio
+import io
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from src.agents.booker import build_graph
+from src.benchmarks.suite import WEATHER_QUESTION, stub_weather_agent
+from src.components.streaming import Sink, StdoutSink, StreamEvent, StreamStats, stream_turn, to_events
+
+
+class RecordingSink(Sink):
+    def __init__(self):
+        self.events = []
+
+    async def send(self, event: StreamEvent):
+        self.events.append(event)
+
+
+def _kinds(events: list[StreamEvent]) -> list[tuple]:
+    return [(event.kind, event.data.get("tool") or event.data.get("text")) for event in events if event.kind != "done"]
+
+
+def test_custom_tool_progress_becomes_tool_events():
+    assert to_events("custom", {"tool": "check_booking", "status": "start"}) == [
+        StreamEvent("tool_start", {"tool": "check_booking"})
+    ]
+    assert to_events("custom", {"tool": "check_booking", "status": "end"}) == [
+        StreamEvent("tool_end", {"tool": "check_booking"})
+    ]
+    assert to_events("custom", {"progress": 0.5}) == []
+
+
+def test_messages_become_token_and_tool_events():
+    metadata = {"langgraph_node": "agent"}
+    call = AIMessageChunk(content="", tool_call_chunks=[{"name": "get_weather", "args": "", "id": "1", "index": 0}])
+
+    assert to_events("messages", (AIMessageChunk(content="Hi"), metadata)) == [
+        StreamEvent("token", {"text": "Hi"}, "agent")
+    ]
+    assert to_events("messages", (call, metadata)) == [StreamEvent("tool_start", {"tool": "get_weather"}, "agent")]
+    assert to_events("messages", (ToolMessage("sunny", name="get_weather", tool_call_id="1"), metadata)) == [
+        StreamEvent("tool_end", {"tool": "get_weather"}, "agent")
+    ]
+    # a whole message returned by a node is one token event
+    assert to_events("messages", (AIMessage("Hello"), metadata)) == [StreamEvent("token", {"text": "Hello"}, "agent")]
+    assert to_events("messages", (AIMessageChunk(content=""), metadata)) == []
+
+
+def test_booker_turn_streams_tool_progress_then_the_reply():
+    sink = RecordingSink()
+    config = {"configurable": {"thread_id": "streaming"}}
+
+    result = asyncio.run(stream_turn(build_graph(), {"messages": [("user", "check booking 123")]}, config, sink))
+
+    reply = "Booking confirmed for Alice Johnson with 2 guests. Your assigned room is 101."
+    assert _kinds(sink.events) == [("tool_start", "check_booking"), ("tool_end", "check_booking"), ("token", reply)]
+    assert sink.events[2].node == "process_check_bookings"
+    assert result.text == reply
+
+
+def test_agent_turn_streams_tool_calls_tool_messages_and_tokens():
+    sink = RecordingSink()
+
+    result = asyncio.run(stream_turn(stub_weather_agent(), WEATHER_QUESTION, sink=sink))
+
+    kinds = _kinds(sink.events)
+    # the tool call is announced by the model's chunk, finished by the ToolMessage from the tools node
+    assert kinds[:2] == [("tool_start", "get_weather"), ("tool_end", "get_weather")]
+    assert [event.node for event in sink.events[:2]] == ["agent", "tools"]
+    assert all(kind == "token" for kind, _ in kinds[2:])
+    assert "".join(text for _, text in kinds[2:]) == result.text == "It's always sunny in sf!"
+
+
+def test_done_event_closes_the_turn_with_its_timings():
+    sink, stats = RecordingSink(), StreamStats()
+
+    result = asyncio.run(stream_turn(stub_weather_agent(), WEATHER_QUESTION, sink=sink, stats=stats))
+
+    done = sink.events[-1]
+    assert done.kind == "done"
+    assert [event.kind for event in sink.events].count("done") == 1
+    assert result.ttft is not None
+    assert 0 < result.ttft <= result.latency
+    assert done.data == {"ttft_ms": result.ttft * 1000, "latency_ms": result.latency * 1000}
+    assert stats.ttft.count == stats.latency.count == 1
+
+
+def test_turn_without_tokens_has_no_ttft():
+    config = {"configurable": {"thread_id": "no-reply"}}
+
+    # no intent matched: the graph ends without a reply
+    result = asyncio.run(stream_turn(build_graph(), {"messages": [("user", "hmm")]}, config))
+
+    assert result.text == ""
+    assert result.ttft is None
+
+
+def test_stdout_sink_prints_the_reply_once_prefixed():
+    out = io.StringIO()
+    sink = StdoutSink(stream=out)
+    config = {"configurable": {"thread_id": "stdout"}}
+
+    asyncio.run(stream_turn(build_graph(), {"messages": [("user", "hotel info")]}, config, sink))
+
+    assert out.getvalue().startswith("[hotel_info start]\n[hotel_info end]\nAI: Hotel ABC offers")
+    assert out.getvalue().endswith("\n") and out.getvalue().count("AI: ") == 1
@@ -0,0 +1,101 @@
+from langchain_core.tools import Tool
+
+from src.components.tool_cache import ToolCache, memoize_tool, normalize_input
+
+
+def _recording_tool(calls: list):
+    def func(tool_input: str) -> str:
+        calls.append(tool_input)
+        return f"result for {tool_input.strip()}"
+
+    return Tool(name="Lookup", func=func, description="Looks things up.")
+
+
+def test_normalize_input_collapses_whitespace():
+    assert normalize_input(" 123 \n") == normalize_input("123") == "123"
+    assert normalize_input("a   b") == "a b"
+
+
+def test_tool_receives_the_normalized_input():
+    calls = []
+    cached = memoize_tool(_recording_tool(calls), ToolCache())
+
+    cached.func("  Paris\n")
+
+    assert calls == ["Paris"]
+
+
+def test_equivalent_keys_give_equivalent_results():
+    calls = []
+
+    def lookup(guest_id: str) -> str:
+        # exact match, like repository.get: " 123" would miss
+        calls.append(guest_id)
+        return "Booking found." if guest_id == "123" else "No booking found."
+
+    cached = memoize_tool(Tool(name="Lookup", func=lookup, description="Looks up a booking."), ToolCache())
+
+    assert cached.func(" 123") == cached.func("123") == lookup("123")
+    assert calls == ["123", "123"]
+
+
+def test_equivalent_inputs_share_one_entry():
+    calls = []
+    cache = ToolCache()
+    cached = memoize_tool(_recording_tool(calls), cache)
+
+    first = cached.func("123")
+    second = cached.func(" 123 ")
+
+    assert first == second
+    assert calls == ["123"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_drops_tagged_entries():
+    calls = []
+    cache = ToolCache()
+    cached = memoize_tool(_recording_tool(calls), cache, tag=lambda guest_id: guest_id)
+    cached.func("123")
+    cached.func("456")
+
+    cache.invalidate(["123"])
+    cached.func("123")
+    cached.func("456")
+
+    assert calls == ["123", "456", "123"]
+
+
+def test_result_computed_across_an_invalidation_is_not_cached():
+    cache = ToolCache()
+    epoch = cache.epoch
+    cache.invalidate(["123"])
+
+    cache.put(("Lookup", "123"), "stale", tag="123", epoch=epoch)
+
+    assert cache.get(("Lookup", "123")) == (False, None)
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("src.components.tool_cache.time.monotonic", lambda: now[0])
+    cache = ToolCache(max_size=2, ttl=10)
+    cache.put(("t", "a"), 1)
+    cache.put(("t", "b"), 2)
+    cache.get(("t", "a"))
+    cache.put(("t", "c"), 3)
+
+    assert cache.get(("t", "b")) == (False, None)
+    assert cache.evictions == 1
+    now[0] = 11
+    assert cache.get(("t", "a")) == (False, None)
+
+
+def test_booker_check_booking_ignores_surrounding_whitespace():
+    from src.agents.booker import get_tools
+
+    tools = get_tools()
+    padded = tools["check_booking"].invoke(" 123")
+
+    assert padded == tools["check_booking"].invoke("123")
+    assert not padded.startswith("No booking found")
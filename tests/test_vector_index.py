@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.components.vector_index import FlatIndex, IVFIndex, MmapIndex, normalize, top_k
+
+
+def _vectors(count: int, dims: int = 16, seed: int = 0) -> np.ndarray:
+    return normalize(np.random.default_rng(seed).standard_normal((count, dims)))
+
+
+@pytest.fixture(params=["flat", "ivf", "mmap"])
+def index(request, tmp_path):
+    if request.param == "flat":
+        return FlatIndex(16, capacity=4)
+    if request.param == "ivf":
+        return IVFIndex(16, nlist=8, nprobe=8, train_size=64)
+    return MmapIndex(str(tmp_path / "vectors"), 16)
+
+
+def test_normalize_and_top_k():
+    assert np.allclose(normalize([[3, 4], [0, 0]]), [[0.6, 0.8], [0, 0]])
+    positions, scores = top_k(np.array([[0.1, 0.9, 0.5, 0.7]]), 2)
+
+    assert positions.tolist() == [[1, 3]] and np.allclose(scores, [[0.9, 0.7]])
+
+
+def test_finds_each_vector_itself(index):
+    vectors = _vectors(200)
+    index.add(np.arange(200), vectors)
+
+    ids, scores = index.search(vectors[:10], 1)
+
+    assert len(index) == 200
+    assert ids[:, 0].tolist() == list(range(10))
+    np.testing.assert_allclose(scores[:, 0], 1.0, rtol=1e-5)
+
+
+def test_remove_replace_and_allowed(index):
+    vectors = _vectors(100)
+    index.add(np.arange(100), vectors)
+    index.remove([3])
+
+    assert index.search(vectors[3], 1)[0][0, 0] != 3
+    assert set(index.search(vectors[5], 5, allowed=[5, 6, 3])[0][0].tolist()) == {5, 6, -1}
+    assert len(index) == 99
+
+
+def test_results_are_padded_when_too_few_are_eligible(index):
+    index.add(np.arange(3), _vectors(3))
+
+    ids, scores = index.search(_vectors(1, seed=1), 5)
+
+    assert ids[0, 3:].tolist() == [-1, -1] and np.isneginf(scores[0, 3:]).all()
+
+
+def test_ivf_matches_exact_search_with_every_list_probed():
+    vectors, queries = _vectors(1_000), _vectors(10, seed=1)
+    exact, ivf = FlatIndex(16), IVFIndex(16, nlist=16, nprobe=16, train_size=256)
+    for target in (exact, ivf):
+        target.add(np.arange(1_000), vectors)
+
+    assert ivf.centroids is not None
+    assert ivf.search(queries, 10)[0].tolist() == exact.search(queries, 10)[0].tolist()
+
+
+def test_mmap_index_reopens_from_its_file(tmp_path):
+    path, vectors = str(tmp_path / "vectors"), _vectors(50)
+    index = MmapIndex(path, 16)
+    index.add(np.arange(50), vectors)
+    index.close()
+
+    reopened = MmapIndex(path, 16, size=50, live=range(0, 50, 2))
+
+    assert len(reopened) == 25
+    assert reopened.search(vectors[4], 1)[0][0, 0] == 4
+    assert reopened.search(vectors[5], 1)[0][0, 0] != 5
+    reopened.close()
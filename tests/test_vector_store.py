@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from langgraph.store.memory import InMemoryStore
+
+from src.benchmarks.fakes import FakeEmbeddings
+from src.components.vector_index import IVFIndex
+from src.components.vector_store import VectorStore
+
+NAMESPACE = ("1", "memories")
+MEMORIES = {
+    "m1": {"text": "I like pizza with olives", "kind": "food"},
+    "m2": {"text": "I drink black coffee every morning", "kind": "drink"},
+    "m3": {"text": "green tea in the afternoon", "kind": "drink"},
+    "m4": {"text": "allergic to peanuts", "kind": "food"},
+    "m5": {"text": "pizza on fridays and coffee after", "kind": "food"},
+}
+
+
+def _index(**extra) -> dict:
+    return {"embed": FakeEmbeddings(32), "dims": 32, "fields": ["text"], **extra}
+
+
+def _fill(store):
+    for key, value in MEMORIES.items():
+        store.put(NAMESPACE, key, value)
+    return store
+
+
+def _ranking(results) -> list[tuple[str, float]]:
+    return [(item.key, round(item.score, 5)) for item in results]
+
+
+@pytest.mark.parametrize(
+    "query, options",
+    [
+        ("coffee", {}),
+        ("pizza", {"limit": 2}),
+        ("pizza", {"limit": 2, "offset": 1}),
+        ("something to drink", {"filter": {"kind": "drink"}}),
+    ],
+)
+def test_search_matches_in_memory_store(query, options):
+    expected = _fill(InMemoryStore(index=_index())).search(NAMESPACE, query=query, **options)
+    found = _fill(VectorStore(index=_index())).search(NAMESPACE, query=query, **options)
+
+    assert _ranking(found) == _ranking(expected)
+
+
+def test_search_by_namespace_prefix_and_listing():
+    store = _fill(VectorStore(index=_index()))
+    store.put(("2", "memories"), "other", {"text": "coffee", "kind": "drink"})
+
+    assert {item.key for item in store.search(("1",), query="coffee", limit=10)} == set(MEMORIES)
+    # without a query, a plain listing like InMemoryStore's
+    assert [item.key for item in store.search(NAMESPACE, filter={"kind": "drink"})] == ["m2", "m3"]
+
+
+def test_put_replaces_and_delete_removes_vectors():
+    store = _fill(VectorStore(index=_index()))
+    store.put(NAMESPACE, "m2", {"text": "I quit coffee, water only", "kind": "drink"})
+    store.delete(NAMESPACE, "m3")
+
+    assert store.stats()["vectors"] == len(MEMORIES) - 1
+    assert "m3" not in {item.key for item in store.search(NAMESPACE, query="tea", limit=10)}
+    assert store.search(NAMESPACE, query="water only", limit=1)[0].key == "m2"
+
+
+class SlowEmbeddings(FakeEmbeddings):
+    """Takes `delays[text]` seconds to embed a batch containing `text`, and fails on "boom"."""
+
+    def __init__(self, dims: int, delays: dict[str, float]):
+        super().__init__(dims)
+        self.delays = delays
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(max(self.delays.get(text, 0.0) for text in texts))
+        if "boom" in texts:
+            raise RuntimeError("embedding failed")
+        return self.embed_documents(texts)
+
+
+def test_racing_puts_on_one_key_keep_only_the_last_vectors():
+    embeddings = SlowEmbeddings(32, {"coffee": 0.05, "pizza": 0.0})
+    store = VectorStore(index={"embed": embeddings, "dims": 32, "fields": ["text"]})
+
+    async def run():
+        # both puts drop the (missing) old vectors, then pizza finishes embedding first and coffee last
+        await asyncio.gather(
+            store.aput(NAMESPACE, "k", {"text": "coffee"}), store.aput(NAMESPACE, "k", {"text": "pizza"})
+        )
+        return await store.asearch(NAMESPACE, query="coffee", limit=1)
+
+    [found] = asyncio.run(run())
+
+    assert store._indexes[NAMESPACE].ids_by_key == {"k": [1]}
+    assert store.stats()["vectors"] == 1
+    assert found.value == {"text": "coffee"}
+    assert found.score == pytest.approx(1.0)
+
+
+def test_failed_embedding_keeps_the_item_and_its_vectors():
+    store = VectorStore(index={"embed": SlowEmbeddings(32, {}), "dims": 32, "fields": ["text"]})
+    asyncio.run(store.aput(NAMESPACE, "k", {"text": "coffee"}))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.aput(NAMESPACE, "k", {"text": "boom"}))
+
+    assert store.get(NAMESPACE, "k").value == {"text": "coffee"}
+    assert store.search(NAMESPACE, query="coffee", limit=1)[0].score == pytest.approx(1.0)
+
+
+def test_put_without_indexed_text_drops_the_old_vectors():
+    store = _fill(VectorStore(index=_index()))
+    store.put(NAMESPACE, "m2", {"note": "no text field"})
+    store.put(NAMESPACE, "m3", {"text": "green tea"}, index=False)
+
+    assert store.stats()["vectors"] == len(MEMORIES) - 2
+    assert set(store._indexes[NAMESPACE].ids_by_key) == {"m1", "m4", "m5"}
+
+
+def test_items_without_vectors_fill_up_the_results():
+    store = _fill(VectorStore(index=_index()))
+    store.put(NAMESPACE, "raw", {"text": "not indexed"}, index=False)
+
+    results = store.search(NAMESPACE, query="coffee", limit=10)
+
+    assert results[-1].key == "raw" and results[-1].score is None
+
+
+def test_put_many_embeds_once_per_batch():
+    class CountingEmbeddings(FakeEmbeddings):
+        calls = 0
+
+        def embed_documents(self, texts):
+            self.calls += 1
+            return super().embed_documents(texts)
+
+    embeddings = CountingEmbeddings(32)
+    store = VectorStore(index={"embed": embeddings, "dims": 32, "fields": ["text"]})
+    store.put_many([(NAMESPACE, key, value) for key, value in MEMORIES.items()], batch_size=2)
+
+    assert embeddings.calls == 3
+    assert store.search(NAMESPACE, query="coffee", limit=1)[0].key == "m2"
+
+
+def test_async_put_many_and_search():
+    async def run():
+        store = VectorStore(index=_index())
+        await store.aput_many([(NAMESPACE, key, value) for key, value in MEMORIES.items()])
+        return await store.asearch(NAMESPACE, query="coffee", limit=1)
+
+    assert asyncio.run(run())[0].key == "m2"
+
+
+def test_ivf_backend_finds_the_same_best_match():
+    store = _fill(VectorStore(index=_index(backend=lambda dims: IVFIndex(dims, nlist=2, nprobe=2))))
+
+    assert store.search(NAMESPACE, query="green tea", limit=1)[0].key == "m3"
@@ -0,0 +1,159 @@
+import bz2
+
+import pytest
+from langchain_community.tools import WikipediaQueryRun
+
+from src.components.wiki_index import (
+    OfflineWikipediaAPIWrapper,
+    WikiIndex,
+    query_terms,
+    read_mediawiki_dump,
+    strip_wikitext,
+    to_match_query,
+)
+
+PAGES = [
+    {"title": "Paris", "text": "Paris is the capital of France.\n\nIt lies on the Seine."},
+    {"title": "France", "text": "France is a country in Europe. Its capital is Paris."},
+    {"title": "Eiffel Tower", "text": "The Eiffel Tower is a wrought iron tower in Paris."},
+    {"title": "Seine", "text": "The Seine is a river that flows through Paris."},
+    {"title": "Berlin", "text": "Berlin is the capital of Germany."},
+]
+
+DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">
+  <siteinfo><sitename>Wikipedia</sitename></siteinfo>
+  <page>
+    <title>Lyon</title>
+    <ns>0</ns>
+    <revision><text>'''Lyon''' is a city in [[France]].{{Infobox city|name=Lyon}}&lt;ref&gt;A source&lt;/ref&gt;</text></revision>
+  </page>
+  <page>
+    <title>Lyons</title>
+    <ns>0</ns>
+    <redirect title="Lyon" />
+    <revision><text>#REDIRECT [[Lyon]]</text></revision>
+  </page>
+  <page>
+    <title>Talk:Lyon</title>
+    <ns>1</ns>
+    <revision><text>Discussion.</text></revision>
+  </page>
+</mediawiki>
+"""
+
+
+@pytest.fixture
+def index():
+    index = WikiIndex(":memory:")
+    index.ingest(PAGES, batch_size=2)
+    yield index
+    index.close()
+
+
+def test_ingest_skips_titles_already_indexed(index):
+    stats = index.ingest(
+        [{"title": "paris", "text": "A duplicate, titles ignore case."}, {"title": "Rome", "text": "Rome is in Italy."}]
+    )
+
+    assert (stats.pages, stats.skipped) == (1, 1)
+    assert len(index) == len(PAGES) + 1
+    assert index.get("Paris")["content"] == PAGES[0]["text"]
+    assert [result.title for result in index.search("duplicate")] == []
+
+
+def test_ingest_counts_duplicates_within_a_batch():
+    index = WikiIndex(":memory:")
+    records = [{"title": "Paris", "text": "first"}, {"title": "Paris", "text": "second"}, {"title": "Nice", "text": ""}]
+
+    stats = index.ingest(records, batch_size=10)
+
+    # INSERT OR IGNORE reports only the rows it wrote
+    assert (stats.pages, stats.skipped) == (2, 1)
+    assert index.get("Paris")["content"] == "first"
+    index.close()
+
+
+def test_ingest_summarizes_the_lead_paragraph(index):
+    assert index.get("Paris")["summary"] == "Paris is the capital of France."
+
+
+def test_exact_title_comes_first(index):
+    results = index.search("Seine")
+
+    assert results[0].title == "Seine"
+    assert [result.title for result in results].count("Seine") == 1
+    assert {result.title for result in results[1:]} <= {"Paris"}
+
+
+def test_search_needs_all_terms_when_some_page_has_them(index):
+    assert [result.title for result in index.search("capital Germany")] == ["Berlin"]
+
+
+def test_search_falls_back_to_any_term(index):
+    titles = [result.title for result in index.search("Germany iron", k=5)]
+
+    assert set(titles) == {"Berlin", "Eiffel Tower"}
+
+
+def test_search_ignores_stopwords_and_query_syntax(index):
+    assert query_terms('What is the "capital" OF Germany?') == ["capital", "germany"]
+    assert [result.title for result in index.search('the capital" OR "germany')] == ["Berlin"]
+    assert index.search("the of and") == []
+
+
+def test_to_match_query_quotes_every_term():
+    assert to_match_query(["paris", "seine"]) == '"paris" AND "seine"'
+    assert to_match_query(["paris", "seine"], "OR") == '"paris" OR "seine"'
+    assert to_match_query(['say"hi', "NEAR"]) == '"say""hi" AND "NEAR"'
+
+
+def test_quoted_terms_are_searched_literally(index):
+    with index.pool.connection() as connection:
+        rows = connection.execute(
+            "SELECT rowid FROM pages_fts WHERE pages_fts MATCH ?", (to_match_query(['"paris', "OR"]),)
+        ).fetchall()
+
+    assert rows == []
+
+
+def test_strip_wikitext():
+    text = (
+        "'''Lyon''' is a [[city]] in [[France|the French Republic]].{{Infobox|a={{nested}}}}"
+        "<ref name=x>source</ref><!-- note -->\n== History ==\n[[File:Lyon.jpg|thumb|A [[view]]]]"
+        "See [https://example.org the site]."
+    )
+
+    assert strip_wikitext(text) == "Lyon is a city in the French Republic.\nHistory\nSee the site."
+
+
+def test_read_mediawiki_dump_keeps_articles_only(tmp_path):
+    path = tmp_path / "dump.xml.bz2"
+    path.write_bytes(bz2.compress(DUMP.encode()))
+
+    assert list(read_mediawiki_dump(str(path))) == [{"title": "Lyon", "text": "Lyon is a city in France."}]
+
+
+def test_offline_wrapper_runs_through_wikipedia_query_run(index):
+    tool = WikipediaQueryRun(api_wrapper=OfflineWikipediaAPIWrapper(index=index, top_k_results=2))
+
+    assert tool.run("Eiffel Tower").startswith(
+        "Page: Eiffel Tower\nSummary: The Eiffel Tower is a wrought iron tower in Paris."
+    )
+    assert tool.run("zeppelin") == "No good Wikipedia Search Result was found"
+
+
+def test_offline_wrapper_truncates_to_doc_content_chars_max(index):
+    wrapper = OfflineWikipediaAPIWrapper(index=index, top_k_results=3, doc_content_chars_max=20)
+
+    assert wrapper.run("Paris") == "Page: Paris\nSummary:"
+
+
+def test_offline_wrapper_load(index):
+    documents = OfflineWikipediaAPIWrapper(index=index, top_k_results=1).load("Berlin")
+
+    assert [document.page_content for document in documents] == ["Berlin is the capital of Germany."]
+    assert documents[0].metadata == {
+        "title": "Berlin",
+        "summary": "Berlin is the capital of Germany.",
+        "source": "offline",
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.benchmarks.fakes import stub_chat_model
+from src.components.budget import Budget, BudgetTracker, run_with_budget
+from src.components.response_cache import ResponseCache
+from src.samples import wikicalcu
+
+
+class StubModels:
+    """Scripted replies for think (temperature 0) and generate_response (temperature 0.7)."""
+
+    def __init__(self, think_reply: str, answer: str = "Done."):
+        self.models = {0: stub_chat_model([AIMessage(think_reply)]), 0.7: stub_chat_model([AIMessage(answer)])}
+
+    def get(self, model: str = "", temperature: float = 0.0):
+        return self.models[temperature]
+
+
+NO_TOOL = json.dumps({"need_tool": False, "tool": None, "tool_input": "", "thought": "No tool needed."})
+
+
+def test_state_checkpoints_and_round_trips():
+    graph = wikicalcu.workflow.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "1", "models": StubModels(NO_TOOL)}}
+    history = [{"role": "user", "content": "earlier question"}]
+
+    asyncio.run(graph.ainvoke(wikicalcu.AgentState(current_input="hi", messages=history), config))
+    values = graph.get_state(config).values
+
+    assert values["messages"] == history + [{"role": "assistant", "content": "Done."}]
+    serde = JsonPlusSerializer()
+    assert serde.loads_typed(serde.dumps_typed(values)) == values
+
+
+def test_request_ends_once_answered():
+    config = {"configurable": {"models": StubModels(NO_TOOL)}}
+    run = asyncio.run(
+        run_with_budget(wikicalcu.app, wikicalcu.AgentState(current_input="hi"), wikicalcu.BUDGET, config)
+    )
+
+    assert run.stopped == "completed"
+    assert run.answer == "Done."
+    # one think, one generate_response, no second lap through think
+    assert run.usage["llm_calls"] == 2
+
+
+def test_answer_on_the_last_allowed_call_counts_as_completed():
+    config = {"configurable": {"models": StubModels(NO_TOOL)}}
+    budget = Budget(deadline=None, max_llm_calls=2, max_tool_calls=None)
+    run = asyncio.run(run_with_budget(wikicalcu.app, wikicalcu.AgentState(current_input="hi"), budget, config))
+
+    assert run.stopped == "completed"
+    assert run.answer == "Done."
+
+
+def test_llm_budget_stops_before_an_answer():
+    config = {"configurable": {"models": StubModels(NO_TOOL)}}
+    budget = Budget(deadline=None, max_llm_calls=1, max_tool_calls=None)
+    run = asyncio.run(run_with_budget(wikicalcu.app, wikicalcu.AgentState(current_input="hi"), budget, config))
+
+    assert run.stopped == "llm_calls"
+    assert run.usage["llm_calls"] == 1
+    assert run.answer == "No tool needed."
+
+
+def _think(reply: str) -> dict:
+    state = wikicalcu.AgentState(current_input="hi")
+    return asyncio.run(wikicalcu.think(state, {"configurable": {"models": StubModels(reply)}}))
+
+
+def test_think_reports_malformed_json_as_an_error():
+    update = _think('{"need_tool": true, "tool": wikipedia}')
+
+    assert update["status"] == "ERROR"
+    assert update["thought"].startswith("Could not parse the plan")
+
+
+def test_think_reports_a_missing_field_as_an_error():
+    update = _think(json.dumps({"tool": None, "tool_input": "", "thought": "hmm"}))
+
+    assert update["status"] == "ERROR"
+    assert "need_tool" in update["thought"]
+
+
+def test_a_malformed_plan_is_still_answered():
+    config = {"configurable": {"models": StubModels("not json at all")}}
+    run = asyncio.run(
+        run_with_budget(wikicalcu.app, wikicalcu.AgentState(current_input="hi"), wikicalcu.BUDGET, config)
+    )
+
+    assert run.stopped == "completed"
+    assert run.answer == "Done."
+
+
+class RecordingTool:
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, tool_input: str) -> str:
+        self.calls.append(tool_input)
+        return "ran"
+
+    __call__ = ainvoke
+
+
+def test_only_cacheable_tools_run_speculatively(monkeypatch):
+    repl = RecordingTool()
+    monkeypatch.setitem(
+        wikicalcu.tools_by_name, "python_repl", wikicalcu.Tool(name="python_repl", description="", func=repl)
+    )
+    reply = json.dumps({"need_tool": True, "tool": "python_repl", "tool_input": "print(1)", "thought": "run it"})
+    tracker = BudgetTracker(Budget())
+    config = {"configurable": {"models": StubModels(reply), "budget": tracker}}
+
+    update = asyncio.run(wikicalcu.think(wikicalcu.AgentState(current_input="hi"), config))
+
+    # left to execute_tool, think neither ran nor charged it
+    assert update["status"] == "NEED_TOOL"
+    assert "tool_output" not in update
+    assert repl.calls == []
+    assert tracker.tool_calls == 0
+
+
+class NoModels:
+    def get(self, model: str = "", temperature: float = 0.0):
+        raise AssertionError("the model was called")
+
+
+def test_think_replays_a_cached_plan_without_an_llm_call():
+    cache = ResponseCache()
+    state = wikicalcu.AgentState(current_input="hi")
+    first, second = BudgetTracker(Budget()), BudgetTracker(Budget())
+
+    planned = asyncio.run(
+        wikicalcu.think(
+            state, {"configurable": {"models": StubModels(NO_TOOL), "response_cache": cache, "budget": first}}
+        )
+    )
+    replayed = asyncio.run(
+        wikicalcu.think(state, {"configurable": {"models": NoModels(), "response_cache": cache, "budget": second}})
+    )
+
+    assert (
+        replayed
+        == planned
+        == {
+            "thought": "No tool needed.",
+            "selected_tool": None,
+            "tool_input": "",
+            "status": "GENERATE_RESPONSE",
+        }
+    )
+    assert (first.llm_calls, second.llm_calls) == (1, 0)
+    assert cache.stats()["hits"] == 1